@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Report, Fact, Company, VsmeRegister
+from .models import Report, Fact, Concept, Unit, Period, Company, VsmeRegister, ProcessingJob, UploadSession, ValidationCache
 
 
 @admin.register(Report)
@@ -11,9 +11,30 @@ class ReportAdmin(admin.ModelAdmin):
 
 @admin.register(Fact)
 class FactAdmin(admin.ModelAdmin):
-    list_display = ("id", "report", "concept", "unit", "context", "created_at")
+    list_display = ("id", "report", "concept", "numeric_value", "unit", "period", "created_at")
     list_filter = ("report",)
-    search_fields = ("concept", "value", "unit", "context")
+    list_select_related = ("report", "concept", "unit", "period")
+    search_fields = ("concept__qname", "value", "unit__code", "period__label")
+    raw_id_fields = ("report", "concept", "unit", "period")
+
+
+@admin.register(Concept)
+class ConceptAdmin(admin.ModelAdmin):
+    list_display = ("id", "qname", "datatype")
+    search_fields = ("qname",)
+
+
+@admin.register(Unit)
+class UnitAdmin(admin.ModelAdmin):
+    list_display = ("id", "code")
+    search_fields = ("code",)
+
+
+@admin.register(Period)
+class PeriodAdmin(admin.ModelAdmin):
+    list_display = ("id", "label", "period_start", "period_end", "is_instant")
+    list_filter = ("is_instant",)
+    search_fields = ("label",)
 
 
 @admin.register(Company)
@@ -27,3 +48,23 @@ class VsmeRegisterAdmin(admin.ModelAdmin):
     list_display = ("id", "company", "year", "entity_identifier", "completeness_score", "updated_at")
     list_filter = ("company", "year")
     search_fields = ("company__name", "entity_identifier")
+
+
+@admin.register(ProcessingJob)
+class ProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "report", "status", "attempts", "max_attempts", "run_after", "locked_by", "updated_at")
+    list_filter = ("status",)
+    search_fields = ("report__id", "locked_by", "last_error")
+
+
+@admin.register(ValidationCache)
+class ValidationCacheAdmin(admin.ModelAdmin):
+    list_display = ("id", "content_sha256", "arelle_version", "source_report", "hits", "updated_at")
+    search_fields = ("content_sha256", "entity")
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ("id", "owner", "filename", "received", "size", "report", "completed_at", "updated_at")
+    search_fields = ("filename", "owner__username")
+    raw_id_fields = ("owner", "company", "report")
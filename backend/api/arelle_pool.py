@@ -0,0 +1,284 @@
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import zipfile
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_OIM_MEMBER = "report.json"
+
+
+class PoolError(RuntimeError):
+    """The pool could not run a job (unavailable, worker timeout or crash); the CLI may still."""
+
+
+def _current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _BufferHandler(logging.Handler):
+    """Collect Arelle log records for the current job only."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.INFO)
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            code = getattr(record, "messageCode", "") or ""
+            msg = record.getMessage()
+            self.lines.append(f"[{code}] {msg}" if code else msg)
+        except Exception:
+            pass
+
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def _export_oim_bytes(model_xbrl: Any) -> bytes:
+    """Export the loaded model as OIM xBRL-JSON into an in-memory zip and return the JSON bytes."""
+    from arelle import PluginManager
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        savers = list(PluginManager.pluginClassMethods("SaveLoadableOim.Save"))
+        if savers:
+            savers[0](model_xbrl, _OIM_MEMBER, zf)
+        else:
+            # Older Arelle builds don't expose the hook; call the plugin directly
+            from arelle.plugin.saveLoadableOIM import saveLoadableOIM
+            saveLoadableOIM(model_xbrl, _OIM_MEMBER, zf)
+    buf.seek(0)
+    with zipfile.ZipFile(buf, "r") as zf:
+        return zf.read(_OIM_MEMBER)
+
+
+def _worker_main(conn, entrypoint: str, cache_dir: str, plugins: list[str], max_jobs: int, max_memory_mb: int) -> None:
+    """Long-lived Arelle process: warm up once, then serve jobs over `conn` until recycled."""
+    os.environ["ARELLE_CACHE_DIR"] = cache_dir
+    try:
+        from arelle import Cntlr, PluginManager
+        from arelle.ModelFormulaObject import FormulaOptions
+
+        handler = _BufferHandler()
+        cntlr = Cntlr.Cntlr()
+        cntlr.startLogging(logHandler=handler)
+        # The CLI sets this up before validating; validation fails without it
+        cntlr.modelManager.formulaOptions = FormulaOptions()
+        for name in plugins:
+            PluginManager.addPluginModule(name)
+        PluginManager.reset()
+        # Keep the VSME DTS resident so every job starts with taxonomy, plugins and imports warm
+        warm_dts = cntlr.modelManager.load(entrypoint)
+        if warm_dts is None or warm_dts.modelDocument is None:
+            raise RuntimeError(f"failed to load entrypoint {entrypoint}: {handler.text()[:500]}")
+    except Exception as e:
+        conn.send({"ready": False, "error": f"{type(e).__name__}: {e}"})
+        return
+    conn.send({"ready": True})
+
+    jobs = 0
+    while True:
+        try:
+            req = conn.recv()
+        except (EOFError, OSError):
+            return
+        if req.get("op") != "run":
+            return
+        handler.lines = []
+        resp: dict[str, Any] = {"ok": False, "oim": None}
+        model_xbrl = None
+        try:
+            model_xbrl = cntlr.modelManager.load(req["input_path"])
+            if model_xbrl is None or model_xbrl.modelDocument is None:
+                resp["log"] = "model_xbrl is None\n" + handler.text()
+            else:
+                cntlr.modelManager.validate()
+                resp["oim"] = _export_oim_bytes(model_xbrl)
+                resp["ok"] = True
+                resp["log"] = handler.text()
+        except Exception as e:
+            resp["log"] = f"api-error: {type(e).__name__}: {e}\n{handler.text()}"
+        finally:
+            if model_xbrl is not None:
+                try:
+                    cntlr.modelManager.close(model_xbrl)
+                except Exception:
+                    pass
+        jobs += 1
+        resp["recycle"] = jobs >= max_jobs or (max_memory_mb > 0 and _current_rss_mb() > max_memory_mb)
+        conn.send(resp)
+        if resp["recycle"]:
+            return
+
+
+class _Worker:
+    def __init__(self, process, conn) -> None:
+        self.process = process
+        self.conn = conn
+
+    def stop(self, kill: bool = False) -> None:
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.conn.send({"op": "stop"})
+        except Exception:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class ArellePool:
+    """Pool of warm Arelle processes that validate and export OIM JSON in memory.
+
+    Slots are started lazily; a worker is replaced when it recycles itself (after
+    `max_jobs` jobs or once it passes `max_memory_mb`), times out or dies.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        entrypoint: str,
+        cache_dir: str,
+        plugins: list[str],
+        max_jobs: int = 50,
+        max_memory_mb: int = 2048,
+        timeout: float = 600,
+    ) -> None:
+        self._ctx = multiprocessing.get_context("spawn")
+        self._entrypoint = entrypoint
+        self._cache_dir = cache_dir
+        self._plugins = plugins
+        self._max_jobs = max(max_jobs, 1)
+        self._max_memory_mb = max_memory_mb
+        self._timeout = timeout
+        self._slots: queue.Queue[_Worker | None] = queue.Queue()
+        self._unavailable: str | None = None
+        for _ in range(max(size, 1)):
+            self._slots.put(None)
+
+    @property
+    def available(self) -> bool:
+        return self._unavailable is None
+
+    def _spawn(self) -> _Worker | None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self._entrypoint, self._cache_dir, self._plugins, self._max_jobs, self._max_memory_mb),
+            daemon=True,
+            name="arelle-worker",
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        if not parent_conn.poll(self._timeout):
+            worker.stop(kill=True)
+            logger.error("Arelle worker did not become ready within %ss", self._timeout)
+            return None
+        try:
+            hello = parent_conn.recv()
+        except (EOFError, OSError):
+            hello = {"ready": False, "error": "worker exited during startup"}
+        if not hello.get("ready"):
+            # Import or taxonomy failures are not transient; stop using the pool
+            self._unavailable = hello.get("error") or "unknown startup error"
+            logger.error("Arelle worker failed to start: %s", self._unavailable)
+            worker.stop(kill=True)
+            return None
+        logger.info("Started warm Arelle worker pid=%s", process.pid)
+        return worker
+
+    def run(self, input_path: str) -> tuple[bool, bytes | None, str]:
+        """Validate `input_path` and return (ok, oim_json_bytes, log).
+
+        `ok` is False when Arelle ran but could not load or export the filing; failures of
+        the pool itself raise PoolError.
+        """
+        if self._unavailable:
+            raise PoolError(f"pool-unavailable: {self._unavailable}")
+        worker = self._slots.get()
+        try:
+            if worker is None or not worker.process.is_alive():
+                worker = self._spawn()
+                if worker is None:
+                    raise PoolError(f"pool-unavailable: {self._unavailable or 'startup timeout'}")
+            worker.conn.send({"op": "run", "input_path": input_path})
+            if not worker.conn.poll(self._timeout):
+                logger.error("Arelle worker pid=%s timed out on %s", worker.process.pid, input_path)
+                worker.stop(kill=True)
+                worker = None
+                raise PoolError(f"timeout after {self._timeout}s")
+            resp = worker.conn.recv()
+            if resp.get("recycle"):
+                logger.info("Recycling Arelle worker pid=%s", worker.process.pid)
+                worker.stop()
+                worker = None
+            return bool(resp.get("ok")), resp.get("oim"), resp.get("log") or ""
+        except (EOFError, OSError) as e:
+            logger.error("Arelle worker crashed on %s: %s", input_path, e)
+            if worker is not None:
+                worker.stop(kill=True)
+            worker = None
+            raise PoolError(f"worker-crashed: {e}") from e
+        finally:
+            self._slots.put(worker)
+
+    def close(self) -> None:
+        while True:
+            try:
+                worker = self._slots.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.stop()
+
+
+_pool: ArellePool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ArellePool | None:
+    """Return the process-wide pool, or None when ARELLE_POOL_SIZE is 0."""
+    global _pool
+    from django.conf import settings
+
+    if settings.ARELLE_POOL_SIZE <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            plugins = [p.strip() for p in settings.ARELLE_PLUGINS.replace("|", ",").split(",") if p.strip()]
+            _pool = ArellePool(
+                size=settings.ARELLE_POOL_SIZE,
+                entrypoint=settings.VSME_ENTRYPOINT_URL,
+                cache_dir=settings.ARELLE_CACHE_DIR,
+                plugins=plugins,
+                max_jobs=settings.ARELLE_POOL_MAX_JOBS,
+                max_memory_mb=settings.ARELLE_POOL_MAX_MEMORY_MB,
+                timeout=settings.ARELLE_POOL_TIMEOUT,
+            )
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,145 @@
+"""Resumable chunked uploads (`/api/uploads/`).
+
+A session is started with the file name and size; the empty target file is created
+in final storage (reports/original/) right away, and each chunk is streamed from the
+request body straight to its offset in that file. Chunks carry their offset, so a
+retried chunk the server already has is acknowledged without rewriting it and a
+partially received one only appends the missing tail. After a dropped connection the
+client asks for the session's `offset` and resumes from there.
+
+The SHA-256 is updated as chunks arrive. Hash state cannot be stored in the
+database, so it lives in a per-process cache keyed by session and offset; when a
+chunk lands on a process that does not hold it (another worker, a restart), the
+received prefix is re-hashed from disk once and the chain continues from there.
+"""
+import hashlib
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadSession
+
+logger = logging.getLogger(__name__)
+
+COPY_SIZE = 64 * 1024
+
+_lock = threading.Lock()
+# session id -> (offset the digest covers, sha256 object)
+_hashers: LRUCache = LRUCache(maxsize=256)
+
+
+class OffsetMismatch(ValueError):
+    """A chunk starts past the received bytes; `expected` is where the client must resume."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"expected offset {expected}")
+        self.expected = expected
+
+
+def start_session(owner, filename: str, size: int, **metadata) -> UploadSession:
+    """Create a session and its empty target file in final storage."""
+    max_length = UploadSession._meta.get_field("file").max_length
+    name = default_storage.save(f"reports/original/{filename}", ContentFile(b""), max_length=max_length)
+    return UploadSession.objects.create(owner=owner, file=name, filename=filename, size=size, **metadata)
+
+
+def _hasher_at(session: UploadSession):
+    with _lock:
+        cached = _hashers.get(session.id)
+    if cached is not None and cached[0] == session.received:
+        return cached[1].copy()
+    # Another process received the previous chunks: catch up from the bytes on disk
+    hasher = hashlib.sha256()
+    remaining = session.received
+    with open(session.file.path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(COPY_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def _remember(session: UploadSession, hasher) -> None:
+    with _lock:
+        _hashers[session.id] = (session.received, hasher)
+
+
+def append_chunk(session_id: uuid.UUID, owner, offset: int, stream, length: int) -> UploadSession:
+    """Write `length` bytes read from `stream` at `offset`; idempotent for chunks already received.
+
+    Raises UploadSession.DoesNotExist, OffsetMismatch, or ValueError for a chunk past the declared
+    size or a completed session. A short read (client gone) keeps what arrived.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(id=session_id, owner=owner)
+        if session.completed_at is not None:
+            raise ValueError("upload already completed")
+        if offset < 0 or offset > session.received:
+            raise OffsetMismatch(session.received)
+        if offset + length > session.size:
+            raise ValueError("chunk extends past the declared size")
+        if offset + length <= session.received:
+            # Retry of a chunk we already have
+            return session
+
+        hasher = _hasher_at(session)
+        skip = session.received - offset
+        remaining = length
+        with open(session.file.path, "r+b") as f:
+            f.seek(session.received)
+            while remaining > 0:
+                block = stream.read(min(COPY_SIZE, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                if skip:
+                    # Leading bytes of a retried chunk that were already written
+                    dropped = min(skip, len(block))
+                    skip -= dropped
+                    block = block[dropped:]
+                    if not block:
+                        continue
+                f.write(block)
+                hasher.update(block)
+                session.received += len(block)
+            # Drop anything a previous, interrupted write left past the received bytes
+            f.truncate()
+        session.save(update_fields=["received", "updated_at"])
+    _remember(session, hasher)
+    if remaining:
+        logger.info("Upload session %s: chunk cut short at %d/%d bytes", session.id, session.received, session.size)
+    return session
+
+
+def finish_session(session: UploadSession) -> str:
+    """SHA-256 of a fully received upload (from the chunk chain when this process holds it)."""
+    with _lock:
+        cached = _hashers.pop(session.id, None)
+    if cached is not None and cached[0] == session.size:
+        return cached[1].hexdigest()
+    return _hasher_at(session).hexdigest()
+
+
+def purge_expired_sessions() -> int:
+    """Delete unfinished sessions (and their partial files) older than UPLOAD_SESSION_TTL_HOURS."""
+    cutoff = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    expired = list(UploadSession.objects.filter(updated_at__lt=cutoff)[:100])
+    for session in expired:
+        if session.completed_at is None and session.file:
+            # The file of a completed session belongs to its report
+            try:
+                session.file.delete(save=False)
+            except OSError:
+                logger.warning("Failed to delete partial upload %s", session.file.name)
+        session.delete()
+    return len(expired)
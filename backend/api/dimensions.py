@@ -0,0 +1,108 @@
+"""Interned fact dimensions: concept QNames, units and periods.
+
+Facts store small integer ids instead of repeating the same strings on every row.
+Each `Interner` resolves strings to ids in batches (LRU cache first, then one SELECT
+for the misses, then a conflict-tolerant INSERT for anything new), so ingestion costs
+a handful of queries per batch no matter how many facts share a concept.
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.db import transaction
+
+from .models import Concept, Period, Unit
+
+
+class Interner:
+    """Map the `key` field of a dimension model to row ids, creating rows on demand."""
+
+    def __init__(self, model, key: str, maxsize: int, blank_is_null: bool = True) -> None:
+        self.model = model
+        self.key = key
+        # Nullable dimensions map "" to NULL (no id); concepts are required, so "" is a key like any other
+        self.blank_is_null = blank_is_null
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def _lookup(self, keys: Iterable[str]) -> dict[str, int]:
+        return dict(
+            self.model.objects.filter(**{f"{self.key}__in": list(keys)}).values_list(self.key, "id")
+        )
+
+    def resolve(self, keys: Iterable[str], defaults: Callable[[str], dict] | None = None) -> dict[str, int]:
+        """Return {key: id} for `keys` (minus "" for nullable dimensions).
+
+        `defaults(key)` supplies the other fields of rows that have to be created.
+        """
+        wanted = {k for k in keys if k or not self.blank_is_null}
+        ids: dict[str, int] = {}
+        with self._lock:
+            for k in wanted:
+                cached = self._cache.get(k)
+                if cached is not None:
+                    ids[k] = cached
+        missing = wanted - ids.keys()
+        if not missing:
+            return ids
+
+        found = self._lookup(missing)
+        created: dict[str, int] = {}
+        new = missing - found.keys()
+        if new:
+            self.model.objects.bulk_create(
+                [self.model(**{self.key: k, **(defaults(k) if defaults else {})}) for k in new],
+                ignore_conflicts=True,
+            )
+            created = self._lookup(new)
+        resolved = {**found, **created}
+        ids.update(resolved)
+        # Rows inserted (or first seen) inside an open transaction vanish if it rolls back, so they
+        # are cached once it commits; outside a transaction on_commit runs right away
+        transaction.on_commit(lambda: self._remember(resolved))
+        return ids
+
+    def _remember(self, ids: dict[str, int]) -> None:
+        with self._lock:
+            self._cache.update(ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+concepts = Interner(Concept, "qname", settings.FACT_DIMENSION_CACHE_SIZE, blank_is_null=False)
+units = Interner(Unit, "code", settings.FACT_DIMENSION_CACHE_SIZE)
+periods = Interner(Period, "label", settings.FACT_DIMENSION_CACHE_SIZE)
+
+
+# Concepts known to have their datatype stored, so fill_concept_datatypes skips them
+_typed: LRUCache = LRUCache(maxsize=settings.FACT_DIMENSION_CACHE_SIZE)
+_typed_lock = threading.Lock()
+
+
+def fill_concept_datatypes(datatypes: dict[str, str]) -> None:
+    """Store datatypes for concepts created without one, from {qname: datatype} of a batch.
+
+    Concepts first seen in provisional facts (which carry no datatype) are created with "";
+    the datatype Arelle reports later is filled in here, one UPDATE per distinct datatype.
+    """
+    with _typed_lock:
+        pending = {q: d for q, d in datatypes.items() if d and q not in _typed}
+    if not pending:
+        return
+    by_datatype: dict[str, list[str]] = defaultdict(list)
+    for qname, datatype in pending.items():
+        by_datatype[datatype].append(qname)
+    for datatype, qnames in by_datatype.items():
+        Concept.objects.filter(qname__in=qnames, datatype="").update(datatype=datatype)
+
+    def remember() -> None:
+        with _typed_lock:
+            _typed.update(dict.fromkeys(pending, True))
+
+    transaction.on_commit(remember)
@@ -0,0 +1,234 @@
+"""Pre-rendered inline viewer documents (`report_document`).
+
+The viewer HTML of an upload — the primary page of an IXDS ZIP with a `<base>` tag
+pointing at the asset endpoint, or a plain (X)HTML upload as stored — is rendered
+once, after validation or on first view, and written next to the uploads under
+MEDIA_ROOT/reports/rendered/<report id>/ as `<digest>.html` plus gzip and (when the
+`brotli` package is installed) brotli variants. The digest of the rendered bytes
+names the files and is the strong ETag, so repeat views are a 304 or a sendfile of
+the precompressed variant the client accepts.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from .models import Report
+from .sendfile import file_response
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/html; charset=utf-8"
+
+_XML_ENCODING = re.compile(rb'\s*<\?xml[^>]*?\bencoding\s*=\s*["\']([A-Za-z0-9._-]+)["\']')
+
+# Content-Encoding -> file suffix, in order of preference
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+@dataclass(frozen=True)
+class RenderedDocument:
+    report_id: int
+    digest: str
+    encodings: tuple[str, ...]
+
+    def name(self, encoding: str = "") -> str:
+        """Storage name (relative to MEDIA_ROOT) of the variant for `encoding` ("" for identity)."""
+        suffix = dict(_ENCODINGS).get(encoding, "")
+        return f"{_rendered_dir(self.report_id)}/{self.digest}.html{suffix}"
+
+    def etag(self, encoding: str = "") -> str:
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+
+def _rendered_dir(report_id: int) -> str:
+    return f"reports/rendered/{report_id}"
+
+
+def _media_path(name: str) -> str:
+    return os.path.join(settings.MEDIA_ROOT, name)
+
+
+def inject_base_tag(html: str, base_href: str) -> str:
+    """Insert a <base> tag into <head> to make relative links resolve via base_href."""
+    try:
+        idx = html.lower().find('<head')
+        if idx == -1:
+            # No head; prepend base and return
+            return f'<head><base href="{base_href}" /></head>' + html
+        # find end of <head ...>
+        end = html.find('>', idx)
+        if end == -1:
+            return html
+        return html[: end + 1] + f'\n<base href="{base_href}" />\n' + html[end + 1 :]
+    except Exception:
+        return html
+
+
+def _decode(raw: bytes) -> str:
+    """Text of an uploaded document: its declared XML encoding, else UTF-8, else latin-1."""
+    match = _XML_ENCODING.match(raw)
+    declared = match.group(1).decode('ascii') if match else None
+    for encoding in filter(None, (declared, 'utf-8')):
+        try:
+            return raw.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return raw.decode('latin-1', errors='replace')
+
+
+def render_html(report: Report) -> bytes | None:
+    """Viewer HTML for the report's upload (re-encoded as UTF-8), or None if it has no viewable document.
+
+    Raises FileNotFoundError / zipfile.BadZipFile for a missing or corrupt upload.
+    """
+    path = report.original_file.path
+    lower = path.lower()
+    if lower.endswith(('.xhtml', '.html')):
+        # Served as stored apart from the encoding, which must match CONTENT_TYPE
+        with open(path, 'rb') as f:
+            return _decode(f.read()).encode('utf-8')
+    if not lower.endswith('.zip'):
+        return None
+    with zipfile.ZipFile(path, 'r') as zf:
+        # choose first .xhtml/.html entry
+        names = sorted(n for n in zf.namelist() if n.lower().endswith(('.xhtml', '.html')))
+        if not names:
+            return None
+        raw = zf.read(names[0])
+    # insert <base> so relative links resolve via asset endpoint
+    return inject_base_tag(_decode(raw), f"/api/reports/{report.id}/asset/").encode('utf-8')
+
+
+def _compress(html: bytes, encoding: str) -> bytes | None:
+    if encoding == "gzip":
+        # Fixed mtime keeps the output (and its Content-Length) reproducible
+        return gzip.compress(html, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return None
+    # Quality 5 rather than the default 11: close in size, an order of magnitude faster
+    return brotli.compress(html, mode=brotli.MODE_TEXT, quality=5)
+
+
+def _write(path: str, data: bytes) -> None:
+    # Write-then-rename so concurrent renders never expose a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def prerender(report: Report) -> RenderedDocument | None:
+    """Render the viewer document and store it with its compressed variants."""
+    html = render_html(report)
+    if html is None:
+        return None
+    digest = hashlib.sha256(html).hexdigest()[:32]
+    doc = RenderedDocument(report.id, digest, ())
+    os.makedirs(_media_path(_rendered_dir(report.id)), exist_ok=True)
+    encodings = []
+    for encoding, _suffix in _ENCODINGS:
+        data = _compress(html, encoding)
+        if data is not None and len(data) < len(html):
+            _write(_media_path(doc.name(encoding)), data)
+            encodings.append(encoding)
+    # The identity file goes last: its presence marks the render as complete
+    _write(_media_path(doc.name()), html)
+    _remove_stale(report.id, digest)
+    logger.info("Rendered viewer document for report id=%s (%d bytes, %s)", report.id, len(html), encodings)
+    return RenderedDocument(report.id, digest, tuple(encodings))
+
+
+def _remove_stale(report_id: int, digest: str) -> None:
+    directory = _media_path(_rendered_dir(report_id))
+    for entry in os.scandir(directory):
+        if not entry.name.startswith(digest + "."):
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def stored(report: Report) -> RenderedDocument | None:
+    """The stored render of the report's current upload, if any (one directory listing, two stats)."""
+    directory = _media_path(_rendered_dir(report.id))
+    try:
+        names = {entry.name for entry in os.scandir(directory)}
+    except FileNotFoundError:
+        return None
+    for name in names:
+        if not name.endswith(".html"):
+            continue
+        # Re-render when the upload was replaced after this render
+        if os.stat(os.path.join(directory, name)).st_mtime_ns < os.stat(report.original_file.path).st_mtime_ns:
+            return None
+        encodings = tuple(e for e, suffix in _ENCODINGS if name + suffix in names)
+        return RenderedDocument(report.id, name[: -len(".html")], encodings)
+    return None
+
+
+def get_document(report: Report) -> RenderedDocument | None:
+    """Stored render of the report's document, rendering it on first access."""
+    return stored(report) or prerender(report)
+
+
+def delete_rendered(report_id: int) -> None:
+    shutil.rmtree(_media_path(_rendered_dir(report_id)), ignore_errors=True)
+
+
+def _accepted(request: HttpRequest) -> set[str]:
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def document_response(request: HttpRequest, doc: RenderedDocument) -> HttpResponse:
+    """Conditional response for a rendered document, in the best encoding the client accepts."""
+    accepted = _accepted(request)
+    encoding = next((e for e in doc.encodings if e in accepted or "*" in accepted), "")
+    headers = {
+        "ETag": doc.etag(encoding),
+        "Vary": "Accept-Encoding",
+        # Revalidate on every view; unchanged documents cost a 304
+        "Cache-Control": "private, no-cache",
+    }
+    # Every variant carries the same document, so any of its tags validates
+    tags = {doc.etag(e) for e in ("", *doc.encodings)}
+    if tags & {t.strip() for t in request.headers.get("If-None-Match", "").split(",")}:
+        return HttpResponse(status=304, headers=headers)
+
+    response = file_response(
+        doc.name(encoding),
+        as_attachment=False,
+        filename=f"report_{doc.report_id}.html",
+        content_type=CONTENT_TYPE,
+    )
+    for header, value in headers.items():
+        response[header] = value
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return response
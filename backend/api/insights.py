@@ -0,0 +1,172 @@
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Exists, Max, OuterRef, Q, Sum
+from .models import Report, VsmeRegister
+
+logger = logging.getLogger(__name__)
+
+_VERSION_KEY = "insights:data_version"
+
+# (kpi name, unit field, value field, canonical field, target unit)
+_KPI_FIELDS = [
+    ("ghg_total", "ghg_total_unit", "ghg_total_value", "ghg_total_tco2e", "tCO₂e"),
+    ("energy", "energy_consumption_unit", "energy_consumption_value", "energy_mwh", "MWh"),
+    ("waste", "waste_generated_unit", "waste_generated_value", "waste_generated_t", "t"),
+    ("water", "water_withdrawal_unit", "water_withdrawal_value", "water_withdrawal_m3", "m³"),
+]
+
+
+def data_version() -> int:
+    """Current version of the data behind the insights; part of every cache key."""
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, 1, timeout=None)
+        version = cache.get(_VERSION_KEY, 1)
+    return version
+
+
+def bump_data_version() -> None:
+    """Invalidate all cached insights (called when reports or register rows change)."""
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.add(_VERSION_KEY, 2, timeout=None)
+    except Exception:
+        logger.exception("Failed to bump insights data version")
+
+
+def cached_portfolio_insights(user) -> dict:
+    """Return `portfolio_insights(user)`, served from the cache while the data version is unchanged."""
+    key = f"insights:v{data_version()}:user:{user.id}"
+    data = cache.get(key)
+    if data is None:
+        data = portfolio_insights(user)
+        cache.set(key, data, timeout=settings.INSIGHTS_CACHE_TTL)
+    return data
+
+
+def portfolio_insights(user) -> dict:
+    """Aggregate the user's portfolio with grouped SQL over the exact (company, year) pairs they reported."""
+    user_reports = Report.objects.filter(owner=user, status=Report.Status.VALIDATED)
+    tiles = user_reports.aggregate(
+        companies_count=Count("company", distinct=True),
+        validated_reports_count=Count("id"),
+        latest_submission=Max("updated_at"),
+    )
+
+    if not tiles["validated_reports_count"]:
+        return {
+            "status_tiles": {
+                "companies_count": 0,
+                "validated_reports_count": 0,
+                "latest_submission": None,
+                "portfolio_completeness": 0.0,
+            },
+            "kpi_trends": {
+                "ghg_by_year": [],
+                "energy_by_year": [],
+                "waste_by_year": [],
+                "ghg_per_employee": [],
+            },
+            "quality_snapshot": {
+                "units_analysis": {},
+                "portfolio_completeness": 0.0,
+                "distribution_data": None,
+            },
+        }
+
+    register_qs = VsmeRegister.objects.filter(
+        Exists(user_reports.filter(company_id=OuterRef("company_id"), reporting_year=OuterRef("year")))
+    )
+
+    # Completeness plus reported/normalized counts per KPI in one query
+    counts = {}
+    for kpi, _unit_field, value_field, canonical_field, _target in _KPI_FIELDS:
+        counts[f"{kpi}_reported"] = Count("id", filter=Q(**{f"{value_field}__isnull": False}))
+        counts[f"{kpi}_normalized"] = Count(
+            "id", filter=Q(**{f"{value_field}__isnull": False, f"{canonical_field}__isnull": False})
+        )
+    totals = register_qs.aggregate(avg_comp=Avg("completeness_score"), **counts)
+    portfolio_completeness = round(float(totals["avg_comp"] or 0), 1)
+
+    # KPI trends: sums of the canonical-unit columns per year
+    yearly = list(
+        register_qs.values("year")
+        .annotate(
+            ghg_total=Sum("ghg_total_tco2e"),
+            energy=Sum("energy_mwh"),
+            waste=Sum("waste_generated_t"),
+            employees=Sum("employees_value"),
+        )
+        .order_by("year")
+    )
+    ghg_by_year = [{"year": r["year"], "value": float(r["ghg_total"] or 0)} for r in yearly]
+    energy_by_year = [{"year": r["year"], "value": float(r["energy"] or 0)} for r in yearly]
+    waste_by_year = [{"year": r["year"], "value": float(r["waste"] or 0)} for r in yearly]
+    ghg_per_employee = [
+        {"year": r["year"], "value": float((r["ghg_total"] or 0) / r["employees"])}
+        for r in yearly
+        if r["employees"] and r["employees"] > 0
+    ]
+
+    # Quality snapshot: unit consistency from per-unit counts
+    units_analysis = {}
+    for kpi, unit_field, _value_field, _canonical_field, target_unit in _KPI_FIELDS:
+        unit_counts = list(
+            register_qs.exclude(**{unit_field: ""})
+            .values_list(unit_field)
+            .annotate(n=Count("id"))
+            .order_by("-n", unit_field)
+        )
+        with_unit = sum(n for _, n in unit_counts)
+        if with_unit:
+            most_common_unit, most_common_count = unit_counts[0]
+            unit_consistency = round((most_common_count / with_unit) * 100, 1)
+            status = "OK" if unit_consistency >= 90 else "Mixed"
+        else:
+            most_common_unit = "N/A"
+            unit_consistency = 0
+            status = "No data"
+        reported = totals[f"{kpi}_reported"]
+        units_analysis[kpi] = {
+            "target_unit": target_unit,
+            "most_common_unit": most_common_unit,
+            "consistency_pct": unit_consistency,
+            "status": status,
+            # Share of reported values converted to target_unit (and therefore included in the trends)
+            "normalized_pct": round((totals[f"{kpi}_normalized"] / reported) * 100, 1) if reported else 0,
+        }
+
+    # Distribution chart data (GHG for latest year with ≥5 companies)
+    distribution_data = None
+    if yearly:
+        latest_year = yearly[-1]["year"]
+        ghg_values = list(
+            register_qs.filter(year=latest_year, ghg_total_tco2e__isnull=False)
+            .values_list("ghg_total_tco2e", flat=True)
+        )
+        if len(ghg_values) >= 5:
+            values = [float(v) for v in ghg_values if v]
+            distribution_data = {"year": latest_year, "values": values, "count": len(values)}
+
+    latest = tiles["latest_submission"]
+    return {
+        "status_tiles": {
+            "companies_count": tiles["companies_count"],
+            "validated_reports_count": tiles["validated_reports_count"],
+            "latest_submission": latest.isoformat() if latest else None,
+            "portfolio_completeness": portfolio_completeness,
+        },
+        "kpi_trends": {
+            "ghg_by_year": ghg_by_year,
+            "energy_by_year": energy_by_year,
+            "waste_by_year": waste_by_year,
+            "ghg_per_employee": ghg_per_employee if len(ghg_per_employee) >= 2 else [],
+        },
+        "quality_snapshot": {
+            "units_analysis": units_analysis,
+            "portfolio_completeness": portfolio_completeness,
+            "distribution_data": distribution_data,
+        },
+    }
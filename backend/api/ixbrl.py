@@ -0,0 +1,464 @@
+"""Inline XBRL vocabulary and readers: upload pre-flight, header metadata and native fact extraction."""
+import html
+import logging
+import multiprocessing
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterable, Iterator
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+IX_NAMESPACES = frozenset({
+    "http://www.xbrl.org/2013/inlineXBRL",
+    "http://www.xbrl.org/2008/inlineXBRL",
+})
+XBRLI_NS = "http://www.xbrl.org/2003/instance"
+XBRLDI_NS = "http://xbrl.org/2006/xbrldi"
+LINK_NS = "http://www.xbrl.org/2003/linkbase"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+INLINE_SUFFIXES = (".xhtml", ".html", ".htm")
+
+
+def ix_local_name(tag) -> str | None:
+    """Local name of an element in an iXBRL namespace (`header` for `{...inlineXBRL}header`), else None."""
+    if not isinstance(tag, str) or not tag.startswith("{"):
+        return None
+    ns, _, local = tag[1:].partition("}")
+    return local if ns in IX_NAMESPACES else None
+
+
+def is_inline_name(name: str) -> bool:
+    return name.lower().endswith(INLINE_SUFFIXES)
+
+
+def inline_members(archive: zipfile.ZipFile) -> list[str]:
+    """Names of the candidate inline documents in an IXDS ZIP, sorted; package metadata is skipped."""
+    return sorted(
+        info.filename
+        for info in archive.infolist()
+        if not info.is_dir() and is_inline_name(info.filename) and "META-INF/" not in info.filename
+    )
+
+
+@dataclass(frozen=True)
+class Context:
+    id: str
+    scheme: str
+    identifier: str
+    # ISO dates as written; an instant has only `instant`, a forever period none of them
+    start: str = ""
+    end: str = ""
+    instant: str = ""
+    # True when the context has a segment or scenario (dimensional qualifiers)
+    qualified: bool = False
+    # (dimension QName, member QName or typed value) pairs from the segment/scenario
+    dimensions: tuple[tuple[str, str], ...] = ()
+
+
+def _text(elem, path: str) -> str:
+    found = elem.find(path)
+    return (found.text or "").strip() if found is not None else ""
+
+
+def _members(elem) -> tuple[tuple[str, str], ...]:
+    members = []
+    for container in (
+        elem.find(f"{{{XBRLI_NS}}}entity/{{{XBRLI_NS}}}segment"),
+        elem.find(f"{{{XBRLI_NS}}}scenario"),
+    ):
+        if container is None:
+            continue
+        for member in container.iter(f"{{{XBRLDI_NS}}}explicitMember", f"{{{XBRLDI_NS}}}typedMember"):
+            value = (member.text or "") if member.tag.endswith("explicitMember") else "".join(member.itertext())
+            members.append((member.get("dimension", ""), value.strip()))
+    return tuple(members)
+
+
+def parse_context(elem) -> Context:
+    """Context from an `xbrli:context` element."""
+    identifier = elem.find(f"{{{XBRLI_NS}}}entity/{{{XBRLI_NS}}}identifier")
+    return Context(
+        id=elem.get("id", ""),
+        scheme=identifier.get("scheme", "") if identifier is not None else "",
+        identifier=(identifier.text or "").strip() if identifier is not None else "",
+        start=_text(elem, f"{{{XBRLI_NS}}}period/{{{XBRLI_NS}}}startDate"),
+        end=_text(elem, f"{{{XBRLI_NS}}}period/{{{XBRLI_NS}}}endDate"),
+        instant=_text(elem, f"{{{XBRLI_NS}}}period/{{{XBRLI_NS}}}instant"),
+        qualified=(
+            elem.find(f"{{{XBRLI_NS}}}entity/{{{XBRLI_NS}}}segment") is not None
+            or elem.find(f"{{{XBRLI_NS}}}scenario") is not None
+        ),
+        dimensions=_members(elem),
+    )
+
+
+_HEADER_TAGS = tuple(f"{{{ns}}}header" for ns in IX_NAMESPACES)
+_CONTEXT_TAG = f"{{{XBRLI_NS}}}context"
+
+
+def iter_header_contexts(stream: BinaryIO) -> Iterator[Context]:
+    """Contexts of the first `ix:header` in an inline document, streamed with iterparse.
+
+    Parsing stops at the end of that header, which normally sits at the top of the body,
+    so only a small prefix of the document is read.
+    """
+    events = etree.iterparse(
+        stream,
+        events=("end",),
+        tag=(_CONTEXT_TAG, *_HEADER_TAGS),
+        recover=True,
+        resolve_entities=False,
+        no_network=True,
+        huge_tree=True,
+    )
+    try:
+        for _event, elem in events:
+            if elem.tag == _CONTEXT_TAG:
+                yield parse_context(elem)
+                elem.clear()
+            else:
+                return
+    except etree.XMLSyntaxError:
+        return
+
+
+def reporting_context(contexts: Iterable[Context]) -> Context | None:
+    """The context that best represents the report's period.
+
+    Non-dimensional durations win, latest end first, then the longest; without any,
+    the latest instant. Falls back to the first context.
+    """
+    contexts = list(contexts)
+    plain = [c for c in contexts if not c.qualified] or contexts
+    durations = [c for c in plain if c.start and c.end]
+    if durations:
+        return max(durations, key=lambda c: (c.end, -_ordinal(c.start)))
+    instants = [c for c in plain if c.instant]
+    if instants:
+        return max(instants, key=lambda c: c.instant)
+    return contexts[0] if contexts else None
+
+
+def _ordinal(value: str) -> int:
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except ValueError:
+        return 0
+
+
+# --- Fact extraction -------------------------------------------------------------
+
+XSI_NIL = "{http://www.w3.org/2001/XMLSchema-instance}nil"
+_UNIT_TAG = f"{{{XBRLI_NS}}}unit"
+
+# ix elements whose content is read at their end tag, so their subtree must not be cleared early
+_CONTENT_ELEMENTS = {"nonFraction", "nonNumeric", "continuation"}
+
+# Numeric ixt transformations by normalised local name (ixt v1-v5 spellings)
+_DOT_DECIMAL = {"numdotdecimal", "numdotdecimalin", "numcommadot", "numspacedot", "numspacedotdecimal"}
+_COMMA_DECIMAL = {"numcommadecimal", "numdotcomma", "numspacecomma", "numspacecommadecimal"}
+_UNIT_DECIMAL = {"numunitdecimal", "numunitdecimalin"}
+_ZERO = {"zerodash", "fixedzero", "numdash"}
+_DATE_ORDERS = {
+    "datedaymonthyear": "dmy",
+    "datedoteu": "dmy",
+    "dateslasheu": "dmy",
+    "datemonthdayyear": "mdy",
+    "datedotus": "mdy",
+    "dateslashus": "mdy",
+    "dateyearmonthday": "ymd",
+}
+_FIXED_TEXT = {"fixedempty": "", "fixedfalse": "false", "fixedtrue": "true"}
+# Namespace declarations lxml repeats on every serialised subtree
+_XMLNS = re.compile(r'\s+xmlns(?::[\w.-]+)?="[^"]*"')
+
+
+def _format_name(fmt: str | None) -> str:
+    """`ixt4:num-dot-decimal` -> `numdotdecimal`."""
+    return (fmt or "").rsplit(":", 1)[-1].lower().replace("-", "").replace("_", "")
+
+
+def transform_number(fmt: str | None, text: str) -> Decimal | None:
+    """Value of a nonFraction's text under its `format`; None for formats that are not handled."""
+    name = _format_name(fmt)
+    if name in _ZERO:
+        return Decimal(0)
+    if name in _COMMA_DECIMAL:
+        cleaned = re.sub(r"[^\d,]", "", text).replace(",", ".")
+    elif name in _UNIT_DECIMAL:
+        parts = re.findall(r"\d+", text)
+        cleaned = "".join(parts[:-1]) + "." + parts[-1] if len(parts) > 1 else "".join(parts)
+    elif name in _DOT_DECIMAL or not name:
+        cleaned = re.sub(r"[^\d.]", "", text)
+    else:
+        return None
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+
+def transform_text(fmt: str | None, text: str) -> str:
+    """Value of a nonNumeric's text under its `format` (fixed values and numeric dates); else unchanged."""
+    if not fmt:
+        return text
+    name = _format_name(fmt)
+    if name in _FIXED_TEXT:
+        return _FIXED_TEXT[name]
+    order = _DATE_ORDERS.get(name)
+    if order:
+        parts = dict(zip(order, re.findall(r"\d+", text)))
+        try:
+            year = int(parts["y"])
+            return date(year + 2000 if year < 100 else year, int(parts["m"]), int(parts["d"])).isoformat()
+        except (KeyError, ValueError):
+            return text
+    return text
+
+
+def _plain(number: Decimal) -> str:
+    text = format(number.normalize(), "f")
+    return "0" if text == "-0" else text
+
+
+def _inner_text(elem) -> str:
+    """Text content without `ix:exclude` subtrees."""
+    parts = [elem.text or ""]
+    for child in elem:
+        if isinstance(child.tag, str) and ix_local_name(child.tag) != "exclude":
+            parts.append(_inner_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _inner_markup(elem) -> str:
+    """Escaped (X)HTML content of an `escape="true"` nonNumeric, without `ix:exclude` subtrees."""
+    parts = [html.escape(elem.text or "", quote=False)]
+    for child in elem:
+        if isinstance(child.tag, str) and ix_local_name(child.tag) == "exclude":
+            parts.append(html.escape(child.tail or "", quote=False))
+        else:
+            parts.append(_XMLNS.sub("", etree.tostring(child, encoding="unicode", with_tail=True)))
+    return "".join(parts)
+
+
+def parse_unit(elem) -> str:
+    """OIM unit string of an `xbrli:unit`: measures joined by `*`, a divide as `num/den`."""
+    def measures(parent) -> str:
+        return "*".join((m.text or "").strip() for m in parent.iter(f"{{{XBRLI_NS}}}measure"))
+
+    divide = elem.find(f"{{{XBRLI_NS}}}divide")
+    if divide is None:
+        return measures(elem)
+    numerator = divide.find(f"{{{XBRLI_NS}}}unitNumerator")
+    denominator = divide.find(f"{{{XBRLI_NS}}}unitDenominator")
+    return f"{measures(numerator)}/{measures(denominator)}" if numerator is not None and denominator is not None else ""
+
+
+@dataclass(frozen=True)
+class InlineFact:
+    concept: str
+    context_ref: str
+    unit_ref: str
+    # After transformation, scale and sign; None for a nil fact
+    value: str | None
+    decimals: str = ""
+    # ZIP member the fact was read from ("" for a single-document upload)
+    document: str = ""
+
+
+class InlineReader:
+    """Reads `ix:nonFraction`/`ix:nonNumeric` facts, contexts and units from inline documents.
+
+    Documents are streamed with iterparse and finished subtrees are dropped, so memory
+    follows the facts rather than the markup. The documents of an IXDS are fed to one
+    reader, or to one reader each (see `read_inline`) that are then `merge`d in member
+    order; contexts, units and continuations are shared across the set, so `finish()`
+    runs once at the end. Tuples, ix:fraction and footnotes are not read.
+    """
+
+    def __init__(self):
+        self.contexts: dict[str, Context] = {}
+        self.units: dict[str, str] = {}
+        self.facts: list[InlineFact] = []
+        # nonNumeric facts wait for their continuations: (index in facts, text, format, continuedAt)
+        self._pending: list[tuple[int, str, str | None, str]] = []
+        self._continuations: dict[str, tuple[str, str]] = {}
+
+    def feed(self, stream: BinaryIO, document: str = "") -> None:
+        keep = 0  # open elements whose subtree is read at their end tag
+        for event, elem in etree.iterparse(
+            stream,
+            events=("start", "end"),
+            recover=True,
+            resolve_entities=False,
+            no_network=True,
+            huge_tree=True,
+            remove_comments=True,
+            remove_pis=True,
+        ):
+            tag = elem.tag
+            local = ix_local_name(tag)
+            wanted = local in _CONTENT_ELEMENTS or tag == _CONTEXT_TAG or tag == _UNIT_TAG
+            if event == "start":
+                keep += wanted
+                continue
+            if wanted:
+                keep -= 1
+                if tag == _CONTEXT_TAG:
+                    context = parse_context(elem)
+                    self.contexts[context.id] = context
+                elif tag == _UNIT_TAG:
+                    self.units[elem.get("id", "")] = parse_unit(elem)
+                else:
+                    self._read(local, elem, document)
+            if not keep:
+                elem.clear(keep_tail=True)
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+
+    def _read(self, local: str, elem, document: str) -> None:
+        if local == "continuation":
+            self._continuations[elem.get("id", "")] = (_inner_text(elem), elem.get("continuedAt", ""))
+            return
+        name, context_ref = elem.get("name"), elem.get("contextRef")
+        if not name or not context_ref:
+            return
+        nil = elem.get(XSI_NIL) in ("true", "1")
+        if local == "nonFraction":
+            value = None
+            if not nil:
+                text = "".join(elem.itertext()).strip()
+                number = transform_number(elem.get("format"), text)
+                if number is None:
+                    value = text
+                else:
+                    number = number.scaleb(int(elem.get("scale") or 0))
+                    value = _plain(-number if elem.get("sign") == "-" else number)
+            self.facts.append(
+                InlineFact(name, context_ref, elem.get("unitRef", ""), value, elem.get("decimals", ""), document)
+            )
+            return
+        self.facts.append(InlineFact(name, context_ref, "", None, document=document))
+        if not nil:
+            text = _inner_markup(elem) if elem.get("escape") in ("true", "1") else _inner_text(elem)
+            self._pending.append((len(self.facts) - 1, text, elem.get("format"), elem.get("continuedAt", "")))
+
+    def merge(self, other: "InlineReader") -> None:
+        """Append an unfinished reader of later documents of the same IXDS."""
+        offset = len(self.facts)
+        self.contexts.update(other.contexts)
+        self.units.update(other.units)
+        self.facts.extend(other.facts)
+        self._pending.extend((index + offset, *rest) for index, *rest in other._pending)
+        self._continuations.update(other._continuations)
+
+    def finish(self) -> list[InlineFact]:
+        """Join continuations, apply nonNumeric formats and drop repeats of identical facts.
+
+        A fact repeated in the same or another document of the set (same concept, context,
+        unit, decimals and value) is kept once, at its first occurrence in document order.
+        """
+        for index, text, fmt, continued_at in self._pending:
+            seen = set()
+            while continued_at and continued_at not in seen and continued_at in self._continuations:
+                seen.add(continued_at)
+                more, continued_at = self._continuations[continued_at]
+                text += more
+            self.facts[index] = replace(self.facts[index], value=transform_text(fmt, text))
+        self._pending = []
+        unique = {}
+        for fact in self.facts:
+            unique.setdefault((fact.concept, fact.context_ref, fact.unit_ref, fact.decimals, fact.value), fact)
+        self.facts = list(unique.values())
+        return self.facts
+
+
+def read_member(path: str, member: str) -> InlineReader:
+    """Unfinished reader of one member of the IXDS ZIP at `path` (a process pool task)."""
+    reader = InlineReader()
+    with zipfile.ZipFile(path) as archive, archive.open(member) as doc:
+        reader.feed(doc, member)
+    return reader
+
+
+# One pool per process, shared by the report worker threads and kept across jobs, so the
+# number of extraction interpreters on a node is bounded by the first caller's `workers`
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _member_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned children import only this module (no Django)
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown_member_pool() -> None:
+    """Stop the extraction pool (on worker shutdown, or after it broke)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+
+def _read_members_parallel(path: str, members: list[str], workers: int) -> InlineReader:
+    # Results come back in member order
+    readers = _member_executor(workers).map(read_member, [path] * len(members), members)
+    reader = next(readers)
+    for other in readers:
+        reader.merge(other)
+    return reader
+
+
+def read_inline(source: str | BinaryIO, workers: int = 0, parallel_min_bytes: int = 0) -> InlineReader:
+    """Read an inline document, or every inline document of an IXDS ZIP, into a finished reader.
+
+    With `workers` > 1 and `source` a path, the documents of a ZIP holding several whose
+    uncompressed size adds up to at least `parallel_min_bytes` are parsed on the process's
+    shared extraction pool, one task per document. Only the report worker passes `workers`.
+    """
+    stream = open(source, "rb") if isinstance(source, str) else source
+    try:
+        stream.seek(0)
+        if zipfile.is_zipfile(stream):
+            stream.seek(0)
+            with zipfile.ZipFile(stream) as archive:
+                members = inline_members(archive)
+                size = sum(archive.getinfo(m).file_size for m in members)
+                reader = None
+                if isinstance(source, str) and workers > 1 and len(members) > 1 and size >= parallel_min_bytes:
+                    try:
+                        reader = _read_members_parallel(source, members, workers)
+                    except (OSError, BrokenProcessPool):
+                        logger.warning("Parallel read of %s failed; reading its documents serially", source, exc_info=True)
+                        shutdown_member_pool()
+                if reader is None:
+                    reader = InlineReader()
+                    for member in members:
+                        with archive.open(member) as doc:
+                            reader.feed(doc, member)
+        else:
+            stream.seek(0)
+            reader = InlineReader()
+            reader.feed(stream)
+    finally:
+        if isinstance(source, str):
+            stream.close()
+    reader.finish()
+    return reader
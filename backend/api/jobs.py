@@ -0,0 +1,159 @@
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Report, ProcessingJob
+from .register import recompute_vsme_register
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_report(report_id: int) -> ProcessingJob:
+    """Queue a report for processing by `manage.py run_report_workers`."""
+    job = ProcessingJob.objects.create(
+        report_id=report_id,
+        max_attempts=settings.REPORT_JOB_MAX_ATTEMPTS,
+    )
+    logger.info("Queued processing job id=%s for report id=%s", job.id, report_id)
+    return job
+
+
+def claim_job(worker_id: str) -> ProcessingJob | None:
+    """Lease the next runnable job, or return None if the queue is empty.
+
+    Uses SELECT ... FOR UPDATE SKIP LOCKED so concurrent workers (threads or nodes)
+    never claim the same row. RUNNING jobs whose lease has expired are picked up
+    again; if they already used all attempts they are failed instead.
+    """
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                ProcessingJob.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=ProcessingJob.Status.QUEUED, run_after__lte=now)
+                    | Q(status=ProcessingJob.Status.RUNNING, locked_until__lt=now)
+                )
+                .order_by("run_after", "id")
+                .first()
+            )
+            if job is None:
+                return None
+            if job.status == ProcessingJob.Status.RUNNING and job.attempts >= job.max_attempts:
+                _give_up(job, f"Processing timed out after {job.attempts} attempt(s)")
+                continue
+            job.status = ProcessingJob.Status.RUNNING
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_until = now + timedelta(seconds=settings.REPORT_JOB_VISIBILITY_TIMEOUT)
+            job.save(update_fields=["status", "attempts", "locked_by", "locked_until", "updated_at"])
+            return job
+
+
+def _settle(job: ProcessingJob, **fields) -> bool:
+    """Write the outcome of a running job if `job.locked_by` still holds its lease.
+
+    A worker whose lease expired (and was reclaimed by another) matches no row and
+    leaves the job to the new holder.
+    """
+    updated = ProcessingJob.objects.filter(
+        id=job.id, status=ProcessingJob.Status.RUNNING, locked_by=job.locked_by
+    ).update(locked_until=None, updated_at=timezone.now(), **fields)
+    if not updated:
+        logger.warning("Job id=%s: lease of %s was lost; outcome discarded", job.id, job.locked_by)
+    return bool(updated)
+
+
+def extend_lease(job: ProcessingJob) -> bool:
+    """Push the lease of a running job forward; False once another worker holds it."""
+    return bool(
+        ProcessingJob.objects.filter(
+            id=job.id, status=ProcessingJob.Status.RUNNING, locked_by=job.locked_by
+        ).update(locked_until=timezone.now() + timedelta(seconds=settings.REPORT_JOB_VISIBILITY_TIMEOUT))
+    )
+
+
+def complete_job(job: ProcessingJob) -> None:
+    _settle(job, status=ProcessingJob.Status.DONE, last_error="")
+
+
+def fail_job(job: ProcessingJob, error: str) -> None:
+    """Reschedule a failed attempt with exponential backoff, or give up after max_attempts."""
+    if job.attempts >= job.max_attempts:
+        _give_up(job, error)
+        return
+    delay = settings.REPORT_JOB_RETRY_BACKOFF * (2 ** max(job.attempts - 1, 0))
+    if not _settle(
+        job,
+        status=ProcessingJob.Status.QUEUED,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        last_error=error,
+    ):
+        return
+    logger.warning(
+        "Job id=%s for report id=%s failed (attempt %s/%s); retrying in %ss",
+        job.id, job.report_id, job.attempts, job.max_attempts, delay,
+    )
+
+
+def _give_up(job: ProcessingJob, error: str) -> None:
+    from .processing import _discard_provisional_facts
+
+    with transaction.atomic():
+        if not _settle(job, status=ProcessingJob.Status.FAILED, last_error=error):
+            return
+        report = (
+            Report.objects.select_for_update()
+            .filter(id=job.report_id, status=Report.Status.PROCESSING)
+            .first()
+        )
+        if report is not None:
+            # Like a failed validation: phase-one facts and the register row built from them go too
+            _discard_provisional_facts(report)
+            report.status = Report.Status.FAILED
+            report.failure_reason = error[:1000]
+            report.save(update_fields=["status", "phase", "failure_reason", "updated_at"])
+            recompute_vsme_register(report.company_id, report.reporting_year)
+    logger.error("Job id=%s for report id=%s failed permanently: %s", job.id, job.report_id, error)
+
+
+def _heartbeat(job: ProcessingJob, done: threading.Event) -> None:
+    # Renews the lease while the job runs, so a long Arelle run is not reclaimed by another worker
+    try:
+        while not done.wait(settings.REPORT_JOB_HEARTBEAT_INTERVAL):
+            try:
+                if not extend_lease(job):
+                    logger.warning("Job id=%s: lease lost to another worker", job.id)
+                    return
+            except Exception:
+                logger.exception("Failed to extend lease of job id=%s", job.id)
+    finally:
+        connection.close()
+
+
+def run_job(job: ProcessingJob) -> None:
+    """Run a claimed job; unexpected exceptions are retried with backoff."""
+    from .processing import _process_report_sync
+
+    done = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job, done), name=f"job-{job.id}-heartbeat", daemon=True)
+    heartbeat.start()
+    try:
+        _process_report_sync(job.report_id)
+    except Exception as e:
+        logger.exception("Processing job id=%s raised", job.id)
+        fail_job(job, f"{type(e).__name__}: {e}")
+        return
+    finally:
+        done.set()
+        heartbeat.join()
+    complete_job(job)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from api.models import Report
+from api.register import SUMMARY_VERSION, build_report_summary, match_report_metrics
+
+
+class Command(BaseCommand):
+    help = "Compute and store Report.summary for validated reports that don't have a current one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute summaries that are already stored as well.",
+        )
+
+    def handle(self, *args, **options):
+        reports = Report.objects.filter(status=Report.Status.VALIDATED)
+        if not options["all"]:
+            # Missing, or stored by an older build_report_summary (e.g. without matched concepts)
+            reports = reports.filter(
+                Q(summary__isnull=True) | Q(summary__version__isnull=True) | Q(summary__version__lt=SUMMARY_VERSION)
+            )
+        report_ids = list(reports.order_by("id").values_list("id", flat=True))
+        for done, report_id in enumerate(report_ids, start=1):
+            summary = build_report_summary(*match_report_metrics(report_id))
+            Report.objects.filter(id=report_id).update(summary=summary)
+            if done % 100 == 0:
+                self.stdout.write(f"{done}/{len(report_ids)} reports")
+        self.stdout.write(self.style.SUCCESS(f"Stored summaries for {len(report_ids)} reports"))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.register import rebuild_all_vsme_registers
+
+
+class Command(BaseCommand):
+    help = "Rebuild the VsmeRegister table from the latest VALIDATED report per company-year."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.VSME_REGISTER_REBUILD_WORKERS,
+            help="Worker processes deriving metrics (0 = in-process).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.VSME_REGISTER_REBUILD_CHUNK_SIZE,
+            help="Company-years derived and written per chunk.",
+        )
+
+    def handle(self, *args, **options):
+        def _progress(done: int, total: int) -> None:
+            self.stdout.write(f"{done}/{total} company-years written")
+
+        result = rebuild_all_vsme_registers(
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            progress=_progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Upserted {result['upserted']}, deleted {result['deleted']}"))
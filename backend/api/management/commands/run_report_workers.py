@@ -0,0 +1,87 @@
+import logging
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from api.arelle_pool import close_pool
+from api.ixbrl import shutdown_member_pool
+from api.jobs import claim_job, run_job, default_worker_id
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Process queued reports (Arelle validation + fact ingestion) outside the web tier."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.REPORT_WORKER_CONCURRENCY,
+            help="Number of jobs processed in parallel on this node.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.REPORT_WORKER_POLL_INTERVAL,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is drained instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(options["concurrency"], 1)
+        poll_interval = max(options["poll_interval"], 0.1)
+        burst = options["burst"]
+        stop = threading.Event()
+
+        def _request_stop(signum, _frame):
+            logger.info("Received signal %s; finishing in-flight jobs", signum)
+            stop.set()
+
+        signal.signal(signal.SIGTERM, _request_stop)
+        signal.signal(signal.SIGINT, _request_stop)
+
+        base_id = default_worker_id()
+        threads = [
+            threading.Thread(
+                target=self._loop,
+                args=(f"{base_id}:{i}", stop, poll_interval, burst),
+                name=f"report-worker-{i}",
+            )
+            for i in range(concurrency)
+        ]
+        self.stdout.write(f"Starting {concurrency} report worker(s) as {base_id}")
+        for t in threads:
+            t.start()
+        # Join with a timeout so the main thread keeps receiving signals
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(timeout=1)
+        close_pool()
+        shutdown_member_pool()
+        self.stdout.write("Report workers stopped")
+
+    def _loop(self, worker_id: str, stop: threading.Event, poll_interval: float, burst: bool) -> None:
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                try:
+                    job = claim_job(worker_id)
+                except Exception:
+                    logger.exception("Failed to claim processing job")
+                    stop.wait(poll_interval)
+                    continue
+                if job is None:
+                    if burst:
+                        return
+                    stop.wait(poll_interval)
+                    continue
+                logger.info("Worker %s running job id=%s (report id=%s)", worker_id, job.id, job.report_id)
+                run_job(job)
+        finally:
+            connection.close()
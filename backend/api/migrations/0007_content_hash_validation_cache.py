@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-16 23:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_processing_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the uploaded file', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='ValidationCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_sha256', models.CharField(max_length=64)),
+                ('taxonomy_entrypoint', models.CharField(max_length=512)),
+                ('arelle_version', models.CharField(max_length=64)),
+                ('validation_summary', models.TextField(blank=True)),
+                ('entity', models.CharField(blank=True, max_length=255)),
+                ('reporting_period', models.CharField(blank=True, max_length=255)),
+                ('oim_json_file', models.FileField(blank=True, null=True, upload_to='reports/oim/')),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('source_report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.report')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('content_sha256', 'taxonomy_entrypoint', 'arelle_version'), name='unique_validation_cache_key')],
+            },
+        ),
+    ]
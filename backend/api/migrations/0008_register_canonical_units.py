@@ -0,0 +1,83 @@
+# Generated by Django 5.2 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+def fill_canonical_columns(apps, schema_editor):
+    from api.units import to_canonical
+
+    # (value field, unit field, canonical field, dimension) as of this migration
+    columns = [
+        ("ghg_total_value", "ghg_total_unit", "ghg_total_tco2e", "ghg"),
+        ("ghg_scope1_value", "ghg_scope1_unit", "ghg_scope1_tco2e", "ghg"),
+        ("ghg_scope2_value", "ghg_scope2_unit", "ghg_scope2_tco2e", "ghg"),
+        ("energy_consumption_value", "energy_consumption_unit", "energy_mwh", "energy"),
+        ("water_withdrawal_value", "water_withdrawal_unit", "water_withdrawal_m3", "volume"),
+        ("water_discharge_value", "water_discharge_unit", "water_discharge_m3", "volume"),
+        ("waste_generated_value", "waste_generated_unit", "waste_generated_t", "mass"),
+        ("hazardous_waste_value", "hazardous_waste_unit", "hazardous_waste_t", "mass"),
+        ("non_hazardous_waste_value", "non_hazardous_waste_unit", "non_hazardous_waste_t", "mass"),
+    ]
+    VsmeRegister = apps.get_model("api", "VsmeRegister")
+    rows = []
+    for row in VsmeRegister.objects.all().iterator():
+        for v_field, u_field, c_field, dimension in columns:
+            setattr(row, c_field, to_canonical(getattr(row, v_field), getattr(row, u_field), dimension))
+        rows.append(row)
+    VsmeRegister.objects.bulk_update(rows, [c[2] for c in columns], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_content_hash_validation_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='energy_mwh',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='ghg_scope1_tco2e',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='ghg_scope2_tco2e',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='ghg_total_tco2e',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='hazardous_waste_t',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='non_hazardous_waste_t',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='waste_generated_t',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='water_discharge_m3',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.AddField(
+            model_name='vsmeregister',
+            name='water_withdrawal_m3',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=28, null=True),
+        ),
+        migrations.RunPython(fill_canonical_columns, migrations.RunPython.noop),
+    ]
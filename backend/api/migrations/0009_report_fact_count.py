@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-16 23:36
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_fact_count(apps, schema_editor):
+    Report = apps.get_model("api", "Report")
+    Fact = apps.get_model("api", "Fact")
+    counts = (
+        Fact.objects.filter(report=OuterRef("pk"))
+        .order_by()
+        .values("report")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    Report.objects.update(fact_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_register_canonical_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='fact_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of facts stored at ingest'),
+        ),
+        migrations.RunPython(backfill_fact_count, migrations.RunPython.noop),
+    ]
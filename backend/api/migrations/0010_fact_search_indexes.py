@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# PostgreSQL only: SQLite keeps plain LIKE scans (see api/search.py).
+# Index expressions match what `icontains` emits: UPPER("col"::text) LIKE UPPER(%s).
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS api_fact_concept_trgm "
+    "ON api_fact USING gin ((UPPER(concept::text)) gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS api_fact_value_trgm "
+    "ON api_fact USING gin ((UPPER(value::text)) gin_trgm_ops)",
+    # Full-text vector for text facts; numeric values only contribute their concept name.
+    # Long narrative values are truncated to stay well below the tsvector size limit.
+    "ALTER TABLE api_fact ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "CASE WHEN value ~ '^\\s*[-+]?[0-9][0-9.,eE+-]*\\s*$' "
+    "THEN to_tsvector('simple', concept) "
+    "ELSE to_tsvector('simple', concept || ' ' || left(value, 200000)) END"
+    ") STORED",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS api_fact_search_vector "
+    "ON api_fact USING gin (search_vector)",
+]
+
+BACKWARD_SQL = [
+    "DROP INDEX CONCURRENTLY IF EXISTS api_fact_search_vector",
+    "ALTER TABLE api_fact DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX CONCURRENTLY IF EXISTS api_fact_value_trgm",
+    "DROP INDEX CONCURRENTLY IF EXISTS api_fact_concept_trgm",
+]
+
+
+def _run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return apply
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0009_report_fact_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(BACKWARD_SQL)),
+    ]
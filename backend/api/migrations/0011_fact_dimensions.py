@@ -0,0 +1,65 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# search_vector and the concept trigram index (0010) are built on api_fact.concept,
+# which is replaced by a foreign key to api_concept in 0013.
+DROP_CONCEPT_SEARCH_SQL = [
+    "DROP INDEX IF EXISTS api_fact_search_vector",
+    "ALTER TABLE api_fact DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS api_fact_concept_trgm",
+]
+
+
+def drop_concept_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for sql in DROP_CONCEPT_SEARCH_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_fact_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_concept_search, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='Concept',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('qname', models.CharField(max_length=512, unique=True)),
+                ('datatype', models.CharField(blank=True, max_length=256)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Period',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=256, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Unit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=128, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='fact',
+            name='concept_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='api.concept'),
+        ),
+        migrations.AddField(
+            model_name='fact',
+            name='unit_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='api.unit'),
+        ),
+        migrations.AddField(
+            model_name='fact',
+            name='period_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='api.period'),
+        ),
+    ]
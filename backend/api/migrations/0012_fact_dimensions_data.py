@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def intern_fact_dimensions(apps, schema_editor):
+    """Fill the dimension tables from the existing text columns and point facts at them."""
+    qn = schema_editor.connection.ops.quote_name
+    fact = qn(apps.get_model("api", "Fact")._meta.db_table)
+    concept = qn(apps.get_model("api", "Concept")._meta.db_table)
+    unit = qn(apps.get_model("api", "Unit")._meta.db_table)
+    period = qn(apps.get_model("api", "Period")._meta.db_table)
+    statements = [
+        f"INSERT INTO {concept} (qname, datatype) SELECT concept, MAX(datatype) FROM {fact} GROUP BY concept",
+        f"INSERT INTO {unit} (code) SELECT DISTINCT unit FROM {fact} WHERE unit <> ''",
+        f"INSERT INTO {period} (label) SELECT DISTINCT context FROM {fact} WHERE context <> ''",
+        f"UPDATE {fact} SET "
+        f"concept_ref_id = (SELECT c.id FROM {concept} c WHERE c.qname = {fact}.concept), "
+        f"unit_ref_id = (SELECT u.id FROM {unit} u WHERE u.code = {fact}.unit), "
+        f"period_ref_id = (SELECT p.id FROM {period} p WHERE p.label = {fact}.context)",
+    ]
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_fact_dimensions'),
+    ]
+
+    operations = [
+        migrations.RunPython(intern_fact_dimensions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Recreate the PostgreSQL search structures from 0010 on the new layout:
+# concept matching goes through api_concept, full text covers the fact values.
+CREATE_SEARCH_SQL = [
+    "CREATE INDEX IF NOT EXISTS api_concept_qname_trgm "
+    "ON api_concept USING gin ((UPPER(qname::text)) gin_trgm_ops)",
+    "ALTER TABLE api_fact ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "CASE WHEN value ~ '^\\s*[-+]?[0-9][0-9.,eE+-]*\\s*$' THEN NULL "
+    "ELSE to_tsvector('simple', left(value, 200000)) END"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS api_fact_search_vector ON api_fact USING gin (search_vector)",
+]
+
+
+def create_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for sql in CREATE_SEARCH_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_fact_dimensions_data'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='fact',
+            name='api_fact_report__dffdcc_idx',
+        ),
+        migrations.RemoveField(
+            model_name='fact',
+            name='concept',
+        ),
+        migrations.RemoveField(
+            model_name='fact',
+            name='datatype',
+        ),
+        migrations.RemoveField(
+            model_name='fact',
+            name='unit',
+        ),
+        migrations.RemoveField(
+            model_name='fact',
+            name='context',
+        ),
+        migrations.RenameField(
+            model_name='fact',
+            old_name='concept_ref',
+            new_name='concept',
+        ),
+        migrations.RenameField(
+            model_name='fact',
+            old_name='unit_ref',
+            new_name='unit',
+        ),
+        migrations.RenameField(
+            model_name='fact',
+            old_name='period_ref',
+            new_name='period',
+        ),
+        migrations.AlterField(
+            model_name='fact',
+            name='concept',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='facts', to='api.concept'),
+        ),
+        migrations.AlterField(
+            model_name='fact',
+            name='unit',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='facts', to='api.unit'),
+        ),
+        migrations.AlterField(
+            model_name='fact',
+            name='period',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='facts', to='api.period'),
+        ),
+        migrations.AddIndex(
+            model_name='fact',
+            index=models.Index(fields=['report', 'concept'], name='api_fact_report__7be40b_idx'),
+        ),
+        migrations.RunPython(create_search, migrations.RunPython.noop),
+    ]
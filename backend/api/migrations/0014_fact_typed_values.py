@@ -0,0 +1,64 @@
+# Generated by Django 5.2 on 2026-10-16 23:44
+
+from django.db import migrations, models
+
+# PostgreSQL only: containment queries on taxonomy dimensions (dimensions @> '{"axis": "member"}')
+DIMENSIONS_INDEX_SQL = "CREATE INDEX IF NOT EXISTS api_fact_dimensions_gin ON api_fact USING gin (dimensions jsonb_path_ops)"
+DROP_DIMENSIONS_INDEX_SQL = "DROP INDEX IF EXISTS api_fact_dimensions_gin"
+
+
+def _run(sql):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_fact_dimensions_cleanup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fact',
+            name='dimensions',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fact',
+            name='entity_identifier',
+            field=models.CharField(blank=True, max_length=256),
+        ),
+        migrations.AddField(
+            model_name='fact',
+            name='numeric_value',
+            field=models.DecimalField(blank=True, decimal_places=10, max_digits=38, null=True),
+        ),
+        migrations.AddField(
+            model_name='period',
+            name='is_instant',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='period',
+            name='period_end',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='period',
+            name='period_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='fact',
+            index=models.Index(fields=['concept', 'period'], name='api_fact_concept_533504_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='period',
+            index=models.Index(fields=['period_end', 'period_start'], name='api_period_period__ec7f5c_idx'),
+        ),
+        migrations.RunPython(_run(DIMENSIONS_INDEX_SQL), _run(DROP_DIMENSIONS_INDEX_SQL)),
+    ]
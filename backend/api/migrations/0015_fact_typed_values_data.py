@@ -0,0 +1,55 @@
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def fill_typed_values(apps, schema_editor):
+    """Backfill period bounds, numeric values and entity identifiers for existing facts.
+
+    The original OIM `decimals` and taxonomy dimensions are not stored, so numeric
+    values are taken as written and `dimensions` stays empty until a report is reprocessed.
+    """
+    from api.oim import parse_decimal, period_bounds
+
+    Period = apps.get_model("api", "Period")
+    Fact = apps.get_model("api", "Fact")
+
+    periods = []
+    for period in Period.objects.all().iterator():
+        period.period_start, period.period_end, period.is_instant = period_bounds(period.label)
+        periods.append(period)
+    Period.objects.bulk_update(periods, ["period_start", "period_end", "is_instant"], batch_size=BATCH_SIZE)
+
+    # Numeric facts are the ones with a unit
+    last_id = 0
+    while True:
+        batch = list(
+            Fact.objects.filter(id__gt=last_id, unit__isnull=False)
+            .order_by("id")
+            .only("id", "value")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+        for fact in batch:
+            fact.numeric_value = parse_decimal(fact.value)
+        Fact.objects.bulk_update([f for f in batch if f.numeric_value is not None], ["numeric_value"])
+
+    qn = schema_editor.connection.ops.quote_name
+    fact_table = qn(Fact._meta.db_table)
+    report_table = qn(apps.get_model("api", "Report")._meta.db_table)
+    schema_editor.execute(
+        f"UPDATE {fact_table} SET entity_identifier = COALESCE("
+        f"(SELECT r.entity FROM {report_table} r WHERE r.id = {fact_table}.report_id), '')"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_fact_typed_values'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_typed_values, migrations.RunPython.noop),
+    ]
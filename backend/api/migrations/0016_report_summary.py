@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-16 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_fact_typed_values_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='summary',
+            field=models.JSONField(blank=True, help_text='ESG summary computed at ingest (see register.build_report_summary)', null=True),
+        ),
+    ]
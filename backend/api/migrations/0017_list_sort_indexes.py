@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-16 23:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_report_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='api_report_owner_i_e5cc97_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['owner', 'reporting_year', 'id'], name='api_report_owner_i_4b7d8f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vsmeregister',
+            index=models.Index(fields=['year', 'id'], name='api_vsmereg_year_f844e5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vsmeregister',
+            index=models.Index(fields=['completeness_score', 'id'], name='api_vsmereg_complet_cfff37_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vsmeregister',
+            index=models.Index(fields=['updated_at', 'id'], name='api_vsmereg_updated_bb26cd_idx'),
+        ),
+    ]
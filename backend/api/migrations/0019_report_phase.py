@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-17 00:12
+
+from django.db import migrations, models
+
+
+def backfill_phase(apps, schema_editor):
+    Report = apps.get_model("api", "Report")
+    Report.objects.filter(status="validated").update(phase="validated")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='phase',
+            field=models.CharField(choices=[('pending', 'Pending'), ('provisional', 'Provisional'), ('validated', 'Validated')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(backfill_phase, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 00:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_report_phase'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fact',
+            name='source_document',
+            field=models.CharField(blank=True, max_length=512),
+        ),
+    ]
@@ -1,6 +1,9 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.db import models as dj_models
+from django.utils import timezone
 
 
 class Company(models.Model):
@@ -21,20 +24,30 @@ class Report(models.Model):
         VALIDATED = "validated", "Validated"
         FAILED = "failed", "Failed"
 
+    class Phase(models.TextChoices):
+        # Which facts are in: none yet, the native extractor's provisional ones, or Arelle's
+        PENDING = "pending", "Pending"
+        PROVISIONAL = "provisional", "Provisional"
+        VALIDATED = "validated", "Validated"
+
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reports")
     company = models.ForeignKey(Company, on_delete=models.PROTECT, related_name="reports")
     reporting_year = models.PositiveIntegerField()
     user_report_number = models.PositiveIntegerField(default=1, help_text="Sequential report number per user")
     original_file = models.FileField(upload_to="reports/original/")
     oim_json_file = models.FileField(upload_to="reports/oim/", null=True, blank=True)
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the uploaded file")
 
     entity = models.CharField(max_length=255, blank=True)
     reporting_period = models.CharField(max_length=255, blank=True)
     taxonomy_version = models.CharField(max_length=255, blank=True)
 
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PROCESSING)
+    phase = models.CharField(max_length=20, choices=Phase.choices, default=Phase.PENDING)
     validation_summary = models.TextField(blank=True)
     failure_reason = models.TextField(blank=True)
+    fact_count = models.PositiveIntegerField(default=0, help_text="Number of facts stored at ingest")
+    summary = models.JSONField(null=True, blank=True, help_text="ESG summary computed at ingest (see register.build_report_summary)")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -44,6 +57,11 @@ class Report(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["company", "reporting_year"], name="unique_company_year")
         ]
+        # Keyset pagination of report_list (see views._REPORT_LIST_SORTS)
+        indexes = [
+            models.Index(fields=["owner", "created_at", "id"]),
+            models.Index(fields=["owner", "reporting_year", "id"]),
+        ]
 
     def __str__(self) -> str:
         entity = self.entity or "Unknown entity"
@@ -55,20 +73,135 @@ class Report(models.Model):
         return f"Report #{report_num}{cname}{cy} — {entity} ({period})"
 
 
+class Concept(models.Model):
+    """Interned concept QName; facts reference it by id (see api/dimensions.py)."""
+
+    qname = models.CharField(max_length=512, unique=True)
+    # Fixed per concept by the taxonomy, so it is stored once here rather than per fact
+    datatype = models.CharField(max_length=256, blank=True)
+
+    def __str__(self) -> str:
+        return self.qname
+
+
+class Unit(models.Model):
+    """Interned OIM unit string, e.g. `iso4217:EUR` or `utr:MWh`."""
+
+    code = models.CharField(max_length=128, unique=True)
+
+    def __str__(self) -> str:
+        return self.code
+
+
+class Period(models.Model):
+    """Interned period label (`start to end` or an instant) with its typed bounds.
+
+    Bounds are inclusive calendar dates; an instant has start == end.
+    """
+
+    label = models.CharField(max_length=256, unique=True)
+    period_start = models.DateField(null=True, blank=True)
+    period_end = models.DateField(null=True, blank=True)
+    is_instant = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["period_end", "period_start"]),
+        ]
+
+    def __str__(self) -> str:
+        return self.label
+
+
 class Fact(models.Model):
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name="facts")
-    concept = models.CharField(max_length=512)
+    concept = models.ForeignKey(Concept, on_delete=models.PROTECT, related_name="facts")
     value = models.TextField(blank=True)
-    datatype = models.CharField(max_length=256, blank=True)
-    unit = models.CharField(max_length=128, blank=True)
-    context = models.CharField(max_length=256, blank=True)
+    unit = models.ForeignKey(Unit, on_delete=models.PROTECT, null=True, blank=True, related_name="facts")
+    period = models.ForeignKey(Period, on_delete=models.PROTECT, null=True, blank=True, related_name="facts")
+    # Parsed at ingest (rounded to the fact's OIM `decimals`); null for non-numeric facts
+    numeric_value = models.DecimalField(max_digits=38, decimal_places=10, null=True, blank=True)
+    entity_identifier = models.CharField(max_length=256, blank=True)
+    # Taxonomy-defined dimensions as {axis QName: member}; null when the fact has none
+    dimensions = models.JSONField(null=True, blank=True)
+    # IXDS member the fact was read from; "" for single-document uploads
+    source_document = models.CharField(max_length=512, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @property
+    def datatype(self) -> str:
+        return self.concept.datatype
+
+    @property
+    def unit_code(self) -> str:
+        return self.unit.code if self.unit_id else ""
+
+    @property
+    def context(self) -> str:
+        return self.period.label if self.period_id else ""
+
     class Meta:
         indexes = [
             models.Index(fields=["report", "concept"]),
+            # Cross-report numeric queries: one concept over all reports/periods
+            models.Index(fields=["concept", "period"]),
+        ]
+
+
+class ValidationCache(models.Model):
+    """Arelle result for one upload content, reused when identical bytes are uploaded again."""
+
+    content_sha256 = models.CharField(max_length=64)
+    taxonomy_entrypoint = models.CharField(max_length=512)
+    arelle_version = models.CharField(max_length=64)
+
+    validation_summary = models.TextField(blank=True)
+    entity = models.CharField(max_length=255, blank=True)
+    reporting_period = models.CharField(max_length=255, blank=True)
+    # Shared with the reports that reuse this result; facts are copied from source_report when it still exists
+    oim_json_file = models.FileField(upload_to="reports/oim/", null=True, blank=True)
+    source_report = models.ForeignKey(Report, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_sha256", "taxonomy_entrypoint", "arelle_version"],
+                name="unique_validation_cache_key",
+            )
         ]
 
+    def __str__(self) -> str:
+        return f"ValidationCache {self.content_sha256[:12]} ({self.arelle_version}, {self.hits} hits)"
+
+
+class UploadSession(models.Model):
+    """Chunked upload in progress (see api/chunked.py); chunks are written straight into `file`."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    # Final storage name under reports/original/; becomes the report's original_file on completion
+    file = models.FileField(upload_to="reports/original/")
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+
+    # Report metadata given when the upload started
+    company = models.ForeignKey(Company, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    company_name = models.CharField(max_length=255, blank=True)
+    reporting_year = models.PositiveIntegerField(null=True, blank=True)
+
+    report = models.ForeignKey(Report, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"UploadSession {self.id} ({self.filename}, {self.received}/{self.size})"
+
 
 class VsmeRegister(models.Model):
     company = models.ForeignKey(Company, on_delete=models.PROTECT, related_name="register_rows")
@@ -103,6 +236,17 @@ class VsmeRegister(models.Model):
     non_hazardous_waste_value = models.DecimalField(max_digits=24, decimal_places=6, null=True, blank=True)
     non_hazardous_waste_unit = models.CharField(max_length=64, blank=True)
 
+    # Values converted to canonical units (see api/units.py); NULL when the unit is unknown
+    ghg_total_tco2e = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+    ghg_scope1_tco2e = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+    ghg_scope2_tco2e = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+    energy_mwh = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+    water_withdrawal_m3 = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+    water_discharge_m3 = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+    waste_generated_t = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+    hazardous_waste_t = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+    non_hazardous_waste_t = models.DecimalField(max_digits=28, decimal_places=6, null=True, blank=True)
+
     completeness_score = models.PositiveSmallIntegerField(default=0)  # 0..100 percent
     last_report = models.ForeignKey(Report, on_delete=models.SET_NULL, null=True, blank=True, related_name="register_rows")
     source_concepts = models.JSONField(default=dict, blank=True)
@@ -113,6 +257,44 @@ class VsmeRegister(models.Model):
     class Meta:
         unique_together = ("company", "year")
         ordering = ["company__name", "year"]
+        # Keyset pagination of register_list (see views._REGISTER_LIST_SORTS)
+        indexes = [
+            models.Index(fields=["year", "id"]),
+            models.Index(fields=["completeness_score", "id"]),
+            models.Index(fields=["updated_at", "id"]),
+        ]
 
     def __str__(self) -> str:
         return f"Register {self.company.name} {self.year} ({self.completeness_score}%)"
+
+
+class ProcessingJob(models.Model):
+    """Durable queue entry for background report processing (see `run_report_workers`)."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name="jobs")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Visibility timeout: a RUNNING job whose lease expired is claimable again
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Job #{self.id} report={self.report_id} {self.status} (attempt {self.attempts}/{self.max_attempts})"
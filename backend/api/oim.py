@@ -1,6 +1,10 @@
 import json
 import logging
-from typing import Any, Dict, Iterable, Tuple
+import zipfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +52,14 @@ def _format_entity(dimensions: Dict[str, Any], fact: Dict[str, Any]) -> str:
     return ""
 
 
+def fact_metadata(fact: Dict[str, Any]) -> Tuple[str, str]:
+    """Return (entity, period) for a single OIM fact."""
+    dimensions = fact.get("d") or fact.get("dimensions") or {}
+    entity = _format_entity(dimensions, fact)
+    period = _format_period(dimensions, fact)
+    return entity or "", period or ""
+
+
 def extract_metadata(oim_json: Dict[str, Any]) -> Tuple[str, str]:
     """Return (entity, period) best-effort from the first fact."""
     facts = oim_json.get("facts") or {}
@@ -55,58 +67,224 @@ def extract_metadata(oim_json: Dict[str, Any]) -> Tuple[str, str]:
         for _, fact in facts.items():
             if not isinstance(fact, dict):
                 continue
-            dimensions = fact.get("d") or fact.get("dimensions") or {}
-            entity = _format_entity(dimensions, fact)
-            period = _format_period(dimensions, fact)
-            return entity or "", period or ""
+            return fact_metadata(fact)
     elif isinstance(facts, list):
         for fact in facts:
             if not isinstance(fact, dict):
                 continue
-            dimensions = fact.get("d") or fact.get("dimensions") or {}
-            entity = _format_entity(dimensions, fact)
-            period = _format_period(dimensions, fact)
-            return entity or "", period or ""
+            return fact_metadata(fact)
     return "", ""
 
 
+# Scale of Fact.numeric_value; finer values are rounded, larger ones are not stored
+NUMERIC_DECIMAL_PLACES = 10
+NUMERIC_MAX_DIGITS = 38
+_NUMERIC_LIMIT = Decimal(10) ** (NUMERIC_MAX_DIGITS - NUMERIC_DECIMAL_PLACES)
+
+# OIM core dimensions; everything else in `dimensions` is a taxonomy-defined axis
+_CORE_DIMENSIONS = {"concept", "entity", "period", "unit", "language", "noteId"}
+
+
+def parse_decimal(value: Any, decimals: Any = None) -> Decimal | None:
+    """Parse a numeric fact value, rounded to its OIM `decimals` (None or "INF" keeps it exact).
+
+    Returns None for non-numeric values and for values outside the Fact.numeric_value range.
+    """
+    if value is None:
+        return None
+    s = str(value).strip().replace(",", "")
+    if not s:
+        return None
+    try:
+        dec = Decimal(s)
+    except InvalidOperation:
+        return None
+    if not dec.is_finite():
+        return None
+    places = NUMERIC_DECIMAL_PLACES
+    if decimals is not None and str(decimals).upper() != "INF":
+        try:
+            places = min(int(decimals), NUMERIC_DECIMAL_PLACES)
+        except (TypeError, ValueError):
+            pass
+    if abs(dec) >= _NUMERIC_LIMIT:
+        return None
+    try:
+        if -dec.as_tuple().exponent > places:
+            dec = dec.quantize(Decimal(1).scaleb(-places))
+    except InvalidOperation:
+        return None
+    return dec
+
+
+def _parse_date(value: str, is_end: bool) -> date | None:
+    """Calendar date of an OIM period boundary.
+
+    xBRL-JSON writes ends and instants as the following midnight
+    (`2025-01-01T00:00:00` for 31 Dec 2024); those are moved back one day.
+    """
+    value = value.strip()
+    try:
+        if "T" in value:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            day = moment.date()
+            if is_end and moment.time() == datetime.min.time():
+                day -= timedelta(days=1)
+            return day
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def period_bounds(label: str) -> Tuple[date | None, date | None, bool]:
+    """Return (start, end, is_instant) for a period label from `_format_period`.
+
+    Instants get start == end, so range filters treat both kinds of period alike.
+    """
+    label = (label or "").strip()
+    if not label:
+        return None, None, False
+    for sep in ("/", " to "):
+        if sep in label:
+            start, end = label.split(sep, 1)
+            return _parse_date(start, is_end=False), _parse_date(end, is_end=True), False
+    day = _parse_date(label, is_end=True)
+    return day, day, day is not None
+
+
+def fact_row(fact: Dict[str, Any]) -> Dict[str, Any]:
+    """Simplify one OIM fact into a row.
+
+    Keys: concept, value, datatype, unit, context (period label), numeric_value
+    (Decimal for facts with a unit or `decimals`, else None), entity_identifier,
+    dimensions (taxonomy axes as {axis: member}, or None) and source_document (the
+    IXDS member of a natively read fact, else "").
+    """
+    dimensions = fact.get("d") or fact.get("dimensions") or {}
+    concept = _get(fact, "c", "concept") or _get(dimensions, "concept") or ""
+    value = _get(fact, "v", "value")
+    dtype = _get(fact, "xdt", "datatype", "type") or ""
+    unit = _get(fact, "u", "unit") or _get(dimensions, "unit") or ""
+    context = _format_period(dimensions, fact)
+    decimals = _get(fact, "decimals", "dec")
+    numeric = None
+    if (unit or decimals is not None) and not isinstance(value, (dict, list)):
+        numeric = parse_decimal(value, decimals)
+    # Typed members may come back from ijson as Decimal; keep the JSON column plain strings
+    axes = {
+        str(k): v if isinstance(v, str) else str(v)
+        for k, v in (dimensions.items() if isinstance(dimensions, dict) else ())
+        if k not in _CORE_DIMENSIONS
+    }
+    # Stringify complex values safely
+    if isinstance(value, (dict, list)):
+        try:
+            value = json.dumps(value, ensure_ascii=False, default=str)
+        except Exception:
+            value = str(value)
+    return {
+        "concept": str(concept),
+        "value": "" if value is None else str(value),
+        "datatype": str(dtype),
+        "unit": str(unit),
+        "context": str(context),
+        "numeric_value": numeric,
+        "entity_identifier": _format_entity(dimensions, fact),
+        "dimensions": axes or None,
+        "source_document": str(fact.get("document") or ""),
+    }
+
+
 def extract_facts(oim_json: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
     """Yield simplified fact rows with concept, value, datatype, unit, context."""
     facts = oim_json.get("facts")
     if isinstance(facts, dict):
-        items = facts.items()
+        items = facts.values()
     elif isinstance(facts, list):
-        items = enumerate(facts)
+        items = facts
     else:
         logger.warning("OIM JSON has no 'facts' object")
-        return []
+        return
+    for fact in items:
+        if isinstance(fact, dict):
+            yield fact_row(fact)
 
-    rows = []
-    for _, fact in items:
-        if not isinstance(fact, dict):
-            continue
-        dimensions = fact.get("d") or fact.get("dimensions") or {}
-        concept = _get(fact, "c", "concept") or _get(dimensions, "concept") or ""
-        value = _get(fact, "v", "value")
-        dtype = _get(fact, "xdt", "datatype", "type") or ""
-        unit = _get(fact, "u", "unit") or _get(dimensions, "unit") or ""
-        context = _format_period(dimensions, fact)
-        # Stringify complex values safely
-        if isinstance(value, (dict, list)):
-            try:
-                value = json.dumps(value, ensure_ascii=False)
-            except Exception:
-                value = str(value)
-        rows.append(
-            {
-                "concept": str(concept),
-                "value": "" if value is None else str(value),
-                "datatype": str(dtype),
-                "unit": str(unit),
-                "context": str(context),
-            }
-        )
-    return rows
+
+@contextmanager
+def _open_binary(source: str | BinaryIO) -> Iterator[BinaryIO]:
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield f
+    else:
+        source.seek(0)
+        yield source
+
+
+def _facts_container_type(source: str | BinaryIO) -> str | None:
+    """Return "map" or "array" for the top-level `facts` member, reading only up to it."""
+    import ijson
+
+    with _open_binary(source) as f:
+        for prefix, event, _ in ijson.parse(f):
+            if prefix == "facts":
+                if event == "start_map":
+                    return "map"
+                if event == "start_array":
+                    return "array"
+                return None
+    return None
+
+
+def is_oim_json_file(source: str | BinaryIO) -> bool:
+    """Cheap check for OIM JSON with a top-level `facts` object; parsing stops at `facts`.
+
+    `source` is a file path or a seekable binary stream.
+    """
+    try:
+        import ijson  # noqa: F401
+    except ImportError:
+        try:
+            with _open_binary(source) as f:
+                data = json.load(f)
+            return isinstance(data, dict) and isinstance(data.get("facts"), (dict, list))
+        except Exception:
+            return False
+    try:
+        return _facts_container_type(source) is not None
+    except Exception:
+        return False
+
+
+def iter_oim_facts(source: str | BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Yield raw OIM fact dicts one at a time from a file path or seekable binary stream.
+
+    Uses ijson so memory stays flat regardless of the number of facts; falls back
+    to loading the whole document when ijson is not installed.
+    """
+    try:
+        import ijson
+    except ImportError:
+        with _open_binary(source) as f:
+            data = json.load(f)
+        facts = data.get("facts") if isinstance(data, dict) else None
+        items = facts.values() if isinstance(facts, dict) else facts or []
+        for fact in items:
+            if isinstance(fact, dict):
+                yield fact
+        return
+
+    kind = _facts_container_type(source)
+    if kind is None:
+        logger.warning("OIM JSON has no 'facts' object")
+        return
+    with _open_binary(source) as f:
+        if kind == "map":
+            stream = (fact for _, fact in ijson.kvitems(f, "facts", use_float=False))
+        else:
+            stream = ijson.items(f, "facts.item", use_float=False)
+        for fact in stream:
+            if isinstance(fact, dict):
+                yield fact
 
 
 def extract_reporting_year_from_period(reporting_period: str) -> int | None:
@@ -129,28 +307,99 @@ def extract_reporting_year_from_period(reporting_period: str) -> int | None:
     return None
 
 
-def quick_extract_metadata_from_file(file_path: str) -> Tuple[str, str, int | None]:
+def _oim_boundary(value: str, is_end: bool) -> str:
+    # Date-only ends and instants become the following midnight, as in xBRL-JSON
+    if "T" in value:
+        return value
+    try:
+        day = date.fromisoformat(value[:10])
+    except ValueError:
+        return value
+    if is_end:
+        day += timedelta(days=1)
+    return f"{day.isoformat()}T00:00:00"
+
+
+def _oim_period(context) -> str:
+    """Period of an iXBRL context in the xBRL-JSON form Arelle writes, so ingest derives the same year."""
+    if context.start and context.end:
+        return f"{_oim_boundary(context.start, False)}/{_oim_boundary(context.end, True)}"
+    if context.instant:
+        return _oim_boundary(context.instant, True)
+    return ""
+
+
+def _header_contexts(f: BinaryIO) -> list:
+    from .ixbrl import inline_members, iter_header_contexts
+
+    if not zipfile.is_zipfile(f):
+        f.seek(0)
+        return list(iter_header_contexts(f))
+    with zipfile.ZipFile(f) as archive:
+        for member in inline_members(archive):
+            with archive.open(member) as doc:
+                contexts = list(iter_header_contexts(doc))
+            if contexts:
+                return contexts
+    return []
+
+
+def quick_extract_metadata_from_file(source: str | BinaryIO) -> Tuple[str, str, int | None]:
     """
     Quick extraction of entity, period, and year from an uploaded file.
-    Returns (entity_name, reporting_period, reporting_year).
-    This is a best-effort approach for pre-processing validation.
+    Returns (entity_identifier, reporting_period, reporting_year).
+
+    `source` is a path or seekable binary file (.xhtml/.html or IXDS ZIP). Only the contexts of
+    the first `ix:header` are parsed (streamed with lxml), so this takes milliseconds and runs
+    at upload time; Arelle's output replaces the values once the report is validated.
     """
+    from .ixbrl import reporting_context
+
     try:
-        import tempfile
-        import os
-        import shutil
-        
-        # We'll attempt a simpler approach - try to avoid the full Arelle processing for now
-        # and fallback to a basic filename/content analysis
-        
-        # For now, return empty values to prevent processing errors
-        # The full processing will still extract this information later
-        logger.info("Quick metadata extraction skipped for file: %s", file_path)
-        return "", "", None
-        
+        with _open_binary(source) as f:
+            context = reporting_context(_header_contexts(f))
+        if context is None:
+            return "", "", None
+        period = _oim_period(context)
+        return context.identifier, period, extract_reporting_year_from_period(period)
     except Exception as e:
         logger.warning("Quick metadata extraction failed: %s", e)
-    
+    finally:
+        if not isinstance(source, str):
+            source.seek(0)
+
     return "", "", None
 
 
+
+
+def inline_facts(source: str | BinaryIO, workers: int = 0, parallel_min_bytes: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    OIM-shaped facts read natively from an iXBRL upload (.xhtml/.html or IXDS ZIP), for `fact_row`.
+
+    Values are transformed, scaled and signed as the inline spec prescribes and periods use the
+    form Arelle writes, so the provisional rows line up with the ones validation ingests later.
+    Each fact carries the ZIP member it came from as `document`; `workers` and
+    `parallel_min_bytes` are passed to `ixbrl.read_inline`.
+    """
+    from .ixbrl import read_inline
+
+    reader = read_inline(source, workers, parallel_min_bytes)
+    for fact in reader.facts:
+        context = reader.contexts.get(fact.context_ref)
+        if context is None:
+            continue
+        dimensions: Dict[str, Any] = {
+            "concept": fact.concept,
+            "entity": context.identifier,
+            "period": _oim_period(context),
+        }
+        unit = reader.units.get(fact.unit_ref, "")
+        # xBRL-JSON leaves the unit dimension off pure facts
+        if unit and unit.rsplit(":", 1)[-1] != "pure":
+            dimensions["unit"] = unit
+        dimensions.update(context.dimensions)
+        item: Dict[str, Any] = {"value": fact.value, "dimensions": dimensions, "document": fact.document}
+        if fact.decimals and fact.decimals != "INF":
+            item["decimals"] = fact.decimals
+        yield item
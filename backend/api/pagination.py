@@ -0,0 +1,95 @@
+import base64
+import json
+from typing import Any, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(position: dict[str, Any], reverse: bool = False) -> str:
+    """Opaque, URL-safe cursor for a keyset position; `reverse` marks a "previous page" cursor."""
+    payload = {"p": position, "r": 1 if reverse else 0}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[dict[str, Any], bool]:
+    """Return (position, reverse) from `encode_cursor` output; raises ValueError on bad input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        position = payload["p"]
+        reverse = bool(payload.get("r"))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(position, dict):
+        raise ValueError("invalid cursor")
+    return position, reverse
+
+
+def _field_name(field: str) -> str:
+    return field.lstrip("-")
+
+
+def _row_value(row, name: str) -> Any:
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _after(ordering: Sequence[str], position: dict[str, Any], reverse: bool) -> Q:
+    """Rows strictly after `position` in `ordering` (before it when `reverse`).
+
+    Expands the row comparison (a, b, id) > (x, y, z) into
+    a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z), per-field direction aware.
+    """
+    condition = Q()
+    equal = Q()
+    for field in ordering:
+        name = _field_name(field)
+        op = "gt" if (not field.startswith("-")) != reverse else "lt"
+        condition |= equal & Q(**{f"{name}__{op}": position[name]})
+        equal &= Q(**{name: position[name]})
+    return condition
+
+
+def keyset_page(
+    qs, ordering: Sequence[str], cursor: str | None, page_size: int
+) -> tuple[list, str | None, str | None]:
+    """One page of `qs` in `ordering`, positioned by `cursor`. Returns (rows, next_cursor, prev_cursor).
+
+    `ordering` must end in a unique field (normally `id`) and its fields must be
+    non-null. Rows can be model instances or `.values()` dicts that include every
+    ordering field. Each page is a range scan on an index matching `ordering`, so
+    deep pages cost the same as the first.
+    """
+    names = [_field_name(f) for f in ordering]
+    reverse = False
+    if cursor:
+        position, reverse = decode_cursor(cursor)
+        if any(name not in position for name in names):
+            raise ValueError("invalid cursor")
+        try:
+            qs = qs.filter(_after(ordering, position, reverse))
+        except (TypeError, ValueError, ValidationError) as e:
+            raise ValueError("invalid cursor") from e
+    if reverse:
+        ordering = [name if field.startswith("-") else f"-{name}" for field, name in zip(ordering, names)]
+    rows = list(qs.order_by(*ordering)[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+    # A previous-page cursor was issued from a later page, and a next-page cursor from an earlier one
+    has_next = has_more if not reverse else True
+    has_prev = has_more if reverse else bool(cursor)
+    first = {name: _row_value(rows[0], name) for name in names}
+    last = {name: _row_value(rows[-1], name) for name in names}
+    next_cursor = encode_cursor(last) if has_next else None
+    prev_cursor = encode_cursor(first, reverse=True) if has_prev else None
+    return rows, next_cursor, prev_cursor
+
+
+def id_keyset_page(qs, cursor: str | None, page_size: int) -> tuple[list, str | None, str | None]:
+    """`keyset_page` ordered by id alone (`id > x ORDER BY id LIMIT n`)."""
+    return keyset_page(qs, ["id"], cursor, page_size)
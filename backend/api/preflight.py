@@ -0,0 +1,157 @@
+"""Cheap pre-flight triage of uploads, run before a report is created or handed to Arelle.
+
+- (X)HTML without an iXBRL namespace URI anywhere is rejected by a byte scan;
+  otherwise it is fed in blocks to an incremental lxml parser (a target, so no tree
+  is built) until an `ix:header` shows up, which for a plausible filing is within
+  the first few blocks. Markup lxml cannot parse falls back to a byte scan.
+- ZIPs are judged from the central directory alone (entry count, total uncompressed
+  size, per-entry compression ratio, encryption, unsafe paths) before any member is
+  inflated; then their inline documents are scanned the same way until one qualifies.
+
+Failures raise `PreflightError` with a reason meant for the uploader.
+"""
+import logging
+import re
+import zipfile
+from typing import BinaryIO
+
+from django.conf import settings
+from lxml import etree
+
+from .ixbrl import IX_NAMESPACES, inline_members, ix_local_name
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+
+# Entries smaller than this are not ratio-checked (tiny files compress arbitrarily well)
+_RATIO_MIN_BYTES = 1024 * 1024
+
+_IX_NS_BYTES = tuple(ns.encode("ascii") for ns in IX_NAMESPACES)
+_HEADER_TAG = re.compile(rb"<[A-Za-z_][\w.-]*:header[\s>/]")
+
+
+class PreflightError(ValueError):
+    """The upload is not a plausible Inline XBRL filing."""
+
+
+def _contains_ix_namespace(stream: BinaryIO) -> bool:
+    """Byte scan for an iXBRL namespace URI; a document without one cannot hold ix:header."""
+    carry = b""
+    while True:
+        block = stream.read(BLOCK_SIZE)
+        if not block:
+            return False
+        window = carry + block
+        if any(ns in window for ns in _IX_NS_BYTES):
+            return True
+        carry = block[-64:]
+
+
+def _scan_bytes(stream: BinaryIO, carry: bytes) -> bool:
+    """Fallback for markup lxml gives up on: a prefixed `header` tag anywhere in the rest."""
+    while True:
+        if _HEADER_TAG.search(carry):
+            return True
+        block = stream.read(BLOCK_SIZE)
+        if not block:
+            return False
+        carry = carry[-256:] + block
+
+
+class _HeaderFound(Exception):
+    pass
+
+
+class _HeaderTarget:
+    """Parser target that stops at the first ix:header; no tree is built."""
+
+    def start(self, tag, attrib):
+        if ix_local_name(tag) == "header":
+            raise _HeaderFound
+
+    def close(self):
+        return False
+
+
+def has_ix_header(stream: BinaryIO) -> bool:
+    """True once an `ix:header` element is read from the seekable `stream`; reads only as far as needed."""
+    if not _contains_ix_namespace(stream):
+        return False
+    stream.seek(0)
+    parser = etree.XMLParser(
+        target=_HeaderTarget(), recover=True, resolve_entities=False, no_network=True, huge_tree=True
+    )
+    try:
+        while True:
+            block = stream.read(BLOCK_SIZE)
+            if not block:
+                return False
+            try:
+                parser.feed(block)
+            except etree.XMLSyntaxError:
+                return _scan_bytes(stream, block)
+    except _HeaderFound:
+        return True
+
+
+def _check_document(stream: BinaryIO, name: str) -> None:
+    if not has_ix_header(stream):
+        raise PreflightError(f"{name} is not an Inline XBRL document (no ix:header found).")
+
+
+def _check_archive(archive: zipfile.ZipFile) -> None:
+    infos = archive.infolist()
+    if len(infos) > settings.PREFLIGHT_ZIP_MAX_ENTRIES:
+        raise PreflightError(
+            f"ZIP has {len(infos)} entries; at most {settings.PREFLIGHT_ZIP_MAX_ENTRIES} are accepted."
+        )
+    total = 0
+    for info in infos:
+        name = info.filename
+        if name.startswith(("/", "\\")) or ".." in name.replace("\\", "/").split("/"):
+            raise PreflightError(f"ZIP entry {name!r} has an unsafe path.")
+        if info.flag_bits & 0x1:
+            raise PreflightError(f"ZIP entry {name!r} is encrypted.")
+        total += info.file_size
+        if info.file_size >= _RATIO_MIN_BYTES and (
+            info.compress_size == 0 or info.file_size / info.compress_size > settings.PREFLIGHT_ZIP_MAX_RATIO
+        ):
+            raise PreflightError(f"ZIP entry {name!r} has an implausible compression ratio.")
+    if total > settings.PREFLIGHT_ZIP_MAX_UNCOMPRESSED_MB * 1024 * 1024:
+        raise PreflightError(
+            f"ZIP expands to more than {settings.PREFLIGHT_ZIP_MAX_UNCOMPRESSED_MB} MB."
+        )
+
+    members = inline_members(archive)
+    if not members:
+        raise PreflightError("ZIP contains no .xhtml/.html document.")
+    for member in members:
+        with archive.open(member) as f:
+            if has_ix_header(f):
+                return
+    raise PreflightError("No document in the ZIP is Inline XBRL (no ix:header found).")
+
+
+def check_upload(source: str | BinaryIO, filename: str) -> None:
+    """Raise PreflightError unless `source` (a path or seekable binary file) looks like an iXBRL filing."""
+    name = filename.rsplit("/", 1)[-1]
+    stream = open(source, "rb") if isinstance(source, str) else source
+    try:
+        stream.seek(0)
+        if name.lower().endswith(".zip"):
+            try:
+                with zipfile.ZipFile(stream) as archive:
+                    _check_archive(archive)
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, EOFError) as e:
+                raise PreflightError(f"{name} is not a readable ZIP archive.") from e
+        else:
+            _check_document(stream, name)
+    except PreflightError as e:
+        logger.info("Pre-flight rejected %s: %s", name, e)
+        raise
+    finally:
+        if isinstance(source, str):
+            stream.close()
+        else:
+            stream.seek(0)
@@ -1,19 +1,28 @@
 import os
 import subprocess
 import logging
-from threading import Thread
 from datetime import datetime, timezone
 from django.conf import settings
 from django.core.files import File
-from django.db import transaction
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone as dj_timezone
 from .models import Report
-from .oim import extract_metadata, extract_facts
-from .models import Report, Fact
-from .register import upsert_vsme_register
+from .oim import fact_metadata, fact_row, inline_facts, iter_oim_facts, is_oim_json_file, period_bounds
+from .models import Report, Fact, ValidationCache
+from .register import build_report_summary, match_report_metrics, recompute_vsme_register, upsert_vsme_register
+from . import dimensions, documents
+from .preflight import PreflightError, check_upload
+import csv
+import io
+import json
+import time
 import zipfile
 import tempfile
 import shutil
-from typing import Tuple
+from itertools import chain, islice
+from typing import BinaryIO, Iterable, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -72,14 +81,20 @@ def _run_arelle(input_path: str, output_path: str) -> tuple[int, str, str]:
     last_err = ""
     for cmd in _candidate_commands(input_path, output_path, os.path.dirname(output_path)):
         logger.info("Running Arelle: %s", " ".join(cmd))
-        proc = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            env=env,
-            cwd="/opt/arelle",
-        )
+        try:
+            proc = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=env,
+                cwd="/opt/arelle",
+                timeout=settings.ARELLE_CLI_TIMEOUT,
+            )
+        except subprocess.TimeoutExpired:
+            # Another flag variant would take as long; give up on this report
+            logger.error("Arelle timed out after %ss: %s", settings.ARELLE_CLI_TIMEOUT, input_path)
+            return 1, "", f"Arelle timed out after {settings.ARELLE_CLI_TIMEOUT}s"
         last_code, last_out, last_err = proc.returncode, proc.stdout, proc.stderr
         logger.info("Arelle finished: returncode=%s", proc.returncode)
         if proc.stdout:
@@ -94,46 +109,28 @@ def _run_arelle(input_path: str, output_path: str) -> tuple[int, str, str]:
     return last_code, last_out, last_err
 
 
-def _run_arelle_python_api(input_path: str, output_dir: str) -> tuple[bool, str | None, str]:
-    """Use Arelle's Python API to export OIM xBRL-JSON. Returns (ok, json_path, log)."""
-    try:
-        # API is provided by arelle-release package
-        from arelle import Cntlr
-
-        os.makedirs(output_dir, exist_ok=True)
-        json_path = os.path.join(output_dir, f"oim_{os.path.basename(input_path)}.json")
-        controller = Cntlr.Cntlr(logFileName=os.path.join(output_dir, "arelle_api.log"))
-        # Load model
-        model_xbrl = controller.modelManager.load("file://" + os.path.abspath(input_path))
-        if model_xbrl is None:
-            return False, None, "model_xbrl is None"
-
-        # NOTE: saveInstance may not be available across versions; leaving as no-op here.
-        return False, None, "api-export-disabled"
-    except Exception as e:
-        return False, None, f"api-error: {e}"
-
-
-def _is_oim_json_data(data: object) -> bool:
-    if isinstance(data, dict):
-        # OIM JSON commonly provides 'facts' as dict or list; accept either
-        if "facts" in data and isinstance(data["facts"], (dict, list)):
-            return True
-        # some variants might use 'report' with 'facts'
-        report = data.get("report") if isinstance(data, dict) else None
-        if isinstance(report, dict) and "facts" in report:
-            return True
-    return False
+def _run_arelle_python_api(input_path: str) -> tuple[bool, bytes | None, str] | None:
+    """Validate and export OIM xBRL-JSON through the warm Arelle pool.
 
+    Returns (ok, oim_json_bytes, log); the OIM document comes back in memory. Returns
+    None when the pool is disabled or failed itself, so the caller falls back to the CLI;
+    a filing Arelle rejects is a result, not a reason to run it again.
+    """
+    from .arelle_pool import get_pool
 
-def _is_oim_json_file(json_path: str) -> bool:
+    pool = get_pool()
+    if pool is None:
+        return None
     try:
-        import json as _json
-        with open(json_path, "r", encoding="utf-8") as jf:
-            data = _json.load(jf)
-        return _is_oim_json_data(data)
+        return pool.run(os.path.abspath(input_path))
     except Exception:
-        return False
+        logger.exception("Arelle pool run failed for %s; falling back to the CLI", input_path)
+        return None
+
+
+def _is_oim_json_file(json_path: str) -> bool:
+    # Streams only up to the top-level 'facts' member instead of loading the document
+    return is_oim_json_file(json_path)
 
 
 def _wrap_in_report_package(html_path: str, work_base_dir: str) -> Tuple[str, str | None]:
@@ -220,9 +217,426 @@ def _short_summary(stdout: str, stderr: str) -> str:
     return text
 
 
+def _apply_metadata(report: Report, entity: str, period: str) -> None:
+    """Store entity/period and correct the reporting year when that keeps (company, year) unique."""
+    # Extract reporting year from period if available
+    reporting_year = None
+    if period:
+        from .oim import extract_reporting_year_from_period
+        reporting_year = extract_reporting_year_from_period(period)
+
+    if entity or period or reporting_year:
+        with transaction.atomic():
+            update_fields = ["updated_at"]
+            if entity:
+                report.entity = entity
+                update_fields.append("entity")
+            if period:
+                report.reporting_period = period
+                update_fields.append("reporting_period")
+            if reporting_year:
+                # Check if this would create a duplicate (company, reporting_year) constraint violation
+                existing_report = Report.objects.filter(
+                    company=report.company, 
+                    reporting_year=reporting_year
+                ).exclude(id=report.id).first()
+                
+                if not existing_report:
+                    report.reporting_year = reporting_year
+                    update_fields.append("reporting_year")
+                    logger.info("Updated reporting year from %s to %s for report id=%s", 
+                              report.reporting_year, reporting_year, report.id)
+                else:
+                    logger.warning("Cannot update reporting year to %s for report id=%s - would violate uniqueness constraint with report id=%s", 
+                                 reporting_year, report.id, existing_report.id)
+            
+            report.save(update_fields=update_fields)
+
+
+class FactLoader:
+    """Buffer fact rows and write them to the Fact table in batches.
+
+    Rows are tuples in `columns` order. Each batch commits on its own, so memory
+    stays bounded and facts show up in `report_facts` while loading is still running.
+    `close()` flushes the tail and returns throughput stats (rows/s) for comparing backends.
+    """
+
+    method = "executemany"
+
+    def __init__(self, columns: Sequence[str], batch_size: int) -> None:
+        self.columns = tuple(columns)
+        self.batch_size = max(batch_size, 1)
+        self.rows_written = 0
+        self._batch: list[tuple] = []
+        self._started = time.perf_counter()
+        qn = connection.ops.quote_name
+        self._table = qn(Fact._meta.db_table)
+        self._column_sql = ", ".join(qn(c) for c in self.columns)
+
+    def add(self, row: tuple) -> None:
+        self._batch.append(row)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._batch:
+            return
+        self._write(self._batch)
+        self.rows_written += len(self._batch)
+        self._batch = []
+
+    def _write(self, rows: list[tuple]) -> None:
+        placeholders = ", ".join(["%s"] * len(self.columns))
+        sql = f"INSERT INTO {self._table} ({self._column_sql}) VALUES ({placeholders})"
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.executemany(sql, rows)
+
+    def close(self) -> dict:
+        self.flush()
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        return {
+            "rows": self.rows_written,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows_written / elapsed, 1),
+            "method": self.method,
+        }
+
+
+class CopyFactLoader(FactLoader):
+    """PostgreSQL loader streaming each batch through COPY ... FROM STDIN (CSV)."""
+
+    method = "copy"
+
+    def __init__(self, columns: Sequence[str], batch_size: int) -> None:
+        super().__init__(columns, batch_size)
+        qn = connection.ops.quote_name
+        # NULL is spelled \N so empty strings in NOT NULL text columns stay empty strings
+        not_null = [qn(c) for c in self.columns if _is_not_null_text(c)]
+        options = "FORMAT csv, NULL '\\N'"
+        if not_null:
+            options += f", FORCE_NOT_NULL ({', '.join(not_null)})"
+        self._copy_sql = f"COPY {self._table} ({self._column_sql}) FROM STDIN WITH ({options})"
+
+    def _write(self, rows: list[tuple]) -> None:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(["\\N" if v is None else v for v in row])
+        buf.seek(0)
+        with connection.cursor() as cur:
+            raw = cur.cursor
+            if hasattr(raw, "copy_expert"):  # psycopg2
+                raw.copy_expert(self._copy_sql, buf)
+            else:  # psycopg 3
+                with raw.copy(self._copy_sql) as copy:
+                    copy.write(buf.getvalue())
+
+
+def _is_not_null_text(column: str) -> bool:
+    for field in Fact._meta.concrete_fields:
+        if field.column == column:
+            return not field.null and field.get_internal_type() in ("CharField", "TextField")
+    return False
+
+
+def get_fact_loader(columns: Sequence[str], batch_size: int | None = None) -> FactLoader:
+    """Return the fastest available loader for the current database backend."""
+    size = batch_size or settings.FACT_INGEST_BATCH_SIZE
+    if connection.vendor == "postgresql":
+        return CopyFactLoader(columns, size)
+    return FactLoader(columns, size)
+
+
+_FACT_COLUMNS = (
+    "report_id", "concept_id", "value", "unit_id", "period_id",
+    "numeric_value", "entity_identifier", "dimensions", "source_document", "created_at",
+)
+
+
+def _period_fields(label: str) -> dict:
+    start, end, is_instant = period_bounds(label)
+    return {"period_start": start, "period_end": end, "is_instant": is_instant}
+
+
+def _save_facts(report: Report, rows: Iterable[dict]) -> int:
+    """Load simplified fact rows for `report` through the backend's FactLoader.
+
+    Concepts, units and periods are resolved to interned ids one batch at a time.
+    """
+    loader = get_fact_loader(_FACT_COLUMNS)
+    now = dj_timezone.now()
+    rows = iter(rows)
+    while batch := list(islice(rows, loader.batch_size)):
+        datatypes = {r.get("concept", ""): r.get("datatype", "") for r in batch}
+        concept_ids = dimensions.concepts.resolve(datatypes, defaults=lambda k: {"datatype": datatypes[k]})
+        dimensions.fill_concept_datatypes(datatypes)
+        unit_ids = dimensions.units.resolve(r.get("unit", "") for r in batch)
+        period_ids = dimensions.periods.resolve((r.get("context", "") for r in batch), defaults=_period_fields)
+        for r in batch:
+            axes = r.get("dimensions")
+            loader.add((
+                report.id,
+                concept_ids[r.get("concept", "")],
+                r.get("value", ""),
+                unit_ids.get(r.get("unit", "")),
+                period_ids.get(r.get("context", "")),
+                r.get("numeric_value"),
+                r.get("entity_identifier", ""),
+                json.dumps(axes) if axes else None,
+                r.get("source_document", ""),
+                now,
+            ))
+    stats = loader.close()
+    if stats["rows"]:
+        logger.info(
+            "Saved %d facts for report id=%s in %.2fs (%.0f rows/s via %s)",
+            stats["rows"], report.id, stats["seconds"], stats["rows_per_second"], stats["method"],
+        )
+    return stats["rows"]
+
+
+def _source_key(concept: str, context: str, unit: str, axes: dict | None) -> tuple:
+    return concept, context, unit, json.dumps(axes, sort_keys=True) if axes else ""
+
+
+def _provisional_sources(report: Report) -> dict[tuple, str]:
+    """Source document of each provisional fact of a multi-document package, by concept/period/unit/axes."""
+    sources: dict[tuple, str] = {}
+    rows = report.facts.exclude(source_document="").values_list(
+        "concept__qname", "period__label", "unit__code", "dimensions", "source_document"
+    )
+    for concept, context, unit, axes, document in rows.iterator():
+        sources.setdefault(_source_key(concept, context or "", unit or "", axes), document)
+    return sources
+
+
+def _with_sources(rows: Iterable[dict], sources: dict[tuple, str]) -> Iterable[dict]:
+    # Arelle's OIM output does not say which document a fact is in; take it from phase one
+    for r in rows:
+        r["source_document"] = sources.get(_source_key(r["concept"], r["context"], r["unit"], r["dimensions"]), "")
+        yield r
+
+
+def _ingest_oim(report: Report, source: str | BinaryIO) -> int:
+    """Stream facts from OIM JSON (file path or binary stream) into `Fact`.
+
+    Entity and period come from the first fact; any facts left by an earlier
+    attempt (or phase one) are replaced, keeping the provisional facts' source documents.
+    """
+    sources = _provisional_sources(report)
+    report.facts.all().delete()
+    _store_summary(report, None)
+    facts = iter_oim_facts(source)
+    first = next(facts, None)
+    if first is None:
+        _set_fact_count(report, 0)
+        return 0
+    entity, period = fact_metadata(first)
+    _apply_metadata(report, entity, period)
+    rows = (fact_row(f) for f in chain([first], facts))
+    count = _save_facts(report, _with_sources(rows, sources) if sources else rows)
+    _set_fact_count(report, count)
+    return count
+
+
+def _set_fact_count(report: Report, count: int) -> None:
+    report.fact_count = count
+    Report.objects.filter(id=report.id).update(fact_count=count)
+
+
+def _store_summary(report: Report, summary: dict | None) -> None:
+    report.summary = summary
+    Report.objects.filter(id=report.id).update(summary=summary)
+
+
+def _refresh_register(report: Report) -> None:
+    # One scan of the facts feeds both the stored report summary and the vSME register row
+    scan = None
+    try:
+        scan = match_report_metrics(report.id)
+        _store_summary(report, build_report_summary(*scan))
+    except Exception:
+        logger.exception("Failed to store summary for report id=%s", report.id)
+    try:
+        row = upsert_vsme_register(report, scan)
+        if row:
+            logger.info("Upserted vSME register row for company=%s year=%s", report.company_id, report.reporting_year)
+    except Exception:
+        logger.exception("Failed to upsert vSME register for report id=%s", report.id)
+
+
+def ingest_provisional_facts(report: Report) -> int:
+    """Phase one: store facts read natively from the upload (see ixbrl.InlineReader) and fill the register.
+
+    The first step of the report's job, ahead of Arelle: it takes about a second instead of
+    the validation's minutes, and phase two replaces these facts with Arelle's. Best-effort:
+    returns 0 and leaves the report PENDING when the upload cannot be read.
+    """
+    try:
+        report.facts.all().delete()
+        facts = inline_facts(
+            report.original_file.path,
+            workers=settings.IXDS_EXTRACT_WORKERS,
+            parallel_min_bytes=settings.IXDS_EXTRACT_PARALLEL_MIN_MB * 1024 * 1024,
+        )
+        count = _save_facts(report, (fact_row(f) for f in facts))
+    except Exception:
+        logger.exception("Native fact extraction failed for report id=%s", report.id)
+        report.facts.all().delete()
+        return 0
+    _set_fact_count(report, count)
+    report.phase = Report.Phase.PROVISIONAL
+    Report.objects.filter(id=report.id).update(phase=report.phase)
+    _refresh_register(report)
+    logger.info("Stored %d provisional facts for report id=%s", count, report.id)
+    return count
+
+
+def _discard_provisional_facts(report: Report) -> None:
+    # Validation failed: the native facts must not outlive it (the register is recomputed after save)
+    if report.phase != Report.Phase.PROVISIONAL:
+        return
+    report.facts.all().delete()
+    _set_fact_count(report, 0)
+    _store_summary(report, None)
+    report.phase = Report.Phase.PENDING
+
+
+def _prerender_document(report: Report) -> None:
+    # Render the inline viewer document now so the first view is already a sendfile
+    if not report.original_file:
+        return
+    try:
+        documents.prerender(report)
+    except Exception:
+        logger.exception("Failed to render viewer document for report id=%s", report.id)
+
+
+def _arelle_version() -> str:
+    if settings.ARELLE_VERSION:
+        return settings.ARELLE_VERSION
+    try:
+        from arelle import Version
+        return str(Version.__version__)
+    except Exception:
+        return "unknown"
+
+
+def _cache_key(report: Report) -> dict:
+    return {
+        "content_sha256": report.content_sha256,
+        "taxonomy_entrypoint": settings.VSME_ENTRYPOINT_URL,
+        "arelle_version": _arelle_version(),
+    }
+
+
+def _ensure_content_hash(report: Report) -> str:
+    if not report.content_sha256 and report.original_file:
+        from .uploads import sha256_file
+        try:
+            report.content_sha256 = sha256_file(report.original_file.path)
+        except OSError:
+            return ""
+        report.save(update_fields=["content_sha256", "updated_at"])
+    return report.content_sha256
+
+
+def _copy_facts(source_report_id: int, target_report_id: int) -> int:
+    """Duplicate a report's facts server-side with a single INSERT ... SELECT."""
+    qn = connection.ops.quote_name
+    table = qn(Fact._meta.db_table)
+    report_col = qn(Fact._meta.get_field("report").column)
+    cols: list[str] = []
+    select_exprs: list[str] = []
+    params: list = [target_report_id]
+    for field in Fact._meta.concrete_fields:
+        if field.primary_key or field.name == "report":
+            continue
+        cols.append(qn(field.column))
+        if getattr(field, "auto_now_add", False):
+            select_exprs.append("%s")
+            params.append(dj_timezone.now())
+        else:
+            select_exprs.append(qn(field.column))
+    params.append(source_report_id)
+    sql = (
+        f"INSERT INTO {table} ({report_col}, {', '.join(cols)}) "
+        f"SELECT %s, {', '.join(select_exprs)} FROM {table} WHERE {report_col} = %s ORDER BY {qn('id')}"
+    )
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.rowcount
+
+
+def try_reuse_cached_result(report: Report, allow_ingest: bool = False) -> bool:
+    """Mark `report` VALIDATED from an earlier Arelle run over identical bytes.
+
+    Facts are copied from the cached source report, or re-extracted from the cached
+    OIM JSON when that report is gone. Re-extraction is as slow as an ingest, so it
+    only happens with `allow_ingest` (in the report worker); otherwise, like a cache
+    miss, it returns False and the report is queued.
+    """
+    if not _ensure_content_hash(report):
+        return False
+    entry = ValidationCache.objects.filter(**_cache_key(report)).select_related("source_report").first()
+    if entry is None or not entry.oim_json_file:
+        return False
+    source = entry.source_report
+    if source is not None and (source.id == report.id or source.status != Report.Status.VALIDATED):
+        source = None
+    if source is None and (not allow_ingest or not entry.oim_json_file.storage.exists(entry.oim_json_file.name)):
+        return False
+
+    with transaction.atomic():
+        report.status = Report.Status.VALIDATED
+        report.phase = Report.Phase.VALIDATED
+        report.validation_summary = entry.validation_summary or "Validated"
+        report.taxonomy_version = entry.taxonomy_entrypoint
+        # Link the cached OIM JSON instead of writing another copy
+        report.oim_json_file.name = entry.oim_json_file.name
+        report.failure_reason = ""
+        report.save()
+        report.facts.all().delete()
+        if source is not None:
+            copied = _copy_facts(source.id, report.id)
+            _set_fact_count(report, copied)
+            logger.info("Copied %d cached facts from report id=%s to report id=%s", copied, source.id, report.id)
+        ValidationCache.objects.filter(id=entry.id).update(hits=F("hits") + 1, updated_at=dj_timezone.now())
+    if source is not None:
+        _apply_metadata(report, entry.entity, entry.reporting_period)
+    else:
+        _ingest_oim(report, entry.oim_json_file.path)
+        ValidationCache.objects.filter(id=entry.id).update(source_report=report)
+    _refresh_register(report)
+    if allow_ingest:
+        # In the worker; a hit in the upload request leaves it to the first view (documents.get_document)
+        _prerender_document(report)
+    logger.info("Report id=%s validated from cache (sha256=%s)", report.id, report.content_sha256)
+    return True
+
+
+def _store_cached_result(report: Report) -> None:
+    if not report.content_sha256 or not report.oim_json_file:
+        return
+    try:
+        ValidationCache.objects.update_or_create(
+            **_cache_key(report),
+            defaults={
+                "validation_summary": report.validation_summary,
+                "entity": report.entity,
+                "reporting_period": report.reporting_period,
+                "oim_json_file": report.oim_json_file.name,
+                "source_report": report,
+            },
+        )
+    except Exception:
+        logger.exception("Failed to cache validation result for report id=%s", report.id)
+
+
 def process_report_async(report_id: int) -> None:
-    thread = Thread(target=_process_report_sync, args=(report_id,), daemon=True)
-    thread.start()
+    """Queue the report; `manage.py run_report_workers` picks it up out of the web process."""
+    from .jobs import enqueue_report
+    enqueue_report(report_id)
 
 
 def _process_report_sync(report_id: int) -> None:
@@ -232,7 +646,25 @@ def _process_report_sync(report_id: int) -> None:
         logger.error("Report not found for processing: id=%s", report_id)
         return
 
+    if try_reuse_cached_result(report, allow_ingest=True):
+        return
+
     input_path = report.original_file.path
+    try:
+        # Uploads are checked synchronously; this covers reprocessing and older reports
+        check_upload(input_path, report.original_file.name)
+    except PreflightError as e:
+        _discard_provisional_facts(report)
+        report.status = Report.Status.FAILED
+        report.failure_reason = str(e)
+        report.validation_summary = ""
+        report.save()
+        recompute_vsme_register(report.company_id, report.reporting_year)
+        logger.warning("Report id=%s failed pre-flight: %s", report_id, e)
+        return
+    if report.phase == Report.Phase.PENDING:
+        # Phase one; a retried job keeps the provisional facts of its earlier attempt
+        ingest_provisional_facts(report)
     output_dir = os.path.join(settings.MEDIA_ROOT, "reports", "oim")
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, f"report_{report.id}.json")
@@ -244,10 +676,21 @@ def _process_report_sync(report_id: int) -> None:
     effective_input, temp_dir = _resolve_effective_input_path(input_path, output_dir)
 
     logger.info("Starting validation for report id=%s", report_id)
-    code, out, err = _run_arelle(effective_input, output_path)
-
-    generated_path = output_path if os.path.exists(output_path) else None
-    if code == 0 and not generated_path:
+    # Prefer a warm pooled Arelle (OIM returned in memory); the CLI only runs when the pool could not
+    pooled = _run_arelle_python_api(effective_input)
+    generated_path = None
+    if pooled is not None:
+        ok, oim_bytes, api_log = pooled
+        if ok and oim_bytes:
+            code, out, err = 0, api_log, ""
+        else:
+            oim_bytes = None
+            code, out, err = 1, api_log, ""
+    else:
+        oim_bytes = None
+        code, out, err = _run_arelle(effective_input, output_path)
+        generated_path = output_path if os.path.exists(output_path) else None
+    if code == 0 and not generated_path and oim_bytes is None:
         # Some Arelle versions ignore target name; try to locate the newest JSON in output dir
         try:
             # recursively scan output dir then input dir; choose only valid OIM JSONs
@@ -281,95 +724,52 @@ def _process_report_sync(report_id: int) -> None:
         except Exception:
             logger.exception("Failed scanning for generated OIM JSON in %s", output_dir)
 
-    # If CLI failed to produce a usable JSON, or produced a non-OIM JSON, try Python API fallback
-    if (code != 0 or not generated_path or not os.path.exists(generated_path) or not _is_oim_json_file(generated_path)):
-        ok, api_json, api_log = _run_arelle_python_api(effective_input, output_dir)
-        if ok and api_json:
-            generated_path = api_json
-            code = 0
-            out = (out or "") + f"\n[api] {api_log}"
-        else:
-            err = (err or "") + f"\n[api] {api_log}"
-
-    # Final guard: only accept actual OIM JSONs with facts
-    if code == 0 and generated_path and os.path.exists(generated_path) and _is_oim_json_file(generated_path):
-        # Save generated JSON to FileField
-        with open(generated_path, "rb") as f:
-            django_file = File(f)
-            filename = os.path.basename(generated_path)
-            # Use a transaction to avoid partial updates
-            with transaction.atomic():
-                report.status = Report.Status.VALIDATED
-                report.validation_summary = _short_summary(out, err) or "Validated"
-                report.taxonomy_version = settings.VSME_ENTRYPOINT_URL
-                report.oim_json_file.save(filename, django_file, save=False)
-                report.failure_reason = ""
-                report.save()
-        # Populate metadata best-effort and persist facts
+    if oim_bytes is not None:
+        oim_source = io.BytesIO(oim_bytes)
+        has_oim = is_oim_json_file(oim_source)
+    else:
+        oim_source = generated_path
+        # Final guard: only accept actual OIM JSONs with facts
+        has_oim = bool(code == 0 and generated_path and os.path.exists(generated_path) and _is_oim_json_file(generated_path))
+
+    if code == 0 and has_oim:
+        provisional = report.fact_count if report.phase == Report.Phase.PROVISIONAL else None
+        # Use a transaction to avoid partial updates
+        with transaction.atomic():
+            report.status = Report.Status.VALIDATED
+            report.phase = Report.Phase.VALIDATED
+            report.validation_summary = _short_summary(out, err) or "Validated"
+            report.taxonomy_version = settings.VSME_ENTRYPOINT_URL
+            if oim_bytes is not None:
+                report.oim_json_file.save(f"report_{report.id}.json", ContentFile(oim_bytes), save=False)
+            else:
+                # Save generated JSON to FileField
+                with open(generated_path, "rb") as f:
+                    report.oim_json_file.save(os.path.basename(generated_path), File(f), save=False)
+            report.failure_reason = ""
+            report.save()
+        # Stream facts in bounded batches; Arelle's facts replace the provisional ones
         try:
-            import json as _json
-            with open(generated_path, "r", encoding="utf-8") as jf:
-                oim_json = _json.load(jf)
-            entity, period = extract_metadata(oim_json)
-            
-            # Extract reporting year from period if available
-            reporting_year = None
-            if period:
-                from .oim import extract_reporting_year_from_period
-                reporting_year = extract_reporting_year_from_period(period)
-            
-            if entity or period or reporting_year:
-                with transaction.atomic():
-                    update_fields = ["updated_at"]
-                    if entity:
-                        report.entity = entity
-                        update_fields.append("entity")
-                    if period:
-                        report.reporting_period = period
-                        update_fields.append("reporting_period")
-                    if reporting_year:
-                        # Check if this would create a duplicate (company, reporting_year) constraint violation
-                        existing_report = Report.objects.filter(
-                            company=report.company, 
-                            reporting_year=reporting_year
-                        ).exclude(id=report.id).first()
-                        
-                        if not existing_report:
-                            report.reporting_year = reporting_year
-                            update_fields.append("reporting_year")
-                            logger.info("Updated reporting year from %s to %s for report id=%s", 
-                                      report.reporting_year, reporting_year, report_id)
-                        else:
-                            logger.warning("Cannot update reporting year to %s for report id=%s - would violate uniqueness constraint with report id=%s", 
-                                         reporting_year, report_id, existing_report.id)
-                    
-                    report.save(update_fields=update_fields)
-            # Save facts
-            fact_rows = list(extract_facts(oim_json))
-            to_create: list[Fact] = []
-            for r in fact_rows:
-                to_create.append(
-                    Fact(
-                        report=report,
-                        concept=r.get("concept", ""),
-                        value=r.get("value", ""),
-                        datatype=r.get("datatype", ""),
-                        unit=r.get("unit", ""),
-                        context=r.get("context", ""),
-                    )
-                )
-            if to_create:
-                Fact.objects.bulk_create(to_create, batch_size=1000)
-                logger.info("Saved %d facts for report id=%s", len(to_create), report_id)
-            # Upsert vSME register row based on facts
-            try:
-                row = upsert_vsme_register(report)
-                if row:
-                    logger.info("Upserted vSME register row for company=%s year=%s", report.company_id, report.reporting_year)
-            except Exception:
-                logger.exception("Failed to upsert vSME register for report id=%s", report_id)
+            count = _ingest_oim(report, oim_source)
         except Exception:
-            logger.warning("Metadata extraction failed for report id=%s", report_id)
+            logger.exception("Failed to ingest facts for report id=%s", report_id)
+            # Never leave a partial fact set on a validated report: back to the queue's state, and the job retries
+            with transaction.atomic():
+                report.facts.all().delete()
+                _set_fact_count(report, 0)
+                _store_summary(report, None)
+                report.status = Report.Status.PROCESSING
+                report.phase = Report.Phase.PENDING
+                report.save(update_fields=["status", "phase", "updated_at"])
+                recompute_vsme_register(report.company_id, report.reporting_year)
+            raise
+        if provisional is not None and provisional != count:
+            logger.info(
+                "Report id=%s: %d provisional facts replaced by %d validated facts", report_id, provisional, count
+            )
+        _refresh_register(report)
+        _store_cached_result(report)
+        _prerender_document(report)
         logger.info("Report validated successfully id=%s", report_id)
     else:
         # Provide helpful debug in failure
@@ -386,6 +786,7 @@ def _process_report_sync(report_id: int) -> None:
         except Exception:
             pass
         with transaction.atomic():
+            _discard_provisional_facts(report)
             report.status = Report.Status.FAILED
             failure = _short_summary(out, err)
             if not failure:
@@ -393,6 +794,7 @@ def _process_report_sync(report_id: int) -> None:
             report.failure_reason = failure
             report.validation_summary = ""
             report.save()
+        recompute_vsme_register(report.company_id, report.reporting_year)
         logger.error(
             "Report validation failed id=%s (code=%s, expected_output=%s, exists=%s)",
             report_id,
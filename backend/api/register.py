@@ -1,75 +1,260 @@
 from __future__ import annotations
 
-from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, Iterable, Tuple
-from django.db import transaction
-from .models import Report, Fact, VsmeRegister
 import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Exists, F, OuterRef, Q, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+from .insights import bump_data_version
+from .models import Report, Fact, VsmeRegister
+from .units import to_canonical
 
 
-def _to_decimal(value: str | None) -> Decimal | None:
-    if value is None:
-        return None
-    s = str(value).strip()
-    if s == "":
-        return None
-    try:
-        # Replace commas as thousand separators if present
-        s = s.replace(",", "")
-        return Decimal(s)
-    except (InvalidOperation, ValueError):
-        return None
-
-
-def _first_fact(report: Report, fragments: Iterable[str]) -> Fact | None:
-    for frag in fragments:
-        f = (
-            Fact.objects.filter(report=report, concept__icontains=frag)
-            .order_by("id")
-            .first()
-        )
-        if f:
-            return f
-    return None
+# Reports the register is built from: validated ones, and ones still being validated whose
+# provisional facts (see processing.ingest_provisional_facts) are already in
+REGISTER_REPORTS = Q(status=Report.Status.VALIDATED) | Q(
+    status=Report.Status.PROCESSING, phase=Report.Phase.PROVISIONAL
+)
+
+
+def feeds_register(report: Report) -> bool:
+    return report.status == Report.Status.VALIDATED or (
+        report.status == Report.Status.PROCESSING and report.phase == Report.Phase.PROVISIONAL
+    )
+
+
+# (fact id, concept, value, unit, numeric value) as read from Fact
+MetricRow = Tuple[int, str, str, str, Decimal | None]
+
+
+# code: (value_field, unit_field, [concept fragments in priority order])
+METRICS: Dict[str, Tuple[str, str, List[str]]] = {
+    "employees": ("employees_value", "employees_unit", ["NumberOfEmployees", "Employees"]),
+    "ghg_total": ("ghg_total_value", "ghg_total_unit", ["TotalGHG", "GHGEmissions", "GreenhouseGasEmissions"]),
+    "ghg_scope1": ("ghg_scope1_value", "ghg_scope1_unit", ["Scope1", "GHGScope1"]),
+    "ghg_scope2": ("ghg_scope2_value", "ghg_scope2_unit", ["Scope2", "GHGScope2"]),
+    "energy_consumption": ("energy_consumption_value", "energy_consumption_unit", ["TotalEnergyConsumption", "EnergyConsumption"]),
+    "renewable_energy_share": ("renewable_energy_share_value", "renewable_energy_share_unit", ["RenewableEnergyShare", "ShareOfRenewable"]),
+    "water_withdrawal": ("water_withdrawal_value", "water_withdrawal_unit", ["WaterWithdrawal"]),
+    "water_discharge": ("water_discharge_value", "water_discharge_unit", ["WaterDischarge"]),
+    "waste_generated": ("waste_generated_value", "waste_generated_unit", ["WasteGenerated", "TotalWasteGenerated"]),
+    "hazardous_waste": ("hazardous_waste_value", "hazardous_waste_unit", ["HazardousWaste"]),
+    "non_hazardous_waste": ("non_hazardous_waste_value", "non_hazardous_waste_unit", ["NonHazardousWaste"]),
+}
+
+# code: (canonical field, unit dimension in api.units)
+CANONICAL_METRICS: Dict[str, Tuple[str, str]] = {
+    "ghg_total": ("ghg_total_tco2e", "ghg"),
+    "ghg_scope1": ("ghg_scope1_tco2e", "ghg"),
+    "ghg_scope2": ("ghg_scope2_tco2e", "ghg"),
+    "energy_consumption": ("energy_mwh", "energy"),
+    "water_withdrawal": ("water_withdrawal_m3", "volume"),
+    "water_discharge": ("water_discharge_m3", "volume"),
+    "waste_generated": ("waste_generated_t", "mass"),
+    "hazardous_waste": ("hazardous_waste_t", "mass"),
+    "non_hazardous_waste": ("non_hazardous_waste_t", "mass"),
+}
+
+METRIC_FIELDS: List[str] = [
+    *(f for v_field, u_field, _ in METRICS.values() for f in (v_field, u_field)),
+    *(field for field, _ in CANONICAL_METRICS.values()),
+]
+
+
+class ConceptMatcher:
+    """Aho-Corasick automaton over case-folded concept fragments.
+
+    `search(text)` returns every fragment contained in `text` in a single pass,
+    which replaces one `concept__icontains` query per fragment.
+    """
+
+    def __init__(self, fragments: Iterable[str]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[str]] = [set()]
+        for frag in fragments:
+            self._add(frag.lower())
+        self._build()
+
+    def _add(self, word: str) -> None:
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state].add(word)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        state = 0
+        for ch in text.lower():
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            if self._out[state]:
+                found |= self._out[state]
+        return found
+
+
+class MetricMatcher:
+    """Resolve metrics to facts the same way as "first fragment with a match, lowest fact id"."""
+
+    def __init__(self, metrics: Dict[str, List[str]]) -> None:
+        # fragment -> [(code, priority)]
+        self._targets: Dict[str, List[Tuple[str, int]]] = {}
+        for code, frags in metrics.items():
+            for priority, frag in enumerate(frags):
+                self._targets.setdefault(frag.lower(), []).append((code, priority))
+        self._automaton = ConceptMatcher(self._targets.keys())
+
+    def match(self, rows: Iterable[MetricRow]) -> Tuple[Dict[str, MetricRow], int]:
+        """Scan `MetricRow`s ordered by id; return ({code: row}, row_count)."""
+        best: Dict[str, Tuple[int, MetricRow]] = {}
+        count = 0
+        for row in rows:
+            count += 1
+            for frag in self._automaton.search(row[1]):
+                for code, priority in self._targets[frag]:
+                    current = best.get(code)
+                    if current is None or priority < current[0]:
+                        best[code] = (priority, row)
+        return {code: row for code, (_, row) in best.items()}, count
+
+
+_metric_matcher = MetricMatcher({code: frags for code, (_, _, frags) in METRICS.items()})
+
+# Facts without a unit have unit_id NULL; the matcher works on "" like the original text column
+_UNIT_CODE = Coalesce("unit__code", Value(""))
+
+
+def match_report_metrics(report_id: int) -> Tuple[Dict[str, MetricRow], int]:
+    """Read the report's facts in one query and resolve every register metric.
+
+    Returns ({code: MetricRow}, fact_count).
+    """
+    rows = (
+        Fact.objects.filter(report_id=report_id)
+        .order_by("id")
+        .values_list("id", "concept__qname", "value", _UNIT_CODE, "numeric_value")
+        .iterator(chunk_size=2000)
+    )
+    return _metric_matcher.match(rows)
+
+
+# Checks listed in the report summary: (label, METRICS code)
+SUMMARY_CHECKS = [
+    ("Total GHG emissions", "ghg_total"),
+    ("Energy consumption", "energy_consumption"),
+    ("Water withdrawal", "water_withdrawal"),
+    ("Waste generated", "waste_generated"),
+    ("Employees", "employees"),
+]
 
 
-def _collect_metrics(report: Report) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+# Bumped when stored summaries gain fields; `backfill_report_summaries` recomputes older ones
+SUMMARY_VERSION = 2
+
+
+def build_report_summary(matches: Dict[str, MetricRow], fact_count: int) -> Dict[str, Any]:
+    """Summary stored on `Report.summary`, from a `match_report_metrics` scan.
+
+    Each check carries the concept that satisfied it. Entity and period are not
+    included; they are served from the report row.
+    """
+    items = []
+    for label, code in SUMMARY_CHECKS:
+        matched = matches.get(code)
+        items.append({
+            "label": label,
+            "code": code,
+            "present": bool(matched),
+            "concept": matched[1] if matched else None,
+            "value": matched[2] if matched else None,
+        })
+    return {
+        "version": SUMMARY_VERSION,
+        "fact_count": fact_count,
+        "required_count": len(SUMMARY_CHECKS),
+        "present_count": sum(1 for item in items if item["present"]),
+        "items": items,
+    }
+
+
+def match_reports_metrics(report_ids: Iterable[int]) -> Dict[int, Tuple[Dict[str, MetricRow], int]]:
+    """`match_report_metrics` for many reports with one fact query.
+
+    Reports without facts are absent from the result.
+    """
+    rows = (
+        Fact.objects.filter(report_id__in=list(report_ids))
+        .order_by("report_id", "id")
+        .values_list("report_id", "id", "concept__qname", "value", _UNIT_CODE, "numeric_value")
+        .iterator(chunk_size=2000)
+    )
+    return {
+        report_id: _metric_matcher.match(row[1:] for row in group)
+        for report_id, group in groupby(rows, key=itemgetter(0))
+    }
+
+
+def _collect_metrics(
+    report: Report, matches: Dict[str, MetricRow] | None = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """Return (values, sources) for register metrics.
 
     values: dict of {field_name: value or unit string}
     sources: dict of {code: {concept, unit}}
     """
+    if matches is None:
+        matches, _ = match_report_metrics(report.id)
+    return _metric_values(matches)
 
-    mapping = {
-        # code: (value_field, unit_field, [concept fragments])
-        "employees": ("employees_value", "employees_unit", ["NumberOfEmployees", "Employees"]),
-        "ghg_total": ("ghg_total_value", "ghg_total_unit", ["TotalGHG", "GHGEmissions", "GreenhouseGasEmissions"]),
-        "ghg_scope1": ("ghg_scope1_value", "ghg_scope1_unit", ["Scope1", "GHGScope1"]) ,
-        "ghg_scope2": ("ghg_scope2_value", "ghg_scope2_unit", ["Scope2", "GHGScope2"]) ,
-        "energy_consumption": ("energy_consumption_value", "energy_consumption_unit", ["TotalEnergyConsumption", "EnergyConsumption"]) ,
-        "renewable_energy_share": ("renewable_energy_share_value", "renewable_energy_share_unit", ["RenewableEnergyShare", "ShareOfRenewable"]) ,
-        "water_withdrawal": ("water_withdrawal_value", "water_withdrawal_unit", ["WaterWithdrawal"]) ,
-        "water_discharge": ("water_discharge_value", "water_discharge_unit", ["WaterDischarge"]) ,
-        "waste_generated": ("waste_generated_value", "waste_generated_unit", ["WasteGenerated", "TotalWasteGenerated"]) ,
-        "hazardous_waste": ("hazardous_waste_value", "hazardous_waste_unit", ["HazardousWaste"]) ,
-        "non_hazardous_waste": ("non_hazardous_waste_value", "non_hazardous_waste_unit", ["NonHazardousWaste"]) ,
-    }
 
+def _metric_values(matches: Dict[str, MetricRow]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     values: Dict[str, Any] = {}
     sources: Dict[str, Any] = {}
 
-    for code, (v_field, u_field, frags) in mapping.items():
-        fact = _first_fact(report, frags)
-        if fact:
-            dec = _to_decimal(fact.value)
-            if dec is not None:
-                values[v_field] = dec
-            if fact.unit:
-                values[u_field] = fact.unit
-            sources[code] = {"concept": fact.concept, "unit": fact.unit}
-        else:
-            # ensure absent metrics don't overwrite existing values unintentionally in upsert
-            pass
+    for code, (v_field, u_field, _frags) in METRICS.items():
+        match = matches.get(code)
+        if not match:
+            # absent metrics don't overwrite existing values unintentionally in upsert
+            continue
+        _fact_id, concept, _value, unit, dec = match
+        if dec is not None:
+            values[v_field] = dec
+        if unit:
+            values[u_field] = unit
+        if code in CANONICAL_METRICS:
+            c_field, dimension = CANONICAL_METRICS[code]
+            canonical = to_canonical(dec, unit, dimension)
+            if canonical is not None:
+                values[c_field] = canonical
+        sources[code] = {"concept": concept, "unit": unit}
 
     return values, sources
 
@@ -96,22 +281,27 @@ def _compute_completeness(values: Dict[str, Any]) -> int:
     return max(0, min(100, pct))
 
 
-def upsert_vsme_register(report: Report) -> VsmeRegister:
-    """Upsert VsmeRegister row for the report's company-year based on its facts."""
+def upsert_vsme_register(
+    report: Report, scan: Tuple[Dict[str, MetricRow], int] | None = None
+) -> VsmeRegister:
+    """Upsert VsmeRegister row for the report's company-year based on its facts.
+
+    `scan` is a `match_report_metrics` result the caller already has.
+    """
     import logging
     logger = logging.getLogger(__name__)
     
-    # Ensure we only process validated reports
-    if report.status != Report.Status.VALIDATED:
+    # Ensure we only process validated (or provisionally extracted) reports
+    if not feeds_register(report):
         return None  # type: ignore
 
-    values, sources = _collect_metrics(report)
+    matches, fact_count = scan if scan is not None else match_report_metrics(report.id)
+    values, sources = _collect_metrics(report, matches)
     # Always refresh entity_identifier from report
     entity_identifier = report.entity or ""
     completeness = _compute_completeness(values)
     
     # Log what we extracted for debugging
-    fact_count = report.facts.count()
     logger.info("VsmeRegister update for report %s: extracted %d facts, %d metric values, completeness=%d%%", 
                 report.id, fact_count, len(values), completeness)
 
@@ -128,23 +318,8 @@ def upsert_vsme_register(report: Report) -> VsmeRegister:
         )
         if not created:
             # Clear all metric fields first to avoid contamination from previous reports
-            metric_fields = [
-                "employees_value", "employees_unit",
-                "ghg_total_value", "ghg_total_unit",
-                "ghg_scope1_value", "ghg_scope1_unit",
-                "ghg_scope2_value", "ghg_scope2_unit",
-                "energy_consumption_value", "energy_consumption_unit",
-                "renewable_energy_share_value", "renewable_energy_share_unit",
-                "water_withdrawal_value", "water_withdrawal_unit",
-                "water_discharge_value", "water_discharge_unit",
-                "waste_generated_value", "waste_generated_unit",
-                "hazardous_waste_value", "hazardous_waste_unit",
-                "non_hazardous_waste_value", "non_hazardous_waste_unit",
-            ]
-            
-            # Clear all metric fields to prevent contamination
-            for field in metric_fields:
-                setattr(row, field, None)
+            for field in METRIC_FIELDS:
+                setattr(row, field, VsmeRegister._meta.get_field(field).get_default())
             
             # Now set new values from current report
             for field, val in values.items():
@@ -167,15 +342,15 @@ def upsert_vsme_register(report: Report) -> VsmeRegister:
 def recompute_vsme_register(company_id: int, year: int) -> None:
     """Recompute or remove VsmeRegister for a company-year after report deletion.
 
-    - If there is any remaining VALIDATED report for the same company-year, upsert from the latest one.
+    - If there is any remaining VALIDATED (or provisional) report for the same company-year, upsert from the latest one.
     - If none remain, delete the VsmeRegister row if present.
     """
     try:
         latest = (
             Report.objects.filter(
+                REGISTER_REPORTS,
                 company_id=company_id,
                 reporting_year=year,
-                status=Report.Status.VALIDATED,
             )
             .order_by("-created_at")
             .first()
@@ -192,46 +367,128 @@ def recompute_vsme_register(company_id: int, year: int) -> None:
         )
 
 
-def rebuild_all_vsme_registers() -> dict:
-    """Rebuild the entire VsmeRegister table from current VALIDATED reports.
+def _latest_register_reports() -> list[Tuple[int, int, int, str]]:
+    """(report_id, company_id, year, entity) of the newest REGISTER_REPORTS report per company-year, in one query.
 
-    - Upserts rows for each (company, year) that has at least one VALIDATED report
-    - Deletes VsmeRegister rows that no longer have any corresponding reports
+    Includes reports still PROCESSING whose provisional facts are in, not only VALIDATED ones.
+    """
+    ranked = Report.objects.filter(REGISTER_REPORTS).annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=[F("company_id"), F("reporting_year")],
+            order_by=[F("created_at").desc(), F("id").desc()],
+        )
+    )
+    return list(
+        ranked.filter(rank=1)
+        .order_by("id")
+        .values_list("id", "company_id", "reporting_year", "entity")
+    )
+
+
+def _derive_register_rows(reports: list[Tuple[int, int, int, str]]) -> list[Dict[str, Any]]:
+    """Derive register field values for a chunk of reports from one id-ordered fact scan.
+
+    Returns plain dicts so chunks can be computed in worker processes.
+    """
+    scans = match_reports_metrics([r[0] for r in reports])
+    derived = []
+    for report_id, company_id, year, entity in reports:
+        values, sources = _metric_values(scans.get(report_id, ({}, 0))[0])
+        derived.append({
+            "company_id": company_id,
+            "year": year,
+            "entity_identifier": entity or "",
+            "completeness_score": _compute_completeness(values),
+            "last_report_id": report_id,
+            "source_concepts": sources,
+            **values,
+        })
+    return derived
+
+
+def _write_register_rows(derived: list[Dict[str, Any]]) -> int:
+    """Bulk upsert derived rows with INSERT ... ON CONFLICT (company, year) DO UPDATE."""
+    if not derived:
+        return 0
+    # Keep a known entity identifier when the latest report has none, like upsert_vsme_register does
+    missing = [(d["company_id"], d["year"]) for d in derived if not d["entity_identifier"]]
+    if missing:
+        known = {
+            (c, y): e
+            for c, y, e in VsmeRegister.objects.filter(
+                company_id__in={c for c, _ in missing}, year__in={y for _, y in missing}
+            ).values_list("company_id", "year", "entity_identifier")
+        }
+        for d in derived:
+            if not d["entity_identifier"]:
+                d["entity_identifier"] = known.get((d["company_id"], d["year"]), "")
+    VsmeRegister.objects.bulk_create(
+        [VsmeRegister(**d) for d in derived],
+        update_conflicts=True,
+        unique_fields=["company", "year"],
+        update_fields=[
+            *METRIC_FIELDS,
+            "entity_identifier",
+            "completeness_score",
+            "last_report",
+            "source_concepts",
+            "updated_at",
+        ],
+    )
+    return len(derived)
+
+
+def rebuild_all_vsme_registers(
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict:
+    """Rebuild the entire VsmeRegister table from current VALIDATED (and provisional) reports.
+
+    - Picks the latest REGISTER_REPORTS report per (company, year) with one window-function query
+    - Derives metrics in chunks (optionally on a process pool of `workers`) and bulk upserts them
+    - Deletes VsmeRegister rows without any such report in a single statement
+    `progress(done, total)` is called after each chunk is written.
     Returns a summary dict of actions.
     """
+    logger = logging.getLogger(__name__)
+    workers = settings.VSME_REGISTER_REBUILD_WORKERS if workers is None else workers
+    chunk_size = max(chunk_size or settings.VSME_REGISTER_REBUILD_CHUNK_SIZE, 1)
     summary = {"upserted": 0, "deleted": 0}
     try:
-        # Compute desired set from reports
-        desired_pairs = set(
-            Report.objects.filter(status=Report.Status.VALIDATED)
-            .values_list("company_id", "reporting_year")
-            .distinct()
-        )
-        # Upsert for each desired pair using latest report
-        for (company_id, year) in desired_pairs:
-            latest = (
-                Report.objects.filter(
-                    company_id=company_id,
-                    reporting_year=year,
-                    status=Report.Status.VALIDATED,
-                )
-                .order_by("-created_at")
-                .first()
+        latest = _latest_register_reports()
+        chunks = [latest[i:i + chunk_size] for i in range(0, len(latest), chunk_size)]
+        total = len(latest)
+
+        executor = None
+        if workers > 0 and len(chunks) > 1:
+            # Children open their own connections; don't let them inherit ours
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=min(workers, len(chunks)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
             )
-            if latest:
-                upsert_vsme_register(latest)
-                summary["upserted"] += 1
+        try:
+            results = executor.map(_derive_register_rows, chunks) if executor else map(_derive_register_rows, chunks)
+            for derived in results:
+                summary["upserted"] += _write_register_rows(derived)
+                logger.info("VsmeRegister rebuild: %d/%d company-years written", summary["upserted"], total)
+                if progress:
+                    progress(summary["upserted"], total)
+        finally:
+            if executor:
+                executor.shutdown()
 
-        # Delete rows that are not in desired set
-        existing_pairs = set(
-            VsmeRegister.objects.values_list("company_id", "year")
+        has_register_report = Report.objects.filter(
+            REGISTER_REPORTS,
+            company_id=OuterRef("company_id"),
+            reporting_year=OuterRef("year"),
         )
-        to_delete = existing_pairs - desired_pairs
-        if to_delete:
-            for (company_id, year) in to_delete:
-                VsmeRegister.objects.filter(company_id=company_id, year=year).delete()
-                summary["deleted"] += 1
+        summary["deleted"] = VsmeRegister.objects.filter(~Exists(has_register_report)).delete()[0]
+        # Bulk writes bypass the post_save/post_delete signals
+        bump_data_version()
     except Exception:
-        logging.getLogger(__name__).exception("Failed full rebuild of VsmeRegister")
+        logger.exception("Failed full rebuild of VsmeRegister")
     return summary
-
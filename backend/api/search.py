@@ -0,0 +1,86 @@
+from django.db import connection
+from django.db.models import BooleanField, Case, F, FloatField, Func, Q, QuerySet, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Upper
+from .models import Fact
+
+MIN_QUERY_LENGTH = 2
+
+
+def _trigram(function: str, *expressions) -> Func:
+    return Func(*expressions, function=function, output_field=FloatField())
+
+
+def _postgres_search(qs: QuerySet, q: str) -> QuerySet:
+    """Full-text match on `search_vector` or trigram-indexed substring match, ranked by relevance.
+
+    Concept names are matched on the small `api_concept` table (trigram index on qname).
+    """
+    table = connection.ops.quote_name(Fact._meta.db_table)
+    tsquery = "plainto_tsquery('simple', %s)"
+    matches_text = RawSQL(f"{table}.search_vector @@ {tsquery}", [q], output_field=BooleanField())
+    qname = Upper(F("concept__qname"))
+    rank = (
+        RawSQL(f"COALESCE(ts_rank({table}.search_vector, {tsquery}), 0) * 2", [q], output_field=FloatField())
+        + _trigram("word_similarity", Upper(Value(q)), qname)
+        + _trigram("similarity", qname, Upper(Value(q)))
+    )
+    return qs.filter(
+        Q(concept__qname__icontains=q) | Q(value__icontains=q) | Q(matches_text)
+    ).annotate(rank=rank)
+
+
+def _fallback_search(qs: QuerySet, q: str) -> QuerySet:
+    """SQLite and other backends: substring scan, ranked by how closely the concept matches."""
+    rank = Case(
+        When(concept__qname__iexact=q, then=Value(3.0)),
+        When(concept__qname__iendswith=q, then=Value(2.5)),
+        When(concept__qname__icontains=q, then=Value(2.0)),
+        When(value__iexact=q, then=Value(1.5)),
+        default=Value(1.0),
+        output_field=FloatField(),
+    )
+    return qs.filter(Q(concept__qname__icontains=q) | Q(value__icontains=q)).annotate(rank=rank)
+
+
+def search_facts(user, q: str, limit: int = 50) -> list[dict]:
+    """Search facts across every report `user` owns, best matches first."""
+    q = q.strip()
+    if len(q) < MIN_QUERY_LENGTH:
+        return []
+    qs = Fact.objects.filter(report__owner=user)
+    qs = _postgres_search(qs, q) if connection.vendor == "postgresql" else _fallback_search(qs, q)
+    rows = (
+        qs.order_by("-rank", "-report_id", "id")
+        .values(
+            "id",
+            "report_id",
+            "value",
+            "rank",
+            concept_qname=F("concept__qname"),
+            unit_code=Coalesce("unit__code", Value("")),
+            period_label=Coalesce("period__label", Value("")),
+            report_number=F("report__user_report_number"),
+            company_name=F("report__company__name"),
+            reporting_year=F("report__reporting_year"),
+        )[:limit]
+    )
+    results = []
+    for r in rows:
+        value = r["value"] or ""
+        results.append({
+            "id": r["id"],
+            "report": {
+                "id": r["report_id"],
+                "user_report_number": r["report_number"],
+                "company": r["company_name"],
+                "reporting_year": r["reporting_year"],
+            },
+            "concept": r["concept_qname"],
+            # Narrative facts can be huge; the full value is available from the report's facts endpoint
+            "value": value if len(value) <= 300 else value[:300] + "…",
+            "unit": r["unit_code"],
+            "context": r["period_label"],
+            "rank": round(float(r["rank"] or 0), 4),
+        })
+    return results
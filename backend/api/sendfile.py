@@ -0,0 +1,49 @@
+"""Hand file downloads to the front proxy after the view's permission checks.
+
+With `FILE_OFFLOAD=nginx` the response carries only an `X-Accel-Redirect` header
+pointing at an `internal` nginx location that aliases MEDIA_ROOT (see
+frontend/nginx.conf); with `FILE_OFFLOAD=sendfile` it carries `X-Sendfile` with the
+absolute path (Apache mod_xsendfile, lighttpd). The proxy then streams the file and
+handles Range requests, caching and slow clients. Unset, Django streams the file itself.
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import FieldFile
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+
+def file_response(
+    file: FieldFile | str,
+    *,
+    as_attachment: bool = True,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> HttpResponse:
+    """Response serving `file` (a stored FileField value or a storage name). Raises FileNotFoundError if it is gone."""
+    name = file if isinstance(file, str) else file.name
+    filename = filename or os.path.basename(name)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    mode = settings.FILE_OFFLOAD
+    if mode not in ("nginx", "sendfile"):
+        handle = default_storage.open(name, "rb") if isinstance(file, str) else file.open("rb")
+        return FileResponse(
+            handle, as_attachment=as_attachment, filename=filename, content_type=content_type
+        )
+
+    path = default_storage.path(name) if isinstance(file, str) else file.path
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    response = HttpResponse(content_type=content_type)
+    if mode == "nginx":
+        response["X-Accel-Redirect"] = settings.FILE_OFFLOAD_NGINX_PREFIX + quote(name)
+    else:
+        response["X-Sendfile"] = path
+    disposition = content_disposition_header(as_attachment, filename)
+    if disposition:
+        response["Content-Disposition"] = disposition
+    return response
@@ -1,8 +1,12 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
-from .models import Report, Company, VsmeRegister
+from .models import Report, Company, UploadSession, VsmeRegister
+from .oim import quick_extract_metadata_from_file
+from .preflight import PreflightError, check_upload
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.db import models
+from django.db.models.functions import Lower
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -32,28 +36,6 @@ class OAuthUserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class ReportListSerializer(serializers.ModelSerializer):
-    company = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Report
-        fields = [
-            "id",
-            "user_report_number",
-            "company",
-            "reporting_year",
-            "entity",
-            "reporting_period",
-            "status",
-            "created_at",
-        ]
-
-    def get_company(self, obj: Report) -> dict | None:
-        if not obj.company_id:
-            return None
-        return {"id": obj.company_id, "name": obj.company.name}
-
-
 class ReportDetailSerializer(serializers.ModelSerializer):
     original_file_url = serializers.SerializerMethodField()
     oim_json_file_url = serializers.SerializerMethodField()
@@ -70,8 +52,10 @@ class ReportDetailSerializer(serializers.ModelSerializer):
             "reporting_period",
             "taxonomy_version",
             "status",
+            "phase",
             "validation_summary",
             "failure_reason",
+            "fact_count",
             "original_file_url",
             "oim_json_file_url",
             "created_at",
@@ -153,7 +137,7 @@ class ReportUploadSerializer(serializers.Serializer):
         # Create a fallback company if none provided
         if not company and not company_name:
             # Extract filename as company name fallback
-            filename = original_file.name
+            filename = self.context.get("filename") or original_file.name
             if filename:
                 # Use filename without extension as company name
                 company_name = filename.rsplit('.', 1)[0]
@@ -176,24 +160,33 @@ class ReportUploadSerializer(serializers.Serializer):
                     company = Company.objects.create(name=company_name)
                 logger.info("Created fallback company: %s", company.name)
         
+        # Entity/period/year from the iXBRL header contexts (milliseconds; Arelle confirms them later)
+        source = default_storage.path(original_file) if isinstance(original_file, str) else original_file
+        entity, reporting_period, detected_year = quick_extract_metadata_from_file(source)
+        if not reporting_year and detected_year:
+            reporting_year = detected_year
+            logger.info("Using reporting year from the iXBRL header: %s", reporting_year)
+
         # Use default year if none provided (will be updated during processing)
         if not reporting_year:
             from datetime import datetime
             reporting_year = datetime.now().year  # Use current year as default
             logger.info("Using default reporting year: %s", reporting_year)
         
-        # Check for duplicates with a unique suffix if needed
-        base_company = company
-        counter = 1
-        while Report.objects.filter(company=company, reporting_year=reporting_year).exists():
+        # Check for duplicates with a unique suffix if needed (one query for all candidate names).
+        # Compared case-insensitively, like the name__iexact lookup that resolves the variant below.
+        candidates = [company.name] + [f"{company.name} ({counter})" for counter in range(1, 11)]
+        taken = set(
+            Report.objects.annotate(company_lname=Lower("company__name"))
+            .filter(reporting_year=reporting_year, company_lname__in=[name.lower() for name in candidates])
+            .values_list("company_lname", flat=True)
+        )
+        if company.name.lower() in taken:
             # Create a variant company name to avoid duplicates
-            variant_name = f"{base_company.name} ({counter})"
+            variant_name = next((name for name in candidates[1:] if name.lower() not in taken), candidates[-1])
             company = Company.objects.filter(name__iexact=variant_name).first()
             if not company:
                 company = Company.objects.create(name=variant_name)
-            counter += 1
-            if counter > 10:  # Prevent infinite loop
-                break
         
         logger.info("Creating report for company=%s, year=%s", company.name, reporting_year)
         
@@ -206,8 +199,11 @@ class ReportUploadSerializer(serializers.Serializer):
         return Report.objects.create(
             owner=user,
             original_file=original_file,
+            content_sha256=self.context.get("content_sha256", ""),
             company=company,
             reporting_year=reporting_year,
+            entity=entity,
+            reporting_period=reporting_period,
             user_report_number=next_user_report_number
         )
 
@@ -221,6 +217,11 @@ class ReportUploadSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 f"File too large. Max size is {settings.MAX_UPLOAD_SIZE_MB} MB"
             )
+        # Reject junk (non-iXBRL pages, ZIP bombs) before a report is queued for Arelle
+        try:
+            check_upload(file, file.name)
+        except PreflightError as e:
+            raise serializers.ValidationError(str(e))
         return file
 
     def validate_reporting_year(self, year):
@@ -252,33 +253,47 @@ class ReportUploadSerializer(serializers.Serializer):
         return attrs
 
 
-class CompanySerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Company
-        fields = ["id", "name"]
+class UploadSessionSerializer(ReportUploadSerializer):
+    """Starts a chunked upload (api/chunked.py); the report is created when it completes."""
 
+    original_file = None
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
 
-class VsmeRegisterListSerializer(serializers.ModelSerializer):
-    company = serializers.SerializerMethodField()
+    def validate_filename(self, filename):
+        # Only the base name is kept; the stored name is chosen by the storage
+        filename = filename.replace("\\", "/").rsplit("/", 1)[-1].strip()
+        if not filename.lower().endswith((".xhtml", ".html", ".zip")):
+            raise serializers.ValidationError("Accepted file types: .xhtml, .html, or .zip (IXDS)")
+        return filename
+
+    def validate_size(self, size):
+        if size > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+            raise serializers.ValidationError(f"File too large. Max size is {settings.MAX_UPLOAD_SIZE_MB} MB")
+        return size
+
+    def create(self, validated_data):
+        from .chunked import start_session
+
+        return start_session(self.context["request"].user, **validated_data)
+
+
+class UploadSessionStatusSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source="received")
+    complete = serializers.SerializerMethodField()
 
     class Meta:
-        model = VsmeRegister
-        fields = [
-            "id",
-            "company",
-            "year",
-            "entity_identifier",
-            "employees_value",
-            "ghg_total_value",
-            "energy_consumption_value",
-            "water_withdrawal_value",
-            "waste_generated_value",
-            "completeness_score",
-            "updated_at",
-        ]
+        model = UploadSession
+        fields = ["id", "filename", "size", "offset", "complete", "report"]
 
-    def get_company(self, obj: VsmeRegister) -> dict:
-        return {"id": obj.company_id, "name": obj.company.name}
+    def get_complete(self, obj) -> bool:
+        return obj.completed_at is not None
+
+
+class CompanySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Company
+        fields = ["id", "name"]
 
 
 class VsmeRegisterDetailSerializer(serializers.ModelSerializer):
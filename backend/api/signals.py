@@ -1,13 +1,24 @@
-from django.db.models.signals import post_delete, pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
+from .documents import delete_rendered
+from .insights import bump_data_version
 from .models import Report, VsmeRegister
-from .register import recompute_vsme_register
+from .register import REGISTER_REPORTS, recompute_vsme_register
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+@receiver(post_save, sender=VsmeRegister)
+@receiver(post_delete, sender=VsmeRegister)
+def invalidate_insights_cache(sender, instance, **kwargs):
+    """Bump the insights data version so cached dashboards are recomputed."""
+    bump_data_version()
+
+
 @receiver(post_delete, sender=Report)
 def cleanup_vsme_register_on_report_delete(sender, instance, **kwargs):
     """
@@ -25,6 +36,12 @@ def cleanup_vsme_register_on_report_delete(sender, instance, **kwargs):
         )
 
 
+@receiver(post_delete, sender=Report)
+def delete_rendered_document(sender, instance, **kwargs):
+    """Remove the pre-rendered viewer document of a deleted report."""
+    delete_rendered(instance.id)
+
+
 @receiver(post_delete, sender=Report)
 def renumber_user_reports_on_delete(sender, instance, **kwargs):
     """
@@ -55,8 +72,8 @@ def cleanup_vsme_register_on_user_delete(sender, instance, **kwargs):
         # Collect all (company_id, year) pairs from user's validated reports before cascade deletion
         company_year_pairs = list(
             Report.objects.filter(
-                owner=instance, 
-                status=Report.Status.VALIDATED
+                REGISTER_REPORTS,
+                owner=instance,
             ).values_list('company_id', 'reporting_year').distinct()
         )
         
@@ -0,0 +1,130 @@
+"""Unit normalisation for register metrics.
+
+Fact units arrive as OIM unit strings (`utr:MWh`, `utr:t`, `esrs:tCO2e`, ...).
+`to_canonical` converts a value to the canonical unit of a dimension so portfolio
+aggregates can be plain SQL SUMs over the `*_tco2e` / `*_mwh` / `*_t` / `*_m3` columns.
+"""
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+from typing import Dict
+
+# dimension -> canonical unit label (for display)
+CANONICAL_UNITS: Dict[str, str] = {
+    "ghg": "tCO2e",
+    "energy": "MWh",
+    "mass": "t",
+    "volume": "m3",
+}
+
+_MASS: Dict[str, Decimal] = {
+    "t": Decimal("1"),
+    "tonne": Decimal("1"),
+    "tonnes": Decimal("1"),
+    "metricTon": Decimal("1"),
+    "g": Decimal("0.000001"),
+    "kg": Decimal("0.001"),
+    "kt": Decimal("1000"),
+    "Mt": Decimal("1000000"),
+    "lb": Decimal("0.00045359237"),
+}
+
+# Unit local name -> factor to the canonical unit of the dimension
+_FACTORS: Dict[str, Dict[str, Decimal]] = {
+    "ghg": {
+        **_MASS,
+        "tCO2e": Decimal("1"),
+        "tCO2eq": Decimal("1"),
+        "tCO2": Decimal("1"),
+        "gCO2e": Decimal("0.000001"),
+        "kgCO2e": Decimal("0.001"),
+        "kgCO2eq": Decimal("0.001"),
+        "ktCO2e": Decimal("1000"),
+        "MtCO2e": Decimal("1000000"),
+    },
+    "energy": {
+        "Wh": Decimal("0.000001"),
+        "kWh": Decimal("0.001"),
+        "MWh": Decimal("1"),
+        "GWh": Decimal("1000"),
+        "TWh": Decimal("1000000"),
+        "J": Decimal("1") / Decimal("3600000000"),
+        "kJ": Decimal("1") / Decimal("3600000"),
+        "MJ": Decimal("1") / Decimal("3600"),
+        "GJ": Decimal("1") / Decimal("3.6"),
+        "TJ": Decimal("1000") / Decimal("3.6"),
+        "PJ": Decimal("1000000") / Decimal("3.6"),
+        "Btu": Decimal("0.00000029307107"),
+        "MMBtu": Decimal("0.29307107"),
+        "therm": Decimal("0.029307107"),
+        "toe": Decimal("11.63"),
+        "ktoe": Decimal("11630"),
+    },
+    "mass": _MASS,
+    "volume": {
+        "m3": Decimal("1"),
+        "dam3": Decimal("1000"),
+        "hm3": Decimal("1000000"),
+        "km3": Decimal("1000000000"),
+        "l": Decimal("0.001"),
+        "L": Decimal("0.001"),
+        "hl": Decimal("0.1"),
+        "kl": Decimal("1"),
+        "ml": Decimal("0.000001"),
+        "Ml": Decimal("1000"),
+        "ML": Decimal("1000"),
+        "megalitre": Decimal("1000"),
+        "Gl": Decimal("1000000"),
+        "gal": Decimal("0.003785411784"),
+    },
+}
+
+
+# Spellings that differ only by case from another unit (MT = metric ton or megatonne?)
+_AMBIGUOUS_FOLDED = {"mt", "ml"}
+
+
+def _case_insensitive(factors: Dict[str, Decimal]) -> Dict[str, Decimal]:
+    """Lower-cased aliases, dropping names that collide with a different factor."""
+    folded: Dict[str, Decimal] = {}
+    clashes = set(_AMBIGUOUS_FOLDED)
+    for name, factor in factors.items():
+        key = name.lower()
+        if key in folded and folded[key] != factor:
+            clashes.add(key)
+        folded[key] = factor
+    return {k: v for k, v in folded.items() if k not in clashes}
+
+
+_FOLDED: Dict[str, Dict[str, Decimal]] = {dim: _case_insensitive(f) for dim, f in _FACTORS.items()}
+
+
+def unit_factor(unit: str, dimension: str) -> Decimal | None:
+    """Return the factor converting `unit` to the canonical unit of `dimension`, or None if unknown.
+
+    Accepts OIM QNames (`utr:kWh`), bare names and the common spellings `m³`, `CO₂`.
+    Compound units (`iso4217:EUR/utr:MWh`) are not converted.
+    """
+    if not unit or dimension not in _FACTORS:
+        return None
+    if "/" in unit or "*" in unit:
+        return None
+    name = unit.rsplit(":", 1)[-1].strip()
+    name = name.replace("³", "3").replace("₂", "2").replace(" ", "").replace("-", "")
+    factor = _FACTORS[dimension].get(name)
+    if factor is None:
+        factor = _FOLDED[dimension].get(name.lower())
+    return factor
+
+
+def to_canonical(value: Decimal | None, unit: str, dimension: str) -> Decimal | None:
+    """Convert `value` in `unit` to the canonical unit of `dimension`; None when not convertible."""
+    if value is None:
+        return None
+    factor = unit_factor(unit, dimension)
+    if factor is None:
+        return None
+    try:
+        return (value * factor).quantize(Decimal("0.000001"))
+    except InvalidOperation:
+        return None
@@ -0,0 +1,38 @@
+import hashlib
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """Compute a SHA-256 per uploaded file while the multipart body streams in.
+
+    Placed first in `request.upload_handlers`; it passes every chunk through untouched
+    so the regular memory/temp-file handlers still build the UploadedFile.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.digests: dict[str, str] = {}
+        self._hasher = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self._hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._hasher is not None:
+            self._hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self._hasher is not None:
+            self.digests[self.field_name] = self._hasher.hexdigest()
+            self._hasher = None
+        return None
+
+
+def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -18,6 +18,10 @@ urlpatterns = [
     path("reports/", views.report_list, name="report_list"),
     path("reports/upload/", views.report_upload, name="report_upload"),
     path("reports/upload", views.report_upload),  # allow missing trailing slash for POST
+    path("uploads/", views.upload_start, name="upload_start"),
+    path("uploads/<uuid:session_id>/", views.upload_session, name="upload_session"),
+    path("uploads/<uuid:session_id>/complete/", views.upload_complete, name="upload_complete"),
+    path("reports/batch/", views.report_batch, name="report_batch"),
     path("reports/<int:report_id>/", views.report_detail, name="report_detail"),
     path("reports/<int:report_id>/facts/", views.report_facts, name="report_facts"),
     path("reports/<int:report_id>/summary/", views.report_summary, name="report_summary"),
@@ -27,11 +31,13 @@ urlpatterns = [
     path("reports/<int:report_id>/download/oim-json/", views.download_oim_json, name="download_oim_json"),
     path("reports/<int:report_id>/document/", views.report_document, name="report_document"),
     path("reports/<int:report_id>/asset/<path:member>", views.report_asset, name="report_asset"),
+    path("facts/search/", views.fact_search, name="fact_search"),
     path("companies/", views.companies_list, name="companies_list"),
     path("companies", views.companies_list),  # allow missing trailing slash for POST
     # vSME Register (avoid conflict with user registration endpoint)
     path("vsme-register/", views.register_list, name="vsme_register_list"),
     path("vsme-register/export.csv", views.register_export_csv, name="vsme_register_export_csv"),
+    path("vsme-register/export.ndjson", views.register_export_ndjson, name="vsme_register_export_ndjson"),
     path("vsme-register/<int:company_id>/<int:year>/", views.register_detail, name="vsme_register_detail"),
     path("vsme-register/rebuild/", views.register_rebuild, name="vsme_register_rebuild"),
     path("vsme-register/cleanup-user/", views.register_cleanup_user, name="vsme_register_cleanup_user"),
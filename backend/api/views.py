@@ -1,23 +1,27 @@
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.http import FileResponse, Http404
+from django.http import Http404, StreamingHttpResponse
 import logging
 import json as jsonlib
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from operator import itemgetter
 from .serializers import (
     UserSerializer,
     OAuthUserRegistrationSerializer,
     ReportUploadSerializer,
-    ReportListSerializer,
     ReportDetailSerializer,
+    UploadSessionSerializer,
+    UploadSessionStatusSerializer,
     CompanySerializer,
-    VsmeRegisterListSerializer,
     VsmeRegisterDetailSerializer,
 )
-from .models import Report, Fact, Company, VsmeRegister
+from .models import Report, Fact, Company, UploadSession, VsmeRegister
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework import serializers
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from google.oauth2 import id_token
@@ -26,15 +30,20 @@ from rest_framework.request import Request
 from rest_framework.parsers import MultiPartParser, FormParser
 import json
 from typing import Any
-from .processing import process_report_async
+from .processing import process_report_async, try_reuse_cached_result
+from .uploads import HashingUploadHandler
+from .chunked import OffsetMismatch, append_chunk, finish_session, purge_expired_sessions
 from .oim import extract_metadata, extract_facts
-from .register import upsert_vsme_register, recompute_vsme_register, rebuild_all_vsme_registers
-import mimetypes
+from .insights import cached_portfolio_insights
+from .pagination import id_keyset_page, keyset_page
+from .search import search_facts
+from .documents import document_response, get_document
+from .preflight import PreflightError, check_upload
+from .sendfile import file_response
+from .zipassets import member_response, open_member
+from .register import REGISTER_REPORTS, build_report_summary, match_report_metrics, match_reports_metrics, upsert_vsme_register, recompute_vsme_register, rebuild_all_vsme_registers
 import zipfile as _zipfile
 from urllib.parse import unquote
-from django.db.models import Count, Sum, Max, Avg
-from collections import Counter
-from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
@@ -179,22 +188,213 @@ def health(request: Request) -> Response:
 def report_upload(request: Request) -> Response:
     logger.info("Report upload request from user: %s", request.user)
     
-    serializer = ReportUploadSerializer(data=request.data, context={"request": request})
+    # Hash the file while the multipart body streams in (before request.data is parsed)
+    hasher = HashingUploadHandler(request._request)
+    request._request.upload_handlers.insert(0, hasher)
+    data = request.data
+    serializer = ReportUploadSerializer(
+        data=data,
+        context={"request": request, "content_sha256": hasher.digests.get("original_file", "")},
+    )
     if serializer.is_valid():
         report: Report = serializer.save()
-        process_report_async(report.id)
-        _maybe_schedule_cleanup()
-        return Response({"id": report.id, "status": report.status}, status=201)
+        _start_processing(report)
+        return Response({"id": report.id, "status": report.status, "phase": report.phase}, status=201)
     
     logger.warning("Serializer validation failed: %s", serializer.errors)
     return Response(serializer.errors, status=400)
 
 
+def _start_processing(report: Report) -> None:
+    # Identical bytes validated before: reuse that result instead of queueing Arelle
+    if not try_reuse_cached_result(report):
+        # The worker stores the native (provisional) facts first, then runs Arelle
+        process_report_async(report.id)
+    _maybe_schedule_cleanup()
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def upload_start(request: Request) -> Response:
+    """Start a chunked upload: `{filename, size, company?, company_name?, reporting_year?}`.
+
+    Chunks are then PUT to `/api/uploads/<id>/?offset=N` and the report is created by
+    `/api/uploads/<id>/complete/`. See api/chunked.py.
+    """
+    try:
+        purge_expired_sessions()
+    except Exception:
+        logger.exception("Failed to purge expired upload sessions")
+    serializer = UploadSessionSerializer(data=request.data, context={"request": request})
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+    session = serializer.save()
+    data = UploadSessionStatusSerializer(session).data
+    data["chunk_size"] = settings.UPLOAD_CHUNK_MAX_MB * 1024 * 1024
+    return Response(data, status=201)
+
+
+@api_view(["GET", "PUT"])
+@permission_classes([IsAuthenticated])
+def upload_session(request: Request, session_id) -> Response:
+    """GET: progress of an upload (to resume from `offset`). PUT `?offset=N`: raw chunk bytes as the body."""
+    if request.method == "GET":
+        session = get_object_or_404(UploadSession, id=session_id, owner=request.user)
+        return Response(UploadSessionStatusSerializer(session).data)
+
+    try:
+        offset = int(request.query_params.get("offset", ""))
+    except ValueError:
+        return Response({"offset": ["A byte offset is required."]}, status=400)
+    try:
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        length = 0
+    if length <= 0:
+        return Response({"detail": "Content-Length is required."}, status=411)
+    if length > settings.UPLOAD_CHUNK_MAX_MB * 1024 * 1024:
+        return Response({"detail": f"Chunks are limited to {settings.UPLOAD_CHUNK_MAX_MB} MB."}, status=413)
+    try:
+        # Streamed from the underlying request; the body is never buffered or spooled
+        session = append_chunk(session_id, request.user, offset, request._request, length)
+    except UploadSession.DoesNotExist:
+        raise Http404
+    except OffsetMismatch as e:
+        return Response({"detail": str(e), "offset": e.expected}, status=409)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=400)
+    return Response(UploadSessionStatusSerializer(session).data)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def upload_complete(request: Request, session_id) -> Response:
+    """Create the report from a fully received upload and queue it; repeat calls return the same report."""
+    with transaction.atomic():
+        session = get_object_or_404(
+            UploadSession.objects.select_for_update().select_related("report"), id=session_id, owner=request.user
+        )
+        if session.completed_at is not None:
+            status = session.report.status if session.report else None
+            return Response({"id": session.report_id, "status": status})
+        if session.received != session.size:
+            return Response({"detail": "Upload is incomplete.", "offset": session.received}, status=409)
+        try:
+            check_upload(session.file.path, session.filename)
+        except PreflightError as e:
+            # Nothing to resume: drop the upload with the reason
+            session.file.delete(save=False)
+            session.delete()
+            return Response({"original_file": [str(e)]}, status=400)
+        serializer = ReportUploadSerializer(
+            context={"request": request, "content_sha256": finish_session(session), "filename": session.filename}
+        )
+        # The received file already sits in reports/original/; the report takes over its name
+        report = serializer.create({
+            "original_file": session.file.name,
+            "company": session.company,
+            "company_name": session.company_name,
+            "reporting_year": session.reporting_year,
+        })
+        session.report = report
+        session.completed_at = timezone.now()
+        session.save(update_fields=["report", "completed_at", "updated_at"])
+    _start_processing(report)
+    return Response({"id": report.id, "status": report.status, "phase": report.phase}, status=201)
+
+
+def _column(name: str, lookup: str | None = None):
+    lookup = lookup or name
+    return (lookup,), itemgetter(lookup)
+
+
+def _company_column():
+    return ("company_id", "company__name"), lambda r: {"id": r["company_id"], "name": r["company__name"]}
+
+
+def _decimal_column(model, name: str):
+    field = model._meta.get_field(name)
+    # Same string rendering as a DRF DecimalField in a ModelSerializer
+    fmt = serializers.DecimalField(max_digits=field.max_digits, decimal_places=field.decimal_places)
+    return (name,), lambda r: None if r[name] is None else fmt.to_representation(r[name])
+
+
+def _page_size(params, key: str = "page_size") -> int:
+    try:
+        return max(min(int(params.get(key, 50)), 200), 1)
+    except ValueError:
+        return 50
+
+
+def _paged_values(request: Request, qs, columns: dict, sorts: dict) -> Response:
+    """Keyset-paginated list of `.values()` rows: `sort`, `fields`, `cursor`, `page_size`, `count=1`.
+
+    `columns` maps an output field to (lookups read, function building the value from the row);
+    `sorts` maps a sort key to its ordering, the first entry being the default.
+    """
+    params = request.query_params
+    sort = params.get("sort") or next(iter(sorts))
+    if sort not in sorts:
+        return Response({"sort": [f"Unknown sort key. Use one of: {', '.join(sorts)}."]}, status=400)
+    ordering = sorts[sort]
+    requested = [f.strip() for f in params.get("fields", "").split(",") if f.strip()] or list(columns)
+    unknown = [f for f in requested if f not in columns]
+    if unknown:
+        return Response({"fields": [f"Unknown fields: {', '.join(unknown)}."]}, status=400)
+    names = list(dict.fromkeys(["id", *requested]))
+    lookups = dict.fromkeys([
+        *(lookup for name in names for lookup in columns[name][0]),
+        *(field.lstrip("-") for field in ordering),
+    ])
+    qs = qs.values(*lookups)
+    want_count = params.get("count", "").lower() in ("1", "true", "yes")
+    page_size = _page_size(params)
+    try:
+        rows, next_cursor, prev_cursor = keyset_page(qs, ordering, params.get("cursor") or None, page_size)
+    except ValueError:
+        return Response({"cursor": ["Invalid cursor."]}, status=400)
+    return Response({
+        "results": [{name: columns[name][1](row) for name in names} for row in rows],
+        "count": qs.count() if want_count else None,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    })
+
+
+_REPORT_LIST_COLUMNS = {
+    "id": _column("id"),
+    "user_report_number": _column("user_report_number"),
+    "company": _company_column(),
+    "reporting_year": _column("reporting_year"),
+    "entity": _column("entity"),
+    "reporting_period": _column("reporting_period"),
+    "status": _column("status"),
+    "phase": _column("phase"),
+    "created_at": _column("created_at"),
+}
+
+# Sort key -> ordering (ends in id so positions are unique); the first key is the default
+_REPORT_LIST_SORTS = {
+    "-created_at": ["-created_at", "-id"],
+    "created_at": ["created_at", "id"],
+    "-reporting_year": ["-reporting_year", "-id"],
+    "reporting_year": ["reporting_year", "id"],
+    "company": ["company__name", "id"],
+    "-company": ["-company__name", "-id"],
+}
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def report_list(request: Request) -> Response:
+    """The user's reports, keyset-paginated; `q` matches company, entity, period or an exact year.
+
+    Query params: `sort` (see _REPORT_LIST_SORTS), `fields` (comma-separated subset of
+    _REPORT_LIST_COLUMNS), `cursor`, `page_size` (max 200) and `count=1` for a total.
+    """
     q = request.query_params.get("q", "").strip()
-    reports = Report.objects.select_related("company").filter(owner=request.user)
+    reports = Report.objects.filter(owner=request.user)
     if q:
         # If q looks like a 4-digit year, filter exact by reporting_year
         if q.isdigit() and len(q) == 4:
@@ -206,8 +406,7 @@ def report_list(request: Request) -> Response:
                 | Q(reporting_period__icontains=ql)
                 | Q(company__name__icontains=ql)
             )
-    data = ReportListSerializer(reports, many=True).data
-    return Response(data)
+    return _paged_values(request, reports, _REPORT_LIST_COLUMNS, _REPORT_LIST_SORTS)
 
 
 @api_view(["GET"])
@@ -221,34 +420,67 @@ def report_detail(request: Request, report_id: int) -> Response:
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def report_facts(request: Request, report_id: int) -> Response:
+    """Page through a report's facts, optionally filtered by `q` (concept/value contains).
+
+    Pass `cursor` (from `next_cursor`/`prev_cursor`) for keyset pages on id. The count
+    comes from `Report.fact_count`; with a filter it is only computed when `count=1`
+    is sent, otherwise it is null. The legacy `page` parameter still pages with OFFSET.
+    """
     report = get_object_or_404(Report, id=report_id, owner=request.user)
-    if not report.oim_json_file:
-        return Response({"results": [], "count": 0}, status=200)
+    # Provisional facts (phase one) are served while Arelle still runs
+    if not report.oim_json_file and report.phase == Report.Phase.PENDING:
+        return Response({"results": [], "count": 0, "next_cursor": None, "prev_cursor": None}, status=200)
 
     q = (request.query_params.get("q") or "").lower().strip()
-    page = max(int(request.query_params.get("page", 1)), 1)
-    page_size = max(min(int(request.query_params.get("page_size", 50)), 200), 1)
+    cursor = request.query_params.get("cursor") or None
+    legacy_page = "page" in request.query_params and cursor is None
+    want_count = request.query_params.get("count", "").lower() in ("1", "true", "yes")
+    page_size = _page_size(request.query_params)
 
-    facts_qs = Fact.objects.filter(report=report)
+    facts_qs = Fact.objects.filter(report=report).select_related("concept", "unit", "period")
     if q:
         facts_qs = facts_qs.filter(
-            Q(concept__icontains=q) | Q(value__icontains=q)
+            Q(concept__qname__icontains=q) | Q(value__icontains=q)
         )
 
-    total = facts_qs.count()
-    page_rows = facts_qs.order_by('id')[(page - 1) * page_size: (page - 1) * page_size + page_size]
-    results = [
-        {
-            "concept": f.concept,
-            "value": f.value,
-            "datatype": f.datatype,
-            "unit": f.unit,
-            "context": f.context,
-        }
-        for f in page_rows
-    ]
+    if not q:
+        # fact_count is 0 while ingestion is still streaming rows in
+        total = report.fact_count or facts_qs.count()
+    elif want_count or legacy_page:
+        total = facts_qs.count()
+    else:
+        total = None
 
-    return Response({"results": results, "count": total, "page": page, "page_size": page_size})
+    def _rows(facts):
+        return [
+            {
+                "id": f.id,
+                "concept": f.concept.qname,
+                "value": f.value,
+                "datatype": f.datatype,
+                "unit": f.unit_code,
+                "context": f.context,
+                "source_document": f.source_document,
+            }
+            for f in facts
+        ]
+
+    if legacy_page:
+        page = max(int(request.query_params.get("page", 1)), 1)
+        page_rows = facts_qs.order_by('id')[(page - 1) * page_size: (page - 1) * page_size + page_size]
+        return Response({"results": _rows(page_rows), "count": total, "page": page, "page_size": page_size})
+
+    try:
+        page_rows, next_cursor, prev_cursor = id_keyset_page(facts_qs, cursor, page_size)
+    except ValueError:
+        return Response({"cursor": ["Invalid cursor."]}, status=400)
+    return Response({
+        "results": _rows(page_rows),
+        "count": total,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    })
 
 
 @api_view(["GET"])
@@ -270,68 +502,85 @@ def report_summary(request: Request, report_id: int) -> Response:
     """
     report = get_object_or_404(Report, id=report_id, owner=request.user)
 
-    facts_qs = Fact.objects.filter(report=report)
-    total_count = facts_qs.count()
-
-    # Hardcoded concept matching rules (simple contains checks)
-    checks = [
-        {
-            "label": "Total GHG emissions",
-            "code": "ghg_total",
-            # Try likely vSME concept fragments
-            "concept_contains": ["TotalGHG", "GHGEmissions", "GreenhouseGasEmissions"],
-        },
-        {
-            "label": "Energy consumption",
-            "code": "energy_consumption",
-            "concept_contains": ["TotalEnergyConsumption", "EnergyConsumption"],
-        },
-        {
-            "label": "Water withdrawal",
-            "code": "water_withdrawal",
-            "concept_contains": ["WaterWithdrawal"],
-        },
-        {
-            "label": "Waste generated",
-            "code": "waste_generated",
-            "concept_contains": ["WasteGenerated", "TotalWasteGenerated"],
-        },
-        {
-            "label": "Employees",
-            "code": "employees",
-            "concept_contains": ["NumberOfEmployees", "Employees"],
-        },
-    ]
-
-    items: list[dict] = []
-    present_count = 0
-
-    for chk in checks:
-        matched_fact = None
-        for frag in chk["concept_contains"]:
-            f = facts_qs.filter(concept__icontains=frag).order_by("id").first()
-            if f:
-                matched_fact = f
-                break
-        item = {
-            "label": chk["label"],
-            "code": chk["code"],
-            "present": bool(matched_fact),
-            "value": matched_fact.value if matched_fact else None,
-        }
-        if item["present"]:
-            present_count += 1
-        items.append(item)
-
-    data = {
+    # Stored at the end of processing; reports not processed since (or still ingesting) are computed live
+    summary = report.summary
+    if summary is None:
+        summary = build_report_summary(*match_report_metrics(report.id))
+    return Response(_summary_data(report, summary))
+
+
+def _summary_data(report: Report, summary: dict) -> dict:
+    return {
         "entity": report.entity,
         "reporting_period": report.reporting_period,
-        "fact_count": total_count,
-        "required_count": len(checks),
-        "present_count": present_count,
-        "items": items,
+        **summary,
     }
-    return Response(data)
+
+
+_BATCH_DETAIL_FIELDS = list(ReportDetailSerializer.Meta.fields)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def report_batch(request: Request) -> Response:
+    """Details and summaries for many reports in one request.
+
+    Body: {"ids": [int, ...], "fields": [str, ...]}. `fields` is optional and selects
+    report detail fields and/or "summary" (default: all of them). Results follow the
+    order of `ids`; ids that don't exist or belong to another user are listed in `missing`.
+    Reports are read with one query; summaries not stored yet add one fact query in total.
+    """
+    ids = request.data.get("ids")
+    if not isinstance(ids, list) or not ids or not all(type(i) is int for i in ids):
+        return Response({"ids": ["Expected a non-empty list of report ids."]}, status=400)
+    if len(ids) > settings.REPORT_BATCH_MAX_IDS:
+        return Response({"ids": [f"At most {settings.REPORT_BATCH_MAX_IDS} ids per request."]}, status=400)
+    fields = request.data.get("fields")
+    if fields is None:
+        fields = [*_BATCH_DETAIL_FIELDS, "summary"]
+    if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+        return Response({"fields": ["Expected a list of field names."]}, status=400)
+    unknown = sorted(set(fields) - set(_BATCH_DETAIL_FIELDS) - {"summary"})
+    if unknown:
+        return Response({"fields": [f"Unknown fields: {', '.join(unknown)}."]}, status=400)
+
+    ids = list(dict.fromkeys(ids))
+    reports = {
+        r.id: r for r in Report.objects.filter(owner=request.user, id__in=ids).select_related("company")
+    }
+    detail_fields = [f for f in _BATCH_DETAIL_FIELDS if f in fields]
+    with_summary = "summary" in fields
+    live_scans = {}
+    if with_summary:
+        pending = [r.id for r in reports.values() if r.summary is None]
+        if pending:
+            live_scans = match_reports_metrics(pending)
+
+    results = []
+    for report_id in ids:
+        report = reports.get(report_id)
+        if report is None:
+            continue
+        item = {"id": report.id}
+        if detail_fields:
+            data = ReportDetailSerializer(report).data
+            item.update({f: data[f] for f in detail_fields})
+        if with_summary:
+            summary = report.summary
+            if summary is None:
+                summary = build_report_summary(*live_scans.get(report.id, ({}, 0)))
+            item["summary"] = _summary_data(report, summary)
+        results.append(item)
+    return Response({"results": results, "missing": [i for i in ids if i not in reports]})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def fact_search(request: Request) -> Response:
+    """Search facts (concept/value) across all of the user's reports, ranked by relevance."""
+    q = (request.query_params.get("q") or "").strip()
+    limit = _page_size(request.query_params, "limit")
+    return Response({"q": q, "results": search_facts(request.user, q, limit)})
 
 
 @api_view(["DELETE"])
@@ -376,13 +625,11 @@ def download_original(request: Request, report_id: int):
     if not report.original_file:
         raise Http404
     try:
-        f = report.original_file.open("rb")
+        return file_response(report.original_file)
     except FileNotFoundError:
         report.original_file = None
         report.save(update_fields=["original_file", "updated_at"])
         raise Http404
-    filename = report.original_file.name.split("/")[-1]
-    return FileResponse(f, as_attachment=True, filename=filename)
 
 
 @api_view(["GET"])
@@ -392,89 +639,39 @@ def download_oim_json(request: Request, report_id: int):
     if not report.oim_json_file:
         raise Http404
     try:
-        f = report.oim_json_file.open("rb")
+        return file_response(report.oim_json_file)
     except FileNotFoundError:
         report.oim_json_file = None
         report.save(update_fields=["oim_json_file", "updated_at"])
         raise Http404
-    filename = report.oim_json_file.name.split("/")[-1]
-    return FileResponse(f, as_attachment=True, filename=filename)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def report_document(request: Request, report_id: int):
     """Return the primary HTML/XHTML document content for inline viewing.
-    If the original upload was a ZIP, extract the first .xhtml/.html entry and rewrite relative links
-    to point to the asset endpoint.
+    If the original upload was a ZIP, the first .xhtml/.html entry is served with relative links
+    pointing to the asset endpoint. The document is rendered once and served precompressed.
     """
     report = get_object_or_404(Report, id=report_id, owner=request.user)
     if not report.original_file:
         raise Http404
-    path = report.original_file.path
-    lower = path.lower()
-    html_content: str | None = None
     try:
-        if lower.endswith('.zip'):
-            try:
-                with _zipfile.ZipFile(path, 'r') as zf:
-                    # choose first .xhtml/.html entry
-                    names = [n for n in zf.namelist() if n.lower().endswith(('.xhtml', '.html'))]
-                    if not names:
-                        raise Http404
-                    names.sort()
-                    main = names[0]
-                    raw = zf.read(main)
-                    try:
-                        text = raw.decode('utf-8')
-                    except UnicodeDecodeError:
-                        text = raw.decode('latin-1', errors='replace')
-                    # insert <base> so relative links resolve via asset endpoint
-                    base_href = f"/api/reports/{report_id}/asset/"
-                    html_content = _inject_base_tag(text, base_href)
-            except FileNotFoundError:
-                # File missing on disk (likely after container rebuild); clear field and 404
-                report.original_file = None
-                report.save(update_fields=["original_file", "updated_at"])
-                raise Http404
-        elif lower.endswith('.xhtml') or lower.endswith('.html'):
-            try:
-                with open(path, 'rb') as f:
-                    raw = f.read()
-            except FileNotFoundError:
-                raise Http404
-            try:
-                text = raw.decode('utf-8')
-            except UnicodeDecodeError:
-                text = raw.decode('latin-1', errors='replace')
-            html_content = text
-        else:
-            raise Http404
+        doc = get_document(report)
+    except FileNotFoundError:
+        # File missing on disk (likely after container rebuild); clear field and 404
+        report.original_file = None
+        report.save(update_fields=["original_file", "updated_at"])
+        raise Http404
     except _zipfile.BadZipFile:
         raise Http404
-
-    from django.http import HttpResponse
-    if html_content is None:
+    if doc is None:
         raise Http404
-    # Serve as text/html to maximize browser compatibility
-    resp = HttpResponse(html_content.encode('utf-8'), content_type='text/html; charset=utf-8')
-    return resp
-
-
-def _inject_base_tag(html: str, base_href: str) -> str:
-    """Insert a <base> tag into <head> to make relative links resolve via base_href."""
     try:
-        idx = html.lower().find('<head')
-        if idx == -1:
-            # No head; prepend base and return
-            return f'<head><base href="{base_href}" /></head>' + html
-        # find end of <head ...>
-        end = html.find('>', idx)
-        if end == -1:
-            return html
-        return html[: end + 1] + f'\n<base href="{base_href}" />\n' + html[end + 1 :]
-    except Exception:
-        return html
+        return document_response(request, doc)
+    except FileNotFoundError:
+        # Render removed underneath us (report re-rendered or deleted); the next view re-renders
+        raise Http404
 
 
 @api_view(["GET"])
@@ -489,20 +686,12 @@ def report_asset(request: Request, report_id: int, member: str):
     member = unquote(member)
     member = member.lstrip('/').replace('..', '')
     try:
-        with _zipfile.ZipFile(path, 'r') as zf:
-            if member not in zf.namelist():
-                # try with reports/ prefix if not provided
-                alt = f"reports/{member}"
-                if alt in zf.namelist():
-                    member = alt
-                else:
-                    raise Http404
-            data = zf.read(member)
+        opened = open_member(path, member)
     except (FileNotFoundError, _zipfile.BadZipFile):
         raise Http404
-    ctype, _ = mimetypes.guess_type(member)
-    from django.http import HttpResponse
-    return HttpResponse(data, content_type=ctype or 'application/octet-stream')
+    if opened is None:
+        raise Http404
+    return member_response(request, *opened)
 
 @api_view(["GET", "POST"])
 @permission_classes([IsAuthenticated])
@@ -531,16 +720,20 @@ def companies_list(request: Request) -> Response:
     return Response(CompanySerializer(company).data, status=201)
 
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def register_list(request: Request) -> Response:
-    """List/filter VsmeRegister rows by company name, year range, and min completeness."""
-    qs = VsmeRegister.objects.select_related("company").all()
-    company = request.query_params.get("company", "").strip()
-    year = request.query_params.get("year", "").strip()
-    year_from = request.query_params.get("year_from", "").strip()
-    year_to = request.query_params.get("year_to", "").strip()
-    min_comp = request.query_params.get("min_completeness", "").strip()
+def _user_register(user):
+    """Register rows for the company-years `user` has reported."""
+    return VsmeRegister.objects.filter(
+        Exists(Report.objects.filter(owner=user, company_id=OuterRef("company_id"), reporting_year=OuterRef("year")))
+    )
+
+
+def _filter_register(qs, params):
+    """Apply the register list filters: company name, year or year range, min completeness."""
+    company = params.get("company", "").strip()
+    year = params.get("year", "").strip()
+    year_from = params.get("year_from", "").strip()
+    year_to = params.get("year_to", "").strip()
+    min_comp = params.get("min_completeness", "").strip()
 
     if company:
         qs = qs.filter(company__name__icontains=company)
@@ -553,15 +746,59 @@ def register_list(request: Request) -> Response:
             qs = qs.filter(year__lte=int(year_to))
     if min_comp.isdigit():
         qs = qs.filter(completeness_score__gte=int(min_comp))
+    return qs
+
+
+_REGISTER_LIST_COLUMNS = {
+    "id": _column("id"),
+    "company": _company_column(),
+    "year": _column("year"),
+    "entity_identifier": _column("entity_identifier"),
+    **{
+        name: _decimal_column(VsmeRegister, name)
+        for name in (
+            "employees_value",
+            "ghg_total_value",
+            "energy_consumption_value",
+            "water_withdrawal_value",
+            "waste_generated_value",
+            "ghg_total_tco2e",
+            "energy_mwh",
+            "water_withdrawal_m3",
+            "waste_generated_t",
+        )
+    },
+    "completeness_score": _column("completeness_score"),
+    "updated_at": _column("updated_at"),
+}
+
+_REGISTER_LIST_SORTS = {
+    "company": ["company__name", "year", "id"],
+    "-company": ["-company__name", "-year", "-id"],
+    "year": ["year", "id"],
+    "-year": ["-year", "-id"],
+    "completeness": ["completeness_score", "id"],
+    "-completeness": ["-completeness_score", "-id"],
+    "updated_at": ["updated_at", "id"],
+    "-updated_at": ["-updated_at", "-id"],
+}
 
-    data = VsmeRegisterListSerializer(qs.order_by("company__name", "year"), many=True).data
-    return Response(data)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def register_list(request: Request) -> Response:
+    """List/filter the user's VsmeRegister rows by company name, year range, and min completeness.
+
+    Paginated like `report_list`: `sort`, `fields`, `cursor`, `page_size`, `count=1`.
+    """
+    qs = _filter_register(_user_register(request.user), request.query_params)
+    return _paged_values(request, qs, _REGISTER_LIST_COLUMNS, _REGISTER_LIST_SORTS)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def register_detail(request: Request, company_id: int, year: int) -> Response:
-    row = get_object_or_404(VsmeRegister.objects.select_related("company"), company_id=company_id, year=year)
+    row = get_object_or_404(_user_register(request.user).select_related("company"), company_id=company_id, year=year)
     return Response(VsmeRegisterDetailSerializer(row).data)
 
 
@@ -581,7 +818,7 @@ def register_cleanup_user(request: Request) -> Response:
     try:
         # Get all company-year pairs from user's validated reports
         user_company_years = set(
-            Report.objects.filter(owner=user, status=Report.Status.VALIDATED)
+            Report.objects.filter(REGISTER_REPORTS, owner=user)
             .values_list('company_id', 'reporting_year')
         )
         
@@ -602,229 +839,111 @@ def register_cleanup_user(request: Request) -> Response:
         }, status=500)
 
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def register_export_csv(request: Request) -> Response:
+# (export column, values_list lookup)
+_REGISTER_EXPORT_COLUMNS = [
+    ("company_id", "company_id"),
+    ("company_name", "company__name"),
+    ("year", "year"),
+    ("entity_identifier", "entity_identifier"),
+    *(
+        (f, f)
+        for f in [
+            "employees_value", "employees_unit",
+            "ghg_total_value", "ghg_total_unit",
+            "ghg_scope1_value", "ghg_scope1_unit",
+            "ghg_scope2_value", "ghg_scope2_unit",
+            "energy_consumption_value", "energy_consumption_unit",
+            "renewable_energy_share_value", "renewable_energy_share_unit",
+            "water_withdrawal_value", "water_withdrawal_unit",
+            "water_discharge_value", "water_discharge_unit",
+            "waste_generated_value", "waste_generated_unit",
+            "hazardous_waste_value", "hazardous_waste_unit",
+            "non_hazardous_waste_value", "non_hazardous_waste_unit",
+            "ghg_total_tco2e", "ghg_scope1_tco2e", "ghg_scope2_tco2e", "energy_mwh",
+            "water_withdrawal_m3", "water_discharge_m3",
+            "waste_generated_t", "hazardous_waste_t", "non_hazardous_waste_t",
+            "completeness_score", "updated_at",
+        ]
+    ),
+]
+
+
+def _register_export_rows(request: Request):
+    """Filtered register rows as tuples in _REGISTER_EXPORT_COLUMNS order, fetched in chunks."""
+    qs = _filter_register(_user_register(request.user), request.query_params)
+    return (
+        qs.order_by("company__name", "year")
+        .values_list(*(lookup for _, lookup in _REGISTER_EXPORT_COLUMNS))
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+
+
+def _stream_register_csv(rows):
     import csv
     from io import StringIO
 
-    qs = VsmeRegister.objects.select_related("company").all()
-    company = request.query_params.get("company", "").strip()
-    year = request.query_params.get("year", "").strip()
-    year_from = request.query_params.get("year_from", "").strip()
-    year_to = request.query_params.get("year_to", "").strip()
-    min_comp = request.query_params.get("min_completeness", "").strip()
-
-    if company:
-        qs = qs.filter(company__name__icontains=company)
-    if year.isdigit():
-        qs = qs.filter(year=int(year))
-    else:
-        if year_from.isdigit():
-            qs = qs.filter(year__gte=int(year_from))
-        if year_to.isdigit():
-            qs = qs.filter(year__lte=int(year_to))
-    if min_comp.isdigit():
-        qs = qs.filter(completeness_score__gte=int(min_comp))
+    buf = StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([name for name, _ in _REGISTER_EXPORT_COLUMNS])
+    # Send the header straight away so the download starts before the query finishes
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    for i, row in enumerate(rows, 1):
+        *values, updated_at = row
+        writer.writerow([*values, updated_at.isoformat()])
+        if i % 500 == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _stream_register_ndjson(rows):
+    from django.core.serializers.json import DjangoJSONEncoder
+
+    names = [name for name, _ in _REGISTER_EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder()
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(names, row))))
+        if len(lines) >= 500:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
 
-    headers = [
-        "company_id","company_name","year","entity_identifier",
-        "employees_value","employees_unit",
-        "ghg_total_value","ghg_total_unit",
-        "ghg_scope1_value","ghg_scope1_unit",
-        "ghg_scope2_value","ghg_scope2_unit",
-        "energy_consumption_value","energy_consumption_unit",
-        "renewable_energy_share_value","renewable_energy_share_unit",
-        "water_withdrawal_value","water_withdrawal_unit",
-        "water_discharge_value","water_discharge_unit",
-        "waste_generated_value","waste_generated_unit",
-        "hazardous_waste_value","hazardous_waste_unit",
-        "non_hazardous_waste_value","non_hazardous_waste_unit",
-        "completeness_score","updated_at",
-    ]
-
-    out = StringIO()
-    writer = csv.writer(out)
-    writer.writerow(headers)
-    for r in qs.iterator():
-        row = [
-            r.company_id,
-            r.company.name,
-            r.year,
-            r.entity_identifier,
-            r.employees_value, r.employees_unit,
-            r.ghg_total_value, r.ghg_total_unit,
-            r.ghg_scope1_value, r.ghg_scope1_unit,
-            r.ghg_scope2_value, r.ghg_scope2_unit,
-            r.energy_consumption_value, r.energy_consumption_unit,
-            r.renewable_energy_share_value, r.renewable_energy_share_unit,
-            r.water_withdrawal_value, r.water_withdrawal_unit,
-            r.water_discharge_value, r.water_discharge_unit,
-            r.waste_generated_value, r.waste_generated_unit,
-            r.hazardous_waste_value, r.hazardous_waste_unit,
-            r.non_hazardous_waste_value, r.non_hazardous_waste_unit,
-            r.completeness_score, r.updated_at.isoformat(),
-        ]
-        writer.writerow(row)
 
-    content = out.getvalue().encode("utf-8")
-    from django.http import HttpResponse
-    response = HttpResponse(content, content_type="text/csv; charset=utf-8")
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def register_export_csv(request: Request) -> StreamingHttpResponse:
+    """Stream the filtered register as CSV (same filters as the list endpoint)."""
+    response = StreamingHttpResponse(
+        _stream_register_csv(_register_export_rows(request)),
+        content_type="text/csv; charset=utf-8",
+    )
     response["Content-Disposition"] = "attachment; filename=vsme_register.csv"
     return response
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def register_export_ndjson(request: Request) -> StreamingHttpResponse:
+    """Stream the filtered register as newline-delimited JSON, one object per company-year."""
+    response = StreamingHttpResponse(
+        _stream_register_ndjson(_register_export_rows(request)),
+        content_type="application/x-ndjson; charset=utf-8",
+    )
+    response["Content-Disposition"] = "attachment; filename=vsme_register.ndjson"
+    return response
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def insights_aggregated(request: Request) -> Response:
     """
     Insights v1.5: Aggregated portfolio view with status tiles, KPI trends, and quality snapshot.
-    Only shows data from reports owned by the current user.
+    Only shows data from reports owned by the current user. Computed in SQL and cached per user
+    until reports or register rows change (see api/insights.py).
     """
-    user = request.user
-    
-    # Row 1: Status tiles - filter by user ownership
-    user_reports = Report.objects.filter(owner=user, status=Report.Status.VALIDATED)
-    companies_count = user_reports.values('company').distinct().count()
-    validated_reports_count = user_reports.count()
-    
-    # Latest submission (most recent updated report for this user)
-    latest_report = user_reports.order_by('-updated_at').first()
-    latest_submission = latest_report.updated_at.isoformat() if latest_report else None
-    
-    # Get company-year pairs from user's reports
-    user_company_years = set(user_reports.values_list('company_id', 'reporting_year'))
-    
-    # Early return if user has no validated reports
-    if not user_company_years:
-        return Response({
-            'status_tiles': {
-                'companies_count': 0,
-                'validated_reports_count': 0,
-                'latest_submission': None,
-                'portfolio_completeness': 0.0
-            },
-            'kpi_trends': {
-                'ghg_by_year': [],
-                'energy_by_year': [],
-                'waste_by_year': [],
-                'ghg_per_employee': []
-            },
-            'quality_snapshot': {
-                'units_analysis': {},
-                'portfolio_completeness': 0.0,
-                'distribution_data': None
-            }
-        })
-    
-    # Get VsmeRegister entries that correspond to user's validated reports
-    register_qs = VsmeRegister.objects.select_related('company').filter(
-        company_id__in=[cy[0] for cy in user_company_years],
-        year__in=[cy[1] for cy in user_company_years]
-    ).distinct()
-    
-    # Portfolio completeness (using completeness_score from user's VsmeRegister entries)
-    avg_completeness = register_qs.aggregate(avg_comp=Avg('completeness_score'))['avg_comp']
-    portfolio_completeness = round(float(avg_completeness or 0), 1)
-    
-    # Row 2: KPI trend charts (aggregates by year) - only user's data
-    
-    # Group by year and sum KPIs
-    yearly_data = {}
-    for row in register_qs:
-        year = row.year
-        if year not in yearly_data:
-            yearly_data[year] = {
-                'ghg_total': Decimal('0'),
-                'energy': Decimal('0'), 
-                'waste': Decimal('0'),
-                'employees': Decimal('0'),
-                'count': 0
-            }
-        
-        yearly_data[year]['ghg_total'] += row.ghg_total_value or Decimal('0')
-        yearly_data[year]['energy'] += row.energy_consumption_value or Decimal('0')
-        yearly_data[year]['waste'] += row.waste_generated_value or Decimal('0')
-        yearly_data[year]['employees'] += row.employees_value or Decimal('0')
-        yearly_data[year]['count'] += 1
-    
-    # Convert to sorted lists for charts
-    sorted_years = sorted(yearly_data.keys())
-    ghg_by_year = [{'year': year, 'value': float(yearly_data[year]['ghg_total'])} for year in sorted_years]
-    energy_by_year = [{'year': year, 'value': float(yearly_data[year]['energy'])} for year in sorted_years]
-    waste_by_year = [{'year': year, 'value': float(yearly_data[year]['waste'])} for year in sorted_years]
-    
-    # Optional intensities (only if denominator > 0)
-    ghg_per_employee = []
-    for year in sorted_years:
-        employees = yearly_data[year]['employees']
-        if employees > 0:
-            intensity = float(yearly_data[year]['ghg_total'] / employees)
-            ghg_per_employee.append({'year': year, 'value': intensity})
-    
-    # Row 3: Quality snapshot - Units consistency
-    units_analysis = {}
-    kpi_fields = [
-        ('ghg_total', 'ghg_total_unit', 'tCO₂e'),
-        ('energy', 'energy_consumption_unit', 'MWh'),
-        ('waste', 'waste_generated_unit', 't'),
-        ('water', 'water_withdrawal_unit', 'm³')
-    ]
-    
-    for kpi_name, unit_field, target_unit in kpi_fields:
-        units = []
-        for row in register_qs:
-            unit = getattr(row, unit_field, None)
-            if unit:
-                units.append(unit)
-        
-        if units:
-            unit_counts = Counter(units)
-            most_common_unit, most_common_count = unit_counts.most_common(1)[0]
-            unit_consistency = round((most_common_count / len(units)) * 100, 1)
-            status = 'OK' if unit_consistency >= 90 else 'Mixed'
-        else:
-            most_common_unit = 'N/A'
-            unit_consistency = 0
-            status = 'No data'
-        
-        units_analysis[kpi_name] = {
-            'target_unit': target_unit,
-            'most_common_unit': most_common_unit,
-            'consistency_pct': unit_consistency,
-            'status': status
-        }
-    
-    # Distribution chart data (GHG for latest year with ≥5 companies)
-    latest_year_with_data = max(sorted_years) if sorted_years else None
-    distribution_data = None
-    
-    if latest_year_with_data:
-        latest_year_rows = register_qs.filter(year=latest_year_with_data, ghg_total_value__isnull=False)
-        if latest_year_rows.count() >= 5:
-            ghg_values = [float(row.ghg_total_value) for row in latest_year_rows if row.ghg_total_value]
-            distribution_data = {
-                'year': latest_year_with_data,
-                'values': ghg_values,
-                'count': len(ghg_values)
-            }
-    
-    return Response({
-        'status_tiles': {
-            'companies_count': companies_count,
-            'validated_reports_count': validated_reports_count,
-            'latest_submission': latest_submission,
-            'portfolio_completeness': portfolio_completeness
-        },
-        'kpi_trends': {
-            'ghg_by_year': ghg_by_year,
-            'energy_by_year': energy_by_year,
-            'waste_by_year': waste_by_year,
-            'ghg_per_employee': ghg_per_employee if len(ghg_per_employee) >= 2 else []
-        },
-        'quality_snapshot': {
-            'units_analysis': units_analysis,
-            'portfolio_completeness': portfolio_completeness,
-            'distribution_data': distribution_data
-        }
-    })
+    return Response(cached_portfolio_insights(request.user))
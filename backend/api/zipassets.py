@@ -0,0 +1,131 @@
+"""Members of uploaded IXDS ZIPs for the inline viewer (`report_asset`).
+
+Open `ZipFile`s are kept in a per-process LRU keyed by path, mtime and size, so the
+central directory is parsed once per archive instead of once per image or stylesheet,
+and member lookup is the ZipFile's own name dict. Members are streamed in chunks with
+an ETag derived from their CRC, long-lived private caching and single-range support.
+"""
+import mimetypes
+import os
+import re
+import threading
+import zipfile
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _ArchiveCache(LRUCache):
+    def popitem(self):
+        key, archive = super().popitem()
+        # Members already opened keep the underlying file alive until they are closed
+        archive.close()
+        return key, archive
+
+
+_lock = threading.Lock()
+_archives = _ArchiveCache(maxsize=settings.ZIP_ARCHIVE_CACHE_SIZE)
+
+
+def _archive(path: str) -> zipfile.ZipFile:
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    archive = _archives.get(key)
+    if archive is None:
+        archive = zipfile.ZipFile(path)
+        _archives[key] = archive
+    return archive
+
+
+def open_member(path: str, member: str):
+    """Return (ZipInfo, open member file) for `member`, also trying it under `reports/`; None if absent.
+
+    Raises FileNotFoundError / zipfile.BadZipFile for a missing or corrupt archive.
+    """
+    with _lock:
+        archive = _archive(path)
+        for name in (member, f"reports/{member}"):
+            info = archive.NameToInfo.get(name)
+            if info is not None and not info.is_dir():
+                # Opened under the lock so an eviction can't close the archive in between
+                return info, archive.open(info)
+    return None
+
+
+def _etag(info: zipfile.ZipInfo) -> str:
+    return f'"{info.CRC:08x}-{info.file_size:x}"'
+
+
+def _byte_range(request: HttpRequest, size: int, etag: str):
+    """(start, end) of a satisfiable single `Range`, None to send the whole member, or False if unsatisfiable."""
+    header = request.headers.get("Range", "")
+    if not header:
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        # Multiple or malformed ranges: the full body is a valid answer
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _stream(member_file, start: int, length: int):
+    with member_file:
+        if start:
+            member_file.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = member_file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def member_response(request: HttpRequest, info: zipfile.ZipInfo, member_file) -> HttpResponse:
+    """Conditional, range-aware streaming response for an opened ZIP member."""
+    etag = _etag(info)
+    size = info.file_size
+    headers = {
+        "ETag": etag,
+        # Asset URLs belong to one immutable upload; only the owner may cache them
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if etag in (t.strip() for t in request.headers.get("If-None-Match", "").split(",")):
+        member_file.close()
+        return HttpResponse(status=304, headers=headers)
+
+    byte_range = _byte_range(request, size, etag)
+    if byte_range is False:
+        member_file.close()
+        return HttpResponse(status=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    start, end = byte_range or (0, size - 1)
+    length = max(end - start + 1, 0)
+    content_type = mimetypes.guess_type(info.filename)[0] or "application/octet-stream"
+    response = StreamingHttpResponse(
+        _stream(member_file, start, length),
+        status=206 if byte_range else 200,
+        content_type=content_type,
+        headers=headers,
+    )
+    response["Content-Length"] = str(length)
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
@@ -127,6 +127,22 @@ else:
         }
     }
 
+# Cache (throttling, portfolio insights). Set REDIS_URL so web and worker processes share it;
+# the local-memory fallback is per process, so insights may lag by up to INSIGHTS_CACHE_TTL.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -168,8 +184,24 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Downloads handed to the front proxy after the permission check: "nginx" (X-Accel-Redirect
+# to FILE_OFFLOAD_NGINX_PREFIX, an internal location aliasing MEDIA_ROOT), "sendfile"
+# (X-Sendfile with the absolute path) or empty to stream through Django.
+FILE_OFFLOAD = os.getenv("FILE_OFFLOAD", "").lower()
+FILE_OFFLOAD_NGINX_PREFIX = os.getenv("FILE_OFFLOAD_NGINX_PREFIX", "/protected-media/")
+
+# Uploaded ZIPs kept open per process for the inline viewer's asset requests
+ZIP_ARCHIVE_CACHE_SIZE = int(os.getenv("ZIP_ARCHIVE_CACHE_SIZE", "16"))
+
 # Upload limits
 MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "50"))
+# Chunked uploads (/api/uploads/): largest accepted chunk, and how long unfinished sessions are kept
+UPLOAD_CHUNK_MAX_MB = int(os.getenv("UPLOAD_CHUNK_MAX_MB", "8"))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+# Upload pre-flight (api/preflight.py): ZIP limits read from the central directory before inflating
+PREFLIGHT_ZIP_MAX_ENTRIES = int(os.getenv("PREFLIGHT_ZIP_MAX_ENTRIES", "5000"))
+PREFLIGHT_ZIP_MAX_UNCOMPRESSED_MB = int(os.getenv("PREFLIGHT_ZIP_MAX_UNCOMPRESSED_MB", "500"))
+PREFLIGHT_ZIP_MAX_RATIO = int(os.getenv("PREFLIGHT_ZIP_MAX_RATIO", "100"))
 
 # Optional retention/quota settings
 REPORT_RETENTION_DAYS = int(os.getenv("REPORT_RETENTION_DAYS", "0"))  # 0 disables cleanup
@@ -185,6 +217,46 @@ VSME_ENTRYPOINT_URL = os.getenv(
     "VSME_ENTRYPOINT_URL",
     "https://xbrl.efrag.org/taxonomy/vsme/2024-12-17/vsme-all.xsd",
 )
+# Part of the validation cache key; detected from the installed arelle package when empty
+ARELLE_VERSION = os.getenv("ARELLE_VERSION", "")
+
+# Facts are inserted (and committed) in batches of this size during ingestion
+FACT_INGEST_BATCH_SIZE = int(os.getenv("FACT_INGEST_BATCH_SIZE", "1000"))
+# Concept/unit/period ids kept in memory per process (LRU) to resolve facts without lookups
+FACT_DIMENSION_CACHE_SIZE = int(os.getenv("FACT_DIMENSION_CACHE_SIZE", "20000"))
+
+# Rows fetched per database round trip by the streaming register exports
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+# Upper bound on report ids per POST /api/reports/batch/ request
+REPORT_BATCH_MAX_IDS = int(os.getenv("REPORT_BATCH_MAX_IDS", "200"))
+
+# Full VsmeRegister rebuild: company-years derived per chunk; >0 workers shard chunks over processes
+VSME_REGISTER_REBUILD_CHUNK_SIZE = int(os.getenv("VSME_REGISTER_REBUILD_CHUNK_SIZE", "500"))
+VSME_REGISTER_REBUILD_WORKERS = int(os.getenv("VSME_REGISTER_REBUILD_WORKERS", "0"))
+
+# Native iXBRL extraction (phase one, report worker only): size of the worker process's shared pool
+# parsing the documents of a multi-document IXDS (0/1 = serial), used once they add up to IXDS_EXTRACT_PARALLEL_MIN_MB
+IXDS_EXTRACT_WORKERS = int(os.getenv("IXDS_EXTRACT_WORKERS", str(min(os.cpu_count() or 1, 4))))
+IXDS_EXTRACT_PARALLEL_MIN_MB = int(os.getenv("IXDS_EXTRACT_PARALLEL_MIN_MB", "8"))
+
+# Cached portfolio insights; entries are also invalidated whenever reports or register rows change
+INSIGHTS_CACHE_TTL = int(os.getenv("INSIGHTS_CACHE_TTL", "300"))
+
+# Background processing queue (`python manage.py run_report_workers`)
+REPORT_WORKER_CONCURRENCY = int(os.getenv("REPORT_WORKER_CONCURRENCY", "2"))  # jobs in flight per node
+REPORT_WORKER_POLL_INTERVAL = float(os.getenv("REPORT_WORKER_POLL_INTERVAL", "2"))  # seconds when idle
+REPORT_JOB_MAX_ATTEMPTS = int(os.getenv("REPORT_JOB_MAX_ATTEMPTS", "3"))
+REPORT_JOB_RETRY_BACKOFF = int(os.getenv("REPORT_JOB_RETRY_BACKOFF", "30"))  # seconds, doubled per attempt
+REPORT_JOB_VISIBILITY_TIMEOUT = int(os.getenv("REPORT_JOB_VISIBILITY_TIMEOUT", "900"))  # lease length in seconds
+REPORT_JOB_HEARTBEAT_INTERVAL = int(os.getenv("REPORT_JOB_HEARTBEAT_INTERVAL", str(REPORT_JOB_VISIBILITY_TIMEOUT // 3)))  # lease renewal, seconds
+
+# Warm Arelle worker processes (0 disables the pool and uses the Arelle CLI per report)
+ARELLE_POOL_SIZE = int(os.getenv("ARELLE_POOL_SIZE", str(REPORT_WORKER_CONCURRENCY)))
+ARELLE_POOL_MAX_JOBS = int(os.getenv("ARELLE_POOL_MAX_JOBS", "50"))  # recycle a worker after N reports
+ARELLE_POOL_MAX_MEMORY_MB = int(os.getenv("ARELLE_POOL_MAX_MEMORY_MB", "2048"))  # or once its RSS passes this
+ARELLE_POOL_TIMEOUT = int(os.getenv("ARELLE_POOL_TIMEOUT", "600"))  # seconds per startup or job
+ARELLE_CLI_TIMEOUT = int(os.getenv("ARELLE_CLI_TIMEOUT", "600"))  # seconds per CLI run; keep below the job lease
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field